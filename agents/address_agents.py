@@ -46,9 +46,12 @@ def create_address_agents(kernel: Kernel) -> Tuple[ChatCompletionAgent, ChatComp
         instructions="""
 Address verifier via tel.search.ch API:
 1. Convert names into "FirstName LastName" format
-2. Use the API: telsearch.search_person(name="FirstName LastName", location="municipality")
+2. Look up all names with ONE call: telsearch.search_people(names=["FirstName LastName", ...], location="municipality")
+   Use telsearch.search_person(name="FirstName LastName", location="municipality") only to retry a single name.
+   Each lookup returns a JSON list of candidates {name, street, no, zip, city}; an empty list means not found.
+   Pass raw=true only if you need the full tel.search.ch Atom feed.
 3. Format the result: "[FirstName] [LastName]: [Street] [No], [ZIP] [City]" or "NOT FOUND"
-Perform an API call for EACH name.
+Make sure EVERY name has been looked up.
 """
     )
     
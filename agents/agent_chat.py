@@ -6,19 +6,31 @@ This module sets up a group chat with two specialized agents:
 2. Report agent: Collects and structures verification results
 """
 
+from typing import Optional, Sequence
+
 from semantic_kernel.agents import AgentGroupChat
 from semantic_kernel.agents.strategies import KernelFunctionSelectionStrategy
 from semantic_kernel.functions import KernelFunctionFromPrompt
 from semantic_kernel import Kernel
 
 from agents.address_agents import RETRIEVER, REPORT_AGENT, create_address_agents
+from agents.history_reducer import ReducingAgentGroupChat, create_history_reducer
+from agents.selection_strategy import LookupProgress, RuleBasedSelectionStrategy, use_llm_selection
 
-def setup_agent_chat(kernel: Kernel) -> AgentGroupChat:
+def setup_agent_chat(
+    kernel: Kernel,
+    llm_selection: Optional[bool] = None,
+    names: Optional[Sequence[str]] = None
+) -> AgentGroupChat:
     """
     Configure and return the agent group chat for address verification workflow
     
     Args:
         kernel: The Semantic Kernel instance to use
+        llm_selection: Use the LLM to pick the next agent on every turn instead
+                       of the rule-based strategy. Defaults to AGENT_SELECTION_MODE.
+        names: Names to verify. The rule-based strategy keeps the Retriever
+               going until all of them have been looked up.
         
     Returns:
         Configured AgentGroupChat instance ready for address verification
@@ -26,6 +38,22 @@ def setup_agent_chat(kernel: Kernel) -> AgentGroupChat:
     # Create the specialized agents
     retriever_agent, report_agent = create_address_agents(kernel)
     
+    if llm_selection is None:
+        llm_selection = use_llm_selection()
+    
+    if not llm_selection:
+        # Select the agents from the lookups in the history without an LLM call per turn
+        return ReducingAgentGroupChat(
+            agents=[retriever_agent, report_agent],
+            chat_history=create_history_reducer(),
+            selection_strategy=RuleBasedSelectionStrategy(
+                initial_agent=retriever_agent,
+                worker_name=RETRIEVER,
+                reporter_name=REPORT_AGENT,
+                progress=LookupProgress(names) if names else None
+            )
+        )
+    
     # Configure agent selection strategy with a clear prompt
     selection_function = KernelFunctionFromPrompt(
         function_name="agent_selection",
@@ -58,13 +86,15 @@ Selection criteria:
     )
 
     # Create the group chat with our agent selection strategy
-    chat = AgentGroupChat(
+    chat = ReducingAgentGroupChat(
         agents=[retriever_agent, report_agent],
+        chat_history=create_history_reducer(),
         selection_strategy=KernelFunctionSelectionStrategy(
             initial_agent=retriever_agent,
             function=selection_function,
             kernel=kernel,
             history_variable_name="history",
+            history_reducer=create_history_reducer(),
             agent_variable_name="agents",
             result_parser=lambda x: str(x) if x else RETRIEVER
         )
@@ -0,0 +1,215 @@
+"""
+agents/history_reducer.py - Token-aware history reduction for the agent group chats
+
+Tool results from tel.search.ch contain complete Atom feeds. Left in the chat
+history, they are resent to the model on every turn. The reducer in this module
+replaces them with the parsed address lines and drops the oldest turns once the
+history exceeds a token ceiling, so prompt size stays flat during a run.
+
+The reducer is the history of the group chat (ReducingAgentGroupChat), which
+reduces it before every agent turn and resends the result to all agents.
+"""
+
+import json
+import os
+from typing import AsyncIterable, List, Optional
+
+from semantic_kernel.agents import Agent, AgentGroupChat
+from semantic_kernel.contents import ChatMessageContent, FunctionResultContent
+from semantic_kernel.contents.history_reducer.chat_history_reducer import ChatHistoryReducer
+from semantic_kernel.contents.utils.author_role import AuthorRole
+from semantic_kernel.exceptions.agent_exceptions import AgentChatException
+
+from models.core import MAX_MESSAGE_COUNT
+from utils.atom_feed import parse_entries
+
+DEFAULT_MAX_HISTORY_TOKENS = 4000  # Token ceiling for the history sent per call
+CHARS_PER_TOKEN = 4  # Rough estimate for mixed German/English text
+MAX_ENTRIES_PER_FEED = 3  # Address lines kept per tool result
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens of a text without a tokenizer."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def summarize_feed(xml_text: str, max_entries: int = MAX_ENTRIES_PER_FEED) -> str:
+    """
+    Replace an Atom feed with one address line per entry.
+
+    Args:
+        xml_text: tel.search.ch Atom feed
+        max_entries: Maximum number of entries to keep
+
+    Returns:
+        Address lines such as "Hans Meier: Bahnhofstrasse 10, 8001 Zürich",
+        or "NOT FOUND" if the feed has no entries
+    """
+    lines = []
+    for entry in parse_entries(xml_text, limit=max_entries):
+        name = f"{entry.firstname} {entry.name}".strip() or entry.title
+        address = ", ".join(part for part in (entry.street_address, entry.zip_city) if part)
+        lines.append(f"{name}: {address or 'NO ADDRESS'}")
+    return "\n".join(lines) if lines else "NOT FOUND"
+
+def compact_tool_output(text: str) -> str:
+    """
+    Shorten a tool result containing raw Atom feeds.
+
+    Handles both a single feed (search_person) and the JSON list returned by
+    search_people. Other results are returned unchanged.
+    """
+    if "<feed" not in text:
+        return text
+
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        try:
+            results = json.loads(stripped)
+            return json.dumps(
+                [{"name": r.get("name"), "result": compact_tool_output(str(r.get("result", "")))} for r in results],
+                ensure_ascii=False
+            )
+        except (ValueError, AttributeError):
+            pass
+
+    return summarize_feed(text)
+
+def _message_tokens(message: ChatMessageContent) -> int:
+    """Estimate the tokens of a message including its tool results."""
+    text = message.content or ""
+    for item in message.items:
+        if isinstance(item, FunctionResultContent):
+            text += str(item.result)
+    return estimate_tokens(text)
+
+def reduce_messages(
+    messages: List[ChatMessageContent],
+    max_tokens: int,
+    keep_first: int = 1
+) -> Optional[List[ChatMessageContent]]:
+    """
+    Compact tool outputs and drop the oldest turns above the token ceiling.
+
+    The first keep_first messages (the task description) are always kept.
+    A turn is a message together with the tool result messages following it,
+    so a function call is never separated from its result.
+
+    Args:
+        messages: Chat history, oldest message first
+        max_tokens: Token ceiling for the reduced history
+        keep_first: Number of leading messages that are never dropped
+
+    Returns:
+        The reduced message list, or None if nothing had to change
+    """
+    changed = False
+
+    for message in messages:
+        for item in message.items:
+            if isinstance(item, FunctionResultContent) and isinstance(item.result, str):
+                compacted = compact_tool_output(item.result)
+                if compacted != item.result:
+                    item.result = compacted
+                    changed = True
+
+    head = messages[:keep_first]
+    # Group the remaining messages into turns
+    turns: List[List[ChatMessageContent]] = []
+    for message in messages[keep_first:]:
+        if message.role == AuthorRole.TOOL and turns:
+            turns[-1].append(message)
+        else:
+            turns.append([message])
+
+    total = sum(_message_tokens(m) for m in messages)
+    # Always keep the latest turn so the next agent sees what just happened
+    while total > max_tokens and len(turns) > 1:
+        dropped = turns.pop(0)
+        total -= sum(_message_tokens(m) for m in dropped)
+        changed = True
+
+    if not changed:
+        return None
+    return head + [message for turn in turns for message in turn]
+
+class ToolOutputHistoryReducer(ChatHistoryReducer):
+    """
+    Chat history reducer that summarizes tool outputs and enforces a token ceiling.
+    """
+
+    max_tokens: int = DEFAULT_MAX_HISTORY_TOKENS
+
+    async def reduce(self) -> Optional["ToolOutputHistoryReducer"]:
+        """
+        Reduce the history in place.
+
+        Returns:
+            The reducer itself if the history changed, otherwise None
+        """
+        reduced = reduce_messages(self.messages, self.max_tokens)
+        if reduced is None:
+            return None
+        self.messages = reduced
+        return self
+
+def create_history_reducer(max_tokens: Optional[int] = None) -> ToolOutputHistoryReducer:
+    """
+    Create a history reducer for one group chat or selection strategy.
+
+    Args:
+        max_tokens: Token ceiling. Defaults to AGENT_HISTORY_MAX_TOKENS.
+
+    Returns:
+        New ToolOutputHistoryReducer instance
+    """
+    if max_tokens is None:
+        max_tokens = int(os.environ.get("AGENT_HISTORY_MAX_TOKENS", DEFAULT_MAX_HISTORY_TOKENS))
+    return ToolOutputHistoryReducer(target_count=MAX_MESSAGE_COUNT, max_tokens=max_tokens)
+
+class ReducingAgentGroupChat(AgentGroupChat):
+    """
+    Agent group chat that reduces its history before every agent turn.
+
+    The history must be a ChatHistoryReducer, e.g. from create_history_reducer().
+    AgentGroupChat.invoke runs several turns per call, so reducing only before
+    invoke would let tool outputs pile up within a call.
+    """
+
+    async def invoke(self, agent: Optional[Agent] = None, is_joining: bool = True) -> AsyncIterable[ChatMessageContent]:
+        """
+        Invoke the chat, reducing the history before each selected agent speaks.
+
+        Args:
+            agent: Agent to invoke for a single turn. If not provided, agents are
+                   selected until the termination strategy ends the chat.
+            is_joining: Whether a given agent joins the chat
+
+        Yields:
+            The chat messages
+        """
+        if agent is not None:
+            async for message in super().invoke(agent, is_joining):
+                yield message
+            return
+
+        if not self.agents:
+            raise AgentChatException("No agents are available")
+
+        if self.is_complete:
+            if not self.termination_strategy.automatic_reset:
+                raise AgentChatException("Chat is already complete")
+            self.is_complete = False
+
+        for _ in range(self.termination_strategy.maximum_iterations):
+            await self.reduce_history()
+
+            try:
+                selected_agent = await self.selection_strategy.next(self.agents, self.history.messages)
+            except Exception as ex:
+                print(f"DEBUG: Failed to select agent: {ex}")
+                raise AgentChatException("Failed to select agent") from ex
+
+            async for message in super().invoke(selected_agent, is_joining=False):
+                yield message
+
+            if self.is_complete:
+                break
@@ -0,0 +1,279 @@
+"""
+agents/selection_strategy.py - Deterministic agent selection for the group chats
+
+This module provides a selection strategy that picks the next agent from the
+state of the conversation instead of asking the LLM on every turn. Each chat
+has a worker agent that calls tools (Retriever, Validator) and a reporter
+agent. The function calls and results in the history tell which work is done:
+the Retriever keeps the turn while requested names have not been looked up,
+and the reporter hands back as long as work is pending.
+The LLM-based KernelFunctionSelectionStrategy stays available as an opt-in mode.
+"""
+
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from pydantic import Field, PrivateAttr
+from semantic_kernel.agents import Agent
+from semantic_kernel.agents.strategies.selection.selection_strategy import SelectionStrategy
+from semantic_kernel.contents import ChatMessageContent, FunctionCallContent, FunctionResultContent
+
+from utils.name_index import normalize_name
+
+SELECTION_MODE_RULES = "rules"
+SELECTION_MODE_LLM = "llm"
+
+_SAVED_RESULTS = re.compile(r"Successfully saved (\d+) validation results")
+
+def use_llm_selection() -> bool:
+    """Return True if AGENT_SELECTION_MODE opts into LLM-based agent selection."""
+    return os.environ.get("AGENT_SELECTION_MODE", SELECTION_MODE_RULES).strip().lower() == SELECTION_MODE_LLM
+
+def _items(message: ChatMessageContent) -> list:
+    """Get the content items of a message, empty for plain text stand-ins."""
+    return getattr(message, "items", None) or []
+
+def _is_error(result) -> bool:
+    """Check whether a tool result reports an error instead of data."""
+    text = str(result).lstrip()
+    return text.startswith('{"error"') or text.startswith("Error")
+
+class WorkProgress(ABC):
+    """Tracks the work an agent chat has completed according to its history."""
+
+    @abstractmethod
+    def completed(self, history: Sequence[ChatMessageContent]) -> Set[str]:
+        """Find the keys of the work items completed in the history."""
+
+    @abstractmethod
+    def pending(self, completed: Set[str]) -> int:
+        """Count the work items not yet completed."""
+
+class LookupProgress(WorkProgress):
+    """Tracks which requested names have been looked up with telsearch."""
+
+    def __init__(self, names: Iterable[str]):
+        """
+        Args:
+            names: Names the Retriever has to look up
+        """
+        self.names = {normalize_name(name) for name in names if name.strip()}
+
+    def completed(self, history: Sequence[ChatMessageContent]) -> Set[str]:
+        """
+        Find the names with a successful lookup result in the history.
+
+        Args:
+            history: Chat history, oldest message first
+
+        Returns:
+            Normalized names that have been looked up
+        """
+        call_names: Dict[str, List[str]] = {}
+        done = set()
+        for message in history:
+            for item in _items(message):
+                if isinstance(item, FunctionCallContent) and item.plugin_name == "telsearch":
+                    try:
+                        arguments = item.parse_arguments() or {}
+                    except Exception:
+                        arguments = {}
+                    names = arguments.get("names", [arguments.get("name")])
+                    call_names[item.id] = [names] if isinstance(names, str) else list(names or [])
+                elif isinstance(item, FunctionResultContent) and item.id in call_names:
+                    if item.function_name == "search_people":
+                        try:
+                            results = json.loads(str(item.result))
+                        except ValueError:
+                            continue
+                        done.update(
+                            normalize_name(str(r.get("name", ""))) for r in results
+                            if isinstance(r, dict) and not _is_error(r.get("result", ""))
+                        )
+                    elif not _is_error(item.result):
+                        done.update(normalize_name(str(name)) for name in call_names[item.id] if name)
+        return done
+
+    def pending(self, completed: Set[str]) -> int:
+        """Count the names still to be looked up."""
+        return len(self.names - completed)
+
+class ValidationProgress(WorkProgress):
+    """Tracks how many checklist results have been saved with the compliance plugin."""
+
+    def __init__(self, item_count: int):
+        """
+        Args:
+            item_count: Number of checklist items to validate
+        """
+        self.item_count = item_count
+
+    def completed(self, history: Sequence[ChatMessageContent]) -> Set[str]:
+        """
+        Find the saved results in the history.
+
+        Args:
+            history: Chat history, oldest message first
+
+        Returns:
+            One key per saved result
+        """
+        done = set()
+        for message in history:
+            for item in _items(message):
+                if not isinstance(item, FunctionResultContent) or item.plugin_name != "compliance":
+                    continue
+                result = str(item.result)
+                if item.function_name == "save_validation_result" and not _is_error(result):
+                    done.add(item.id)
+                elif item.function_name == "save_validation_results":
+                    match = _SAVED_RESULTS.search(result)
+                    if match:
+                        done.update(f"{item.id}:{index}" for index in range(int(match.group(1))))
+        return done
+
+    def pending(self, completed: Set[str]) -> int:
+        """Count the checklist items without a saved result."""
+        return max(self.item_count - len(completed), 0)
+
+def last_turn(
+    history: Sequence[ChatMessageContent],
+    agent_names: Sequence[str]
+) -> Tuple[Optional[str], List[ChatMessageContent]]:
+    """
+    Find the agent that spoke last and the messages of its turn.
+
+    A turn is the run of consecutive messages of one agent, including its
+    function calls and their results. Messages of other authors after the
+    turn are ignored.
+
+    Args:
+        history: Chat history, oldest message first
+        agent_names: Names of the agents taking part in the chat
+
+    Returns:
+        Tuple of (agent name or None if no agent has spoken, turn messages)
+    """
+    speaker = None
+    turn = []
+    for message in reversed(history):
+        if message.name not in agent_names or (speaker is not None and message.name != speaker):
+            if turn:
+                break
+            continue
+        speaker = message.name
+        turn.append(message)
+    return speaker, turn[::-1]
+
+def next_agent_name(
+    history: Sequence[ChatMessageContent],
+    agent_names: Sequence[str],
+    worker_name: str,
+    reporter_name: str,
+    initial_agent_name: str,
+    pending: Optional[int] = None,
+    hand_over_each_result: bool = False,
+    handoff_markers: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    Decide which agent speaks next based on the conversation state.
+
+    The worker keeps the turn while work is pending. It hands over once
+    nothing is pending, after a tool result if hand_over_each_result is set
+    or progress is unknown, or when its reply contains its handoff marker.
+    The reporter hands back while work is pending and keeps the turn to
+    finish the report once everything is done.
+
+    Args:
+        history: Chat history, oldest message first
+        agent_names: Names of the agents taking part in the chat
+        worker_name: Agent doing the work with tool calls
+        reporter_name: Agent reporting the results
+        initial_agent_name: Agent to start with if no agent has spoken yet
+        pending: Number of work items still open, None if unknown
+        hand_over_each_result: Hand over to the reporter after every tool result
+        handoff_markers: Maps an agent name to a marker that hands the turn over
+
+    Returns:
+        Name of the next agent
+    """
+    speaker, turn = last_turn(history, agent_names)
+    if speaker is None:
+        return initial_agent_name
+
+    if speaker == reporter_name:
+        return reporter_name if pending == 0 else worker_name
+
+    if speaker != worker_name:
+        return initial_agent_name
+
+    had_result = any(isinstance(item, FunctionResultContent) for m in turn for item in _items(m))
+    marker = (handoff_markers or {}).get(worker_name)
+    if (
+        pending == 0
+        or (had_result and (hand_over_each_result or pending is None))
+        or (marker and marker in (turn[-1].content or ""))
+    ):
+        return reporter_name
+    return worker_name
+
+class RuleBasedSelectionStrategy(SelectionStrategy):
+    """
+    Selects the next agent from the conversation state without an LLM call.
+
+    See next_agent_name for the rules. Work completed according to the
+    history is remembered, so it still counts after the history reducer has
+    dropped the turn that did it.
+    """
+
+    worker_name: str
+    reporter_name: str
+    progress: Optional[WorkProgress] = None  # Without progress, the worker hands over after each tool result
+    hand_over_each_result: bool = False
+    handoff_markers: Dict[str, str] = Field(default_factory=dict)
+
+    _completed: Set[str] = PrivateAttr(default_factory=set)
+
+    def pending(self, history: Sequence[ChatMessageContent]) -> Optional[int]:
+        """
+        Count the open work items after the given history.
+
+        Args:
+            history: Current chat history
+
+        Returns:
+            Number of open items, None if progress is not tracked
+        """
+        if self.progress is None:
+            return None
+        self._completed |= self.progress.completed(history)
+        return self.progress.pending(self._completed)
+
+    async def select_agent(self, agents: List[Agent], history: List[ChatMessageContent]) -> Agent:
+        """
+        Select the next agent to respond.
+
+        Args:
+            agents: Agents taking part in the chat
+            history: Current chat history
+
+        Returns:
+            The agent that should respond next
+        """
+        agents_by_name = {agent.name: agent for agent in agents}
+        initial_name = self.initial_agent.name if self.initial_agent else agents[0].name
+
+        name = next_agent_name(
+            history,
+            list(agents_by_name),
+            self.worker_name,
+            self.reporter_name,
+            initial_name,
+            pending=self.pending(history),
+            hand_over_each_result=self.hand_over_each_result,
+            handoff_markers=self.handoff_markers
+        )
+        return agents_by_name.get(name, agents_by_name[initial_name])
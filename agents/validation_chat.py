@@ -6,19 +6,31 @@ This module sets up a group chat with two specialized agents:
 2. Reporter agent: Collects and reports validation results
 """
 
+from typing import Optional
+
 from semantic_kernel.agents import AgentGroupChat
 from semantic_kernel.agents.strategies import KernelFunctionSelectionStrategy
 from semantic_kernel.functions import KernelFunctionFromPrompt
 from semantic_kernel import Kernel
 
 from agents.validation_agents import VALIDATOR, COMPLIANCE_REPORTER, create_validation_agents
+from agents.history_reducer import ReducingAgentGroupChat, create_history_reducer
+from agents.selection_strategy import RuleBasedSelectionStrategy, ValidationProgress, use_llm_selection
 
-def setup_validation_chat(kernel: Kernel) -> AgentGroupChat:
+def setup_validation_chat(
+    kernel: Kernel,
+    llm_selection: Optional[bool] = None,
+    item_count: Optional[int] = None
+) -> AgentGroupChat:
     """
     Configure and return the agent group chat for document validation workflow
     
     Args:
         kernel: The Semantic Kernel instance to use
+        llm_selection: Use the LLM to pick the next agent on every turn instead
+                       of the rule-based strategy. Defaults to AGENT_SELECTION_MODE.
+        item_count: Number of checklist items to validate. The rule-based
+                    strategy returns to the Validator until all are saved.
         
     Returns:
         Configured AgentGroupChat instance ready for document validation
@@ -26,6 +38,24 @@ def setup_validation_chat(kernel: Kernel) -> AgentGroupChat:
     # Create the specialized agents
     validator_agent, reporter_agent = create_validation_agents(kernel)
     
+    if llm_selection is None:
+        llm_selection = use_llm_selection()
+    
+    if not llm_selection:
+        # Hand over after every saved item without an LLM call per turn
+        return ReducingAgentGroupChat(
+            agents=[validator_agent, reporter_agent],
+            chat_history=create_history_reducer(),
+            selection_strategy=RuleBasedSelectionStrategy(
+                initial_agent=validator_agent,
+                worker_name=VALIDATOR,
+                reporter_name=COMPLIANCE_REPORTER,
+                progress=ValidationProgress(item_count) if item_count else None,
+                hand_over_each_result=True,
+                handoff_markers={VALIDATOR: "NEXT"}
+            )
+        )
+    
     # Configure agent selection strategy with a clear prompt
     selection_function = KernelFunctionFromPrompt(
         function_name="validation_agent_selection",
@@ -64,13 +94,15 @@ Selection criteria:
     )
 
     # Create the group chat with our agent selection strategy
-    chat = AgentGroupChat(
+    chat = ReducingAgentGroupChat(
         agents=[validator_agent, reporter_agent],
+        chat_history=create_history_reducer(),
         selection_strategy=KernelFunctionSelectionStrategy(
             initial_agent=validator_agent,
             function=selection_function,
             kernel=kernel,
             history_variable_name="history",
+            history_reducer=create_history_reducer(),
             agent_variable_name="agents",
             result_parser=lambda x: str(x) if x else VALIDATOR
         )
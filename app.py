@@ -13,16 +13,21 @@ import os
 import gradio as gr
 import asyncio
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 
-from models.core import Person, PersonType, DocumentContext
+from models.core import Person, PersonType, DocumentContext, VerificationArtifact
 from services.address_verification_service import AddressVerificationService
 from services.document_service import DocumentService
 from services.export_service import ExportService
+from utils.document_cache import create_document_cache
+from utils.http_client import close_clients
+from utils.people_import import SUPPORTED_EXTENSIONS, iter_people_file, parse_people_text
 from utils.semantic_kernel_setup import create_kernel
-from plugins.telsearch_plugin import TelsearchPlugin
 from plugins.report_plugin import ReportPlugin
+from plugins.telsearch_plugin import close_lookup_cache
+
+DEFAULT_CONCURRENCY_LIMIT = 8  # Requests processed in parallel per event
 
 AZURE_CSS = """
 :root {
@@ -112,19 +117,16 @@ class DocumentGeneratorApp:
     
     def __init__(self):
         """Initialize services and load templates."""
-        # Initialize services
+        # Initialize the shared kernel. Services create per-request plugins
+        # and agent chats on top of it, so concurrent users stay isolated.
         self.kernel = create_kernel()
         
-        # Initialize and register plugins
-        self.telsearch_plugin = TelsearchPlugin()
-        self.report_plugin = ReportPlugin()
-        self.kernel.add_plugin(self.telsearch_plugin, plugin_name="telsearch")
-        self.kernel.add_plugin(self.report_plugin, plugin_name="report")
-        
         # Initialize services with configured kernel
-        self.address_service = AddressVerificationService()
-        self.document_service = DocumentService(self.kernel)
-        self.export_service = ExportService()
+        # Repeat submissions are answered from the content-addressed cache
+        self.document_cache = create_document_cache()
+        self.address_service = AddressVerificationService(self.kernel)
+        self.document_service = DocumentService(self.kernel, cache=self.document_cache)
+        self.export_service = ExportService(cache=self.document_cache)
 
         # Create required directories
         os.makedirs("output", exist_ok=True)
@@ -169,6 +171,9 @@ class DocumentGeneratorApp:
                 Generate legally compliant declarations of commitment for resident requests.
                 """)
             
+            # Verification result of this session, shared by Phase 1 and Phase 2
+            verification_state = gr.State(None)
+            
             # Phase 1: Data Collection
             with gr.Tab("📝 Phase 1: Data Collection"):
                 with gr.Blocks(elem_classes=["card"]):
@@ -206,6 +211,11 @@ class DocumentGeneratorApp:
                         value=self.default_person_list,
                         lines=5
                     )
+                    people_file = gr.File(
+                        label="Or import a people list (CSV/XLSX)",
+                        file_types=list(SUPPORTED_EXTENSIONS),
+                        type="filepath"
+                    )
                     
                     verify_btn = gr.Button("Verify Addresses", elem_classes=["primary-button"])
                     
@@ -256,58 +266,41 @@ class DocumentGeneratorApp:
                     export_status = gr.Markdown()
             
             # Wire up the interface
-            def parse_people_list(text: str) -> List[Person]:
-                """Parse the people list text into Person objects.
-                Handles both "Firstname Lastname" and "Lastname, Firstname" formats."""
-                people = []
-                for line in text.strip().split("\n"):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    try:
-                        # Handle "Lastname, Firstname" format
-                        if "," in line:
-                            lastname, firstname = [part.strip() for part in line.split(",", 1)]
-                        # Handle "Firstname Lastname" format
-                        else:
-                            parts = line.split()
-                            if len(parts) < 2:
-                                raise ValueError(f"Name needs at least two parts: {line}")
-                            firstname = parts[0]
-                            lastname = " ".join(parts[1:])
-                        
-                        people.append(Person(
-                            firstname=firstname,
-                            lastname=lastname,
-                            type=PersonType.REQUESTED
-                        ))
-                    except ValueError:
-                        raise ValueError(f"Invalid format for person: {line}")
+            def collect_people(people_text: str, people_file: Optional[str]) -> List[Person]:
+                """Read the requested people from the uploaded file or, without one, from the text."""
+                if not people_file:
+                    return parse_people_text(people_text)
+                
+                skipped = []
+                people = list(iter_people_file(people_file, skipped))
+                if skipped:
+                    print(f"DEBUG: Skipped {len(skipped)} invalid rows: {'; '.join(skipped[:5])}")
+                if not people:
+                    raise ValueError("No valid names found in the uploaded file")
                 return people
             
+            def create_requestor(req_firstname: str, req_lastname: str) -> Person:
+                """Create the requestor, accepting "Lastname, Firstname" pasted into the first name field."""
+                firstname = req_firstname
+                lastname = req_lastname
+                if "," in firstname:
+                    lastname, firstname = [part.strip() for part in firstname.split(",", 1)]
+                return Person(firstname=firstname, lastname=lastname, type=PersonType.REQUESTOR)
+            
             async def verify_addresses(
                 req_firstname: str,
                 req_lastname: str,
                 gemeinde: str,
-                people_text: str
-            ) -> Tuple[str, List[Tuple[str, str]]]:
-                """Handle address verification."""
+                people_text: str,
+                people_file: Optional[str],
+                previous: Optional[VerificationArtifact]
+            ) -> Tuple[str, List[Tuple[str, str]], Optional[VerificationArtifact]]:
+                """Handle address verification and store the result in the session."""
                 try:
-                    # Create requestor - handle comma format
-                    firstname = req_firstname
-                    lastname = req_lastname
-                    if "," in firstname:  # If someone pasted full name in firstname field
-                        lastname, firstname = [part.strip() for part in firstname.split(",", 1)]
-                    
-                    requestor = Person(
-                        firstname=firstname,
-                        lastname=lastname,
-                        type=PersonType.REQUESTOR
-                    )
+                    requestor = create_requestor(req_firstname, req_lastname)
                     
                     # Parse and validate people list
-                    requested_people = parse_people_list(people_text)
+                    requested_people = collect_people(people_text, people_file)
                     
                     # Create context
                     context = DocumentContext(
@@ -317,8 +310,10 @@ class DocumentGeneratorApp:
                         zweck="Address Verification" 
                     )
                     
-                    # Verify addresses
-                    _, summary, messages = await self.address_service.verify_addresses(context)
+                    # Verify addresses and keep the results for Phase 2
+                    report_plugin = ReportPlugin()
+                    _, summary, messages = await self.address_service.verify_addresses(context, report_plugin)
+                    artifact = self.address_service.create_artifact(context, report_plugin, previous)
                     
                     # Format messages for Gradio chatbot - each message needs to be a tuple of (user, assistant)
                     chat_messages = []
@@ -330,27 +325,24 @@ class DocumentGeneratorApp:
                             # Add as user message with empty assistant message
                             chat_messages.append((msg['content'], None))
                     
-                    return summary, chat_messages
+                    return summary, chat_messages, artifact
                     
                 except Exception as e:
-                    return f"⚠️ Error: {str(e)}", []
+                    return f"⚠️ Error: {str(e)}", [], previous
             
             async def generate_document(
                 req_firstname: str,
                 req_lastname: str,
                 gemeinde: str,
                 zweck: str,
-                people_text: str
-            ) -> str:
-                """Handle document generation."""
+                people_text: str,
+                people_file: Optional[str],
+                previous: Optional[VerificationArtifact]
+            ) -> AsyncIterator[Tuple[str, Optional[VerificationArtifact]]]:
+                """Handle document generation, rendering the text as it streams in."""
                 try:
-                    # First verify addresses to get the latest data
-                    requestor = Person(
-                        firstname=req_firstname,
-                        lastname=req_lastname,
-                        type=PersonType.REQUESTOR
-                    )
-                    requested_people = parse_people_list(people_text)
+                    requestor = create_requestor(req_firstname, req_lastname)
+                    requested_people = collect_people(people_text, people_file)
                     
                     # Create initial context for verification
                     verification_context = DocumentContext(
@@ -360,48 +352,28 @@ class DocumentGeneratorApp:
                         zweck=zweck
                     )
                     
-                    # Verify addresses
-                    await self.address_service.verify_addresses(verification_context)
-                    
-                    # Get structured data from report plugin
-                    verified_requestor = self.address_service.report_plugin.get_requestor()
-                    verified_people = self.address_service.report_plugin.get_requested_people()
-                    
-                    # Create new Person objects with verified data
-                    if verified_requestor:
-                        requestor = Person(
-                            firstname=verified_requestor["firstname"],
-                            lastname=verified_requestor["lastname"],
-                            address=verified_requestor.get("address"),
-                            city=verified_requestor.get("city"),
-                            type=PersonType.REQUESTOR
-                        )
-                    
-                    requested_people = []
-                    for person_data in verified_people:
-                        person = Person(
-                            firstname=person_data["firstname"],
-                            lastname=person_data["lastname"],
-                            address=person_data.get("address"),
-                            city=person_data.get("city"),
-                            type=PersonType.REQUESTED
-                        )
-                        requested_people.append(person)
+                    # Reuse the Phase 1 results; only people not verified there are looked up
+                    report_plugin = ReportPlugin()
+                    await self.address_service.verify_addresses(verification_context, report_plugin, previous)
+                    artifact = self.address_service.create_artifact(verification_context, report_plugin, previous)
                     
                     # Create final context with verified data
                     final_context = DocumentContext(
-                        requestor=requestor,
-                        requested_people=requested_people,
+                        requestor=artifact.get_requestor() or requestor,
+                        requested_people=artifact.get_requested_people(),
                         gemeinde=gemeinde,
                         zweck=zweck
                     )
                     
-                    # Generate document
-                    document = await self.document_service.generate_document(final_context)
-                    return document
+                    # Stream the document into the TextArea
+                    document = ""
+                    async for chunk in self.document_service.generate_document_stream(final_context):
+                        document += chunk
+                        yield document, artifact
+                    yield document.strip(), artifact
                     
                 except Exception as e:
-                    return f"⚠️ Error during document generation: {str(e)}"
+                    yield f"⚠️ Error during document generation: {str(e)}", previous
             
             async def validate_document(document_text: str) -> Tuple[str, List[Tuple[str, str]]]:
                 """Handle document validation."""
@@ -428,7 +400,7 @@ class DocumentGeneratorApp:
                     date = datetime.now().strftime("%d.%m.%Y")
                     
                     # Convert to Word
-                    _, output_path = self.export_service.markdown_to_docx(
+                    _, output_path = await self.export_service.markdown_to_docx_async(
                         document_text,
                         date=date
                     )
@@ -443,14 +415,14 @@ class DocumentGeneratorApp:
             # Connect components
             verify_btn.click(
                 fn=verify_addresses,
-                inputs=[req_firstname, req_lastname, gemeinde, people_list],
-                outputs=[verification_output, verification_chat]
+                inputs=[req_firstname, req_lastname, gemeinde, people_list, people_file, verification_state],
+                outputs=[verification_output, verification_chat, verification_state]
             )
             
             generate_btn.click(
                 fn=generate_document,
-                inputs=[req_firstname, req_lastname, gemeinde, zweck, people_list],
-                outputs=document_text
+                inputs=[req_firstname, req_lastname, gemeinde, zweck, people_list, people_file, verification_state],
+                outputs=[document_text, verification_state]
             )
             
             validate_btn.click(
@@ -471,12 +443,20 @@ def main():
     """Start the application server."""
     app = DocumentGeneratorApp()
     interface = app.create_interface()
-    interface.queue()
-    interface.launch(
-        server_name="0.0.0.0",
-        server_port=7860,
-        share=False
+    # Requests no longer share mutable state, so they can run concurrently
+    interface.queue(
+        default_concurrency_limit=int(os.environ.get("GRADIO_CONCURRENCY_LIMIT", DEFAULT_CONCURRENCY_LIMIT))
     )
+    try:
+        interface.launch(
+            server_name="0.0.0.0",
+            server_port=7860,
+            share=False
+        )
+    finally:
+        # Write pending cache bookkeeping, release the SQLite file and close pooled connections
+        close_lookup_cache()
+        asyncio.run(close_clients())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+batch.py - Command line runner for batches of document requests
+
+Runs verification, generation, validation and export for every request of a
+manifest without the web interface, e.g. overnight:
+
+    python batch.py requests.json --output-dir output/batch --workers 4
+
+Progress is checkpointed per request and phase; running the same command
+again resumes an interrupted batch. The results are listed in index.json in
+the output directory.
+"""
+
+import argparse
+import asyncio
+import sys
+from dotenv import load_dotenv
+
+from plugins.telsearch_plugin import close_lookup_cache
+from services.address_verification_service import AddressVerificationService
+from services.batch_service import DEFAULT_BATCH_OUTPUT_DIR, STATUS_DONE, BatchService, load_manifest
+from services.document_service import DocumentService
+from services.export_service import ExportService
+from utils.document_cache import create_document_cache
+from utils.http_client import close_clients
+from utils.semantic_kernel_setup import create_kernel
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description="Generate documents for a manifest of requests.")
+    parser.add_argument("manifest", help="JSON or JSON Lines file with the requests")
+    parser.add_argument("--output-dir", default=DEFAULT_BATCH_OUTPUT_DIR,
+                        help="Directory for documents, checkpoints and index.json")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Requests processed at the same time (default: BATCH_MAX_WORKERS or 4)")
+    parser.add_argument("--date", default=None,
+                        help="Date inserted into the documents as DD.MM.YYYY (default: today)")
+    return parser.parse_args(argv)
+
+async def run(args: argparse.Namespace) -> int:
+    """Process the manifest and return the number of failed requests."""
+    requests = load_manifest(args.manifest)
+
+    # Shared services, set up as in the web application
+    kernel = create_kernel()
+    cache = create_document_cache()
+    service = BatchService(
+        AddressVerificationService(kernel),
+        DocumentService(kernel, cache=cache),
+        ExportService(cache=cache),
+        output_dir=args.output_dir,
+        max_workers=args.workers
+    )
+
+    try:
+        entries = await service.run(requests, date=args.date)
+    finally:
+        # Close pooled connections while the event loop is still running
+        await close_clients()
+
+    failed = [entry for entry in entries if entry["status"] != STATUS_DONE]
+    print(f"Processed {len(entries)} requests, {len(failed)} failed. Index: {service.index_path}")
+    for entry in failed:
+        print(f"- {entry['id']}: {entry['error']}")
+    return len(failed)
+
+def main():
+    """Run the batch from the command line."""
+    load_dotenv()
+    args = parse_args()
+    try:
+        failed = asyncio.run(run(args))
+    finally:
+        close_lookup_cache()
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -2,4 +2,8 @@
 models package - Data structures for document generation system
 """
 
-from .core import Person, PersonType, DocumentContext, MAX_MESSAGE_COUNT, COMPLETION_MARKER
\ No newline at end of file
+from .core import (
+    Person, PersonType, DocumentContext, AddressEntry, VerificationArtifact, name_key,
+    ValidationMode, ChecklistItem,
+    MAX_MESSAGE_COUNT, COMPLETION_MARKER
+)
\ No newline at end of file
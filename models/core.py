@@ -14,6 +14,12 @@ class PersonType(Enum):
     REQUESTOR = "requestor"
     REQUESTED = "requested"
 
+class ValidationMode(Enum):
+    """How a document is checked against the validation checklist"""
+    CHAT = "chat"  # Sequential Validator/ComplianceReporter dialogue
+    PARALLEL = "parallel"  # One concurrent LLM call per checklist item
+    STRUCTURED = "structured"  # One schema-constrained LLM call for the whole checklist
+
 @dataclass
 class Person:
     """
@@ -95,6 +101,125 @@ class DocumentContext:
                 
         return result
 
+@dataclass
+class AddressEntry:
+    """
+    A single result entry returned by an address source such as tel.search.ch.
+    """
+    title: str = ""
+    name: str = ""
+    firstname: str = ""
+    street: str = ""
+    streetno: str = ""
+    zip: str = ""
+    city: str = ""
+    phone: str = ""
+    content: str = ""
+
+    @property
+    def street_address(self) -> str:
+        """Get street and house number, e.g. 'Bahnhofstrasse 10'"""
+        return f"{self.street} {self.streetno}".strip()
+
+    @property
+    def zip_city(self) -> str:
+        """Get postal code and city, e.g. '8001 Zürich'"""
+        return f"{self.zip} {self.city}".strip()
+
+    def to_address_dict(self) -> Dict[str, str]:
+        """
+        Get the non-empty address components.
+        
+        Returns:
+            Dict with any of the keys street, streetno, zip and city
+        """
+        fields = {
+            "street": self.street,
+            "streetno": self.streetno,
+            "zip": self.zip,
+            "city": self.city
+        }
+        return {key: value for key, value in fields.items() if value}
+
+@dataclass
+class ChecklistItem:
+    """
+    A single question of the validation checklist.
+    """
+    section: str
+    item: str
+    position: int = 0  # Order of the item in the checklist
+
+def name_key(firstname: str, lastname: str) -> str:
+    """
+    Get a normalized key for matching a person across phases.
+    
+    The key ignores case and extra whitespace, e.g. "hans  MEIER" and
+    "Hans Meier" map to the same key.
+    """
+    return " ".join(f"{firstname} {lastname}".casefold().split())
+
+@dataclass
+class VerificationArtifact:
+    """
+    Result of an address verification run, kept per session so later phases
+    can reuse verified addresses instead of verifying again.
+    
+    people holds the ReportPlugin format: dicts with firstname, lastname,
+    address, city and type. version is increased on every verification run
+    of the session.
+    """
+    gemeinde: str
+    people: List[Dict]
+    version: int = 1
+
+    def matches_location(self, gemeinde: str) -> bool:
+        """Check whether the artifact was verified for the given municipality"""
+        return self.gemeinde.strip().casefold() == gemeinde.strip().casefold()
+
+    def lookup(self, person: Person) -> Optional[Dict]:
+        """
+        Find the verified data of a person.
+        
+        People reported as NOT FOUND are returned as well (address None), so
+        unchanged inputs are not verified again. A fresh verification run
+        (Phase 1) is the explicit way to retry them.
+        
+        Args:
+            person: Person to look up, matched by name and type
+            
+        Returns:
+            The stored person data or None if the person was not verified
+        """
+        key = name_key(person.firstname, person.lastname)
+        for data in self.people:
+            if data.get("type") == person.type.value and name_key(data["firstname"], data["lastname"]) == key:
+                return data
+        return None
+
+    def get_requestor(self) -> Optional[Person]:
+        """Get the verified requestor, or None if not part of the artifact"""
+        people = self._to_people(PersonType.REQUESTOR)
+        return people[0] if people else None
+
+    def get_requested_people(self) -> List[Person]:
+        """Get the verified requested people in verification order"""
+        return self._to_people(PersonType.REQUESTED)
+
+    def _to_people(self, person_type: PersonType) -> List[Person]:
+        """Convert the stored data of one person type into Person objects"""
+        return [
+            Person(
+                firstname=data["firstname"],
+                lastname=data["lastname"],
+                address=data.get("address"),
+                city=data.get("city"),
+                type=person_type
+            )
+            for data in self.people
+            if data.get("type") == person_type.value
+        ]
+
 # Constants used across the application
 MAX_MESSAGE_COUNT = 20  # Maximum number of messages in agent chat
 COMPLETION_MARKER = "COMPLETE"  # Marker used by agents to signal completion
\ No newline at end of file
@@ -2,11 +2,13 @@
 plugins/compliance_plugin.py - Plugin for storing and managing compliance validation results
 
 This plugin stores validation results from document compliance checks and provides
-methods to access and manage this data.
+methods to access and manage this data. Results may be added concurrently by
+parallel validation tasks.
 """
 
 import json
-from typing import Annotated, Dict, List, Union
+import threading
+from typing import Annotated, Dict, List, Optional, Sequence, Union
 from semantic_kernel.functions.kernel_function_decorator import kernel_function
 
 class CompliancePlugin:
@@ -16,11 +18,98 @@ class CompliancePlugin:
         """Initialize with empty validation results."""
         self.compliance_items = []  # List of validation items checked
         self.is_complete = False  # Flag to track if validation is complete
+        self._lock = threading.Lock()  # Guards compliance_items for concurrent writers
         
     def reset(self):
         """Reset the stored data."""
-        self.compliance_items = []
-        self.is_complete = False
+        with self._lock:
+            self.compliance_items = []
+            self.is_complete = False
+    
+    def _check_result(self, data: Dict) -> Optional[str]:
+        """
+        Check a validation result for required fields and a valid status.
+        
+        Returns:
+            Error message, or None if the result is valid
+        """
+        required = ["section", "item", "status"]
+        if not all(field in data for field in required):
+            missing = [f for f in required if f not in data]
+            return f"Error: Missing required fields {missing}"
+        
+        if data["status"] not in ["passed", "failed"]:
+            return f"Error: status must be 'passed' or 'failed', got {data['status']}"
+        
+        return None
+    
+    def add_result(self, data: Dict) -> str:
+        """
+        Validate and store a single result. Safe to call from concurrent tasks.
+        
+        Args:
+            data: Validation result {section, item, status, details}
+            
+        Returns:
+            Success message or error
+        """
+        if not isinstance(data, dict):
+            return f"Error: validation result must be an object, got {type(data)}"
+        
+        error = self._check_result(data)
+        if error:
+            return error
+        
+        data = dict(data)
+        # Add optional details field if not present
+        data.setdefault("details", None)
+        
+        with self._lock:
+            self.compliance_items.append(data)
+        return f"Successfully saved validation result for {data['section']}: {data['item']}"
+    
+    def add_results(self, results: List[Dict]) -> str:
+        """
+        Validate and store several results at once.
+        
+        Nothing is stored if any result is invalid, so a run never ends up
+        with a partial checklist.
+        
+        Args:
+            results: Validation results {section, item, status, details}
+            
+        Returns:
+            Success message or error
+        """
+        if not isinstance(results, list):
+            return f"Error: validation results must be a list, got {type(results)}"
+        
+        for index, data in enumerate(results):
+            if not isinstance(data, dict):
+                return f"Error: result {index} must be an object, got {type(data)}"
+            error = self._check_result(data)
+            if error:
+                return f"{error} (result {index})"
+        
+        items = [dict(data) for data in results]
+        for data in items:
+            data.setdefault("details", None)
+        
+        with self._lock:
+            self.compliance_items.extend(items)
+        return f"Successfully saved {len(items)} validation results"
+    
+    def sort_results(self, item_order: Sequence[str]):
+        """
+        Sort the results into checklist order, e.g. after parallel validation.
+        
+        Args:
+            item_order: Checklist item texts in the desired order. Results for
+                        unknown items are kept at the end.
+        """
+        positions = {item: index for index, item in enumerate(item_order)}
+        with self._lock:
+            self.compliance_items.sort(key=lambda r: positions.get(r["item"], len(positions)))
     
     @kernel_function(
         name="save_validation_result",
@@ -46,27 +135,31 @@ class CompliancePlugin:
             except json.JSONDecodeError as e:
                 return f"Error parsing JSON data: {str(e)}. Input was: {validation_data}"
             
-            # Validate required fields
-            required = ["section", "item", "status"]
-            if not all(field in data for field in required):
-                missing = [f for f in required if f not in data]
-                return f"Error: Missing required fields {missing}"
-            
-            # Validate status value
-            if data["status"] not in ["passed", "failed"]:
-                return f"Error: status must be 'passed' or 'failed', got {data['status']}"
-            
-            # Add optional details field if not present
-            if "details" not in data:
-                data["details"] = None
-            
-            # Add to results list
-            self.compliance_items.append(data)
-            return f"Successfully saved validation result for {data['section']}: {data['item']}"
+            return self.add_result(data)
             
         except Exception as e:
             return f"Error: {str(e)}"
     
+    @kernel_function(
+        name="save_validation_results",
+        description="Save the results of all checklist items at once"
+    )
+    def save_validation_results(
+        self,
+        validation_data: Annotated[str, "JSON array of validation data [{section, item, status, details}]"]
+    ) -> str:
+        """
+        Save a list of validation check results in one call.
+        Expected format: JSON array with validation details
+        Returns: Success message or error
+        """
+        try:
+            data = json.loads(validation_data)
+        except (TypeError, json.JSONDecodeError) as e:
+            return f"Error parsing JSON data: {str(e)}"
+        
+        return self.add_results(data)
+    
     @kernel_function(
         name="mark_validation_complete",
         description="Mark the validation process as complete"
@@ -2,86 +2,474 @@
 plugins/telsearch_plugin.py - Plugin for Swiss address and phone lookup using tel.search.ch
 
 This plugin interfaces with the tel.search.ch API to look up and validate
-Swiss addresses and phone numbers.
+Swiss addresses and phone numbers. The lookups can also be answered by a
+local snapshot of the resident register (see utils/register_source.py).
 """
 
-import requests
+import asyncio
+import json
 import re
 import os
-from typing import Annotated, Dict, Optional, Tuple
+import threading
+from typing import Annotated, Dict, List, Optional, Tuple
+import httpx
 from dotenv import load_dotenv
 from semantic_kernel.functions.kernel_function_decorator import kernel_function
 
-class TelsearchPlugin:
+from models.core import AddressEntry
+from utils.address_source import SOURCE_REGISTER, SOURCE_TELSEARCH, AddressSource
+from utils.atom_feed import parse_entries
+from utils.candidate_ranking import RankedCandidate, rank_candidates
+from utils.http_client import DEFAULT_TIMEOUT, get_async_client, get_sync_client
+from utils.lookup_cache import DEFAULT_TTL, LookupCache
+from utils.rate_limiter import TokenBucket
+from utils.register_source import create_register_source
+
+DEFAULT_CACHE_PATH = os.path.join("cache", "telsearch.sqlite3")
+DEFAULT_MAX_CONCURRENCY = 8  # Parallel lookups in a batch
+DEFAULT_RATE_LIMIT = 10.0  # API requests per second
+DEFAULT_DEADLINE = 15.0  # Seconds a single lookup in a batch may take
+DEFAULT_TOP_K = 3  # Candidates returned per lookup in compact mode
+
+_shared_cache: Optional[LookupCache] = None
+_shared_cache_lock = threading.Lock()
+
+def create_lookup_cache() -> LookupCache:
     """
-    A plugin to call the tel.search.ch API for looking up Swiss addresses and phone numbers.
-    Uses the public API endpoint that doesn't require authentication.
-    Returns results in Atom feed format.
+    Create the lookup cache configured by environment variables.
+    
+    TELSEARCH_CACHE_PATH sets the SQLite file (empty for memory-only) and
+    TELSEARCH_CACHE_TTL the lifetime of an entry in seconds.
     """
+    load_dotenv()
+    path = os.environ.get("TELSEARCH_CACHE_PATH", DEFAULT_CACHE_PATH)
+    ttl = float(os.environ.get("TELSEARCH_CACHE_TTL", DEFAULT_TTL))
+    return LookupCache(path=path or None, ttl=ttl, namespace="telsearch")
 
-    def __init__(self):
-        """Initialize the plugin with the tel.search.ch API base URL"""
+def get_lookup_cache() -> LookupCache:
+    """
+    Return the process-wide lookup cache, creating it on first use.
+    
+    All plugins share it, so there is one SQLite connection and one memory
+    tier per process instead of one per plugin instance.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = create_lookup_cache()
+        return _shared_cache
+
+def close_lookup_cache():
+    """Close the shared lookup cache, e.g. on application shutdown."""
+    global _shared_cache
+    with _shared_cache_lock:
+        cache, _shared_cache = _shared_cache, None
+    if cache is not None:
+        cache.close()
+
+def cache_key(name: str, location: str) -> str:
+    """Build a cache key that ignores case and surplus whitespace."""
+    return f"{' '.join(name.split()).casefold()}|{' '.join(location.split()).casefold()}"
+
+class TelsearchSource(AddressSource):
+    """
+    Address source calling the tel.search.ch API.
+    
+    HTTP connections are taken from a shared keep-alive pool (see
+    utils/http_client.py), so all instances reuse the same sockets, and
+    outgoing requests are throttled by a token bucket.
+    """
+    
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, rate_limit: Optional[float] = None):
+        """
+        Initialize the source with the tel.search.ch API base URL
+        
+        Args:
+            timeout: Timeout in seconds for a single API request
+            rate_limit: Maximum API requests per second, 0 to disable
+                        (env TELSEARCH_RATE_LIMIT)
+        """
         self.base_url = "https://search.ch/tel/api/"
+        self.timeout = timeout
         # Load environment variables for possible API key
         load_dotenv()
         self.api_key = os.environ.get("TELSEARCH_API_KEY")
+        
+        if rate_limit is None:
+            rate_limit = float(os.environ.get("TELSEARCH_RATE_LIMIT", DEFAULT_RATE_LIMIT))
+        self.rate_limiter = TokenBucket(rate_limit)
+
+    def _build_params(self, name: str, location: str) -> Dict[str, object]:
+        """Build the query parameters for a tel.search.ch lookup."""
+        params = {
+            "was": name,
+            "wo": location,
+            "maxnum": 10  # Return up to 10 results
+        }
+        
+        # Add API key if available
+        if self.api_key:
+            params["key"] = self.api_key
+            print(f"DEBUG: Using API key: {self.api_key[:5]}...")
+        
+        return params
+    
+    def _handle_response(self, resp: httpx.Response) -> str:
+        """Turn an API response into the Atom feed text or an error string."""
+        print(f"DEBUG: Response status code: {resp.status_code}")
+        
+        # Print a sample of the response for debugging
+        resp_sample = resp.text[:200] + "..." if len(resp.text) > 200 else resp.text
+        print(f"DEBUG: Response sample: {resp_sample}")
+        
+        if resp.status_code != 200:
+            return f'{{"error":"Telsearch returned {resp.status_code}"}}'
+        
+        print(f"DEBUG: Found {resp.text.count('<entry')} entries in response")
+        return resp.text
+    
+    async def fetch_feed_async(self, name: str, location: str) -> str:
+        """
+        Request the Atom feed on the shared async connection pool, so a slow
+        response does not block the event loop serving other sessions.
+        
+        Args:
+            name: Name of the person to search for
+            location: Location/municipality to search within
+            
+        Returns:
+            Atom feed XML as string or error message
+        """
+        params = self._build_params(name, location)
+        
+        try:
+            print(f"DEBUG: Requesting URL: {self.base_url} with params: {params}")
+            await self.rate_limiter.acquire()
+            resp = await get_async_client().get(self.base_url, params=params, timeout=self.timeout)
+            return self._handle_response(resp)
+        except Exception as e:
+            print(f"DEBUG: Error during API call: {str(e)}")
+            return f'{{"error":"Exception occurred: {str(e)}"}}'
+    
+    def fetch_feed(self, name: str, location: str) -> str:
+        """
+        Blocking variant of fetch_feed_async.
+        
+        Args:
+            name: Name of the person to search for
+            location: Location/municipality to search within
+            
+        Returns:
+            Atom feed XML as string or error message
+        """
+        params = self._build_params(name, location)
+        
+        try:
+            print(f"DEBUG: Requesting URL: {self.base_url} with params: {params}")
+            self.rate_limiter.acquire_sync()
+            resp = get_sync_client().get(self.base_url, params=params, timeout=self.timeout)
+            return self._handle_response(resp)
+        except Exception as e:
+            print(f"DEBUG: Error during API call: {str(e)}")
+            return f'{{"error":"Exception occurred: {str(e)}"}}'
+
+def create_address_source(timeout: float = DEFAULT_TIMEOUT, rate_limit: Optional[float] = None) -> AddressSource:
+    """
+    Create the address source configured by environment variables.
+    
+    ADDRESS_SOURCE selects "telsearch" (default) or "register". The register
+    source reads the snapshot at REGISTER_SNAPSHOT_PATH.
+    
+    Args:
+        timeout: Timeout in seconds for a single tel.search.ch request
+        rate_limit: Maximum tel.search.ch requests per second
+        
+    Raises:
+        ValueError: If the source is unknown or the register snapshot is not configured
+    """
+    load_dotenv()
+    kind = os.environ.get("ADDRESS_SOURCE", SOURCE_TELSEARCH).strip().lower()
+    if kind == SOURCE_TELSEARCH:
+        return TelsearchSource(timeout=timeout, rate_limit=rate_limit)
+    if kind == SOURCE_REGISTER:
+        return create_register_source()
+    raise ValueError(f"Unknown address source: {kind}")
+
+class TelsearchPlugin:
+    """
+    A plugin to look up Swiss addresses and phone numbers, by default with the
+    tel.search.ch API. Uses the public API endpoint that doesn't require authentication.
+    Returns a compact JSON candidate list by default; the raw Atom feed is
+    available on request.
+    
+    The lookups themselves are done by an address source (see
+    utils/address_source.py), e.g. a local snapshot of the resident register
+    instead of tel.search.ch; the kernel functions are the same for all sources.
+    Successful responses of remote sources are cached per (name, location).
+    """
 
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        cache: Optional[LookupCache] = None,
+        max_concurrency: Optional[int] = None,
+        rate_limit: Optional[float] = None,
+        top_k: int = DEFAULT_TOP_K,
+        source: Optional[AddressSource] = None
+    ):
+        """
+        Initialize the plugin with its address source
+        
+        Args:
+            timeout: Timeout in seconds for a single API request
+            cache: Lookup cache to use. If not provided, the shared cache
+                   is used (see get_lookup_cache).
+            max_concurrency: Maximum parallel lookups in a batch
+                             (env TELSEARCH_MAX_CONCURRENCY)
+            rate_limit: Maximum API requests per second, 0 to disable
+                        (env TELSEARCH_RATE_LIMIT)
+            top_k: Maximum candidates returned per lookup in compact mode
+            source: Address source answering the lookups. If not provided,
+                    one is created from the environment (see create_address_source).
+        """
+        self.source = source if source is not None else create_address_source(timeout, rate_limit)
+        self.cache = cache if cache is not None else get_lookup_cache()
+        
+        if max_concurrency is None:
+            max_concurrency = int(os.environ.get("TELSEARCH_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY))
+        self.max_concurrency = max(1, max_concurrency)
+        self.top_k = top_k
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """Return hit/miss counters of the lookup cache."""
+        return self.cache.stats()
+    
+    async def fetch_feed_async(self, name: str, location: str) -> str:
+        """
+        Returns the raw lookup result as an Atom feed if found.
+        If an error occurs, returns a JSON-like string with 'error'.
+        
+        Args:
+            name: Name of the person to search for
+            location: Location/municipality to search within
+            
+        Returns:
+            Atom feed XML as string or error message
+        """
+        print(f"DEBUG: Searching for '{name}' in '{location}'")
+        if not self.source.cacheable:
+            return await self.source.fetch_feed_async(name, location)
+        
+        key = cache_key(name, location)
+        cached = await self.cache.get_async(key)
+        if cached is not None:
+            print(f"DEBUG: Cache hit for '{name}' in '{location}'")
+            return cached
+        
+        result = await self.source.fetch_feed_async(name, location)
+        if "<feed" in result:
+            await self.cache.set_async(key, result)
+        return result
+    
+    def fetch_feed(self, name: str, location: str) -> str:
+        """
+        Blocking variant of fetch_feed_async for callers outside an event loop.
+        
+        Args:
+            name: Name of the person to search for
+            location: Location/municipality to search within
+            
+        Returns:
+            Atom feed XML as string or error message
+        """
+        print(f"DEBUG: Searching for '{name}' in '{location}'")
+        if not self.source.cacheable:
+            return self.source.fetch_feed(name, location)
+        
+        key = cache_key(name, location)
+        cached = self.cache.get(key)
+        if cached is not None:
+            print(f"DEBUG: Cache hit for '{name}' in '{location}'")
+            return cached
+        
+        result = self.source.fetch_feed(name, location)
+        if "<feed" in result:
+            self.cache.set(key, result)
+        return result
+    
+    def compact_results(self, xml_response: str, name: Optional[str] = None, location: Optional[str] = None) -> str:
+        """
+        Reduce an API response to a token-minimal JSON list of candidates.
+        
+        If the requested name is given, all entries are ranked by their
+        similarity to it and each candidate carries its confidence score.
+        
+        Args:
+            xml_response: Atom feed or error string from fetch_feed
+            name: Requested name to rank the entries by
+            location: Requested municipality to rank the entries by
+            
+        Returns:
+            JSON array of {name, street, no, zip, city[, score]} objects (at
+            most top_k), "[]" if nothing was found, or the error string unchanged
+        """
+        if "<feed" not in xml_response:
+            return xml_response
+        
+        if name:
+            ranked = self.rank_entries(xml_response, name, location or "")[:self.top_k]
+            scored = [(candidate.entry, round(candidate.confidence)) for candidate in ranked]
+        else:
+            scored = [(entry, None) for entry in self.parse_entries(xml_response, limit=self.top_k)]
+        
+        candidates = []
+        for entry, score in scored:
+            candidate = {
+                "name": f"{entry.firstname} {entry.name}".strip() or entry.title,
+                "street": entry.street,
+                "no": entry.streetno,
+                "zip": entry.zip,
+                "city": entry.city
+            }
+            if score is not None:
+                candidate["score"] = score
+            candidates.append(candidate)
+        return json.dumps(candidates, ensure_ascii=False, separators=(",", ":"))
+    
+    def rank_entries(self, xml_response: str, name: str, location: str) -> List[RankedCandidate]:
+        """
+        Score all entries of a response against the requested person.
+        
+        Args:
+            xml_response: Atom feed or error string from fetch_feed
+            name: Requested name
+            location: Requested municipality
+            
+        Returns:
+            Candidates ordered by confidence, best first; empty on errors
+        """
+        return rank_candidates(name, location, self.parse_entries(xml_response))
+    
     @kernel_function(
         name="search_person",
-        description="Search for a person's contact information in a given Swiss location using tel.search.ch"
+        description=(
+            "Search for a person's address in a given Swiss location using tel.search.ch. "
+            "Returns a JSON list of candidates, best match first with a confidence score (0-100), "
+            "an empty list if nobody was found."
+        )
     )
-    def search_person(
+    async def search_person_async(
         self,
         name: Annotated[str, "Name to search for"],
-        location: Annotated[str, "Location to search in (e.g. Zurich, Basel)"]
+        location: Annotated[str, "Location to search in (e.g. Zurich, Basel)"],
+        raw: Annotated[bool, "Return the raw Atom feed instead of the candidate list"] = False
     ) -> str:
         """
-        Returns the raw API result as an Atom feed if found.
-        If an error occurs, returns a JSON-like string with 'error'.
+        Look up a person and return the compact candidate list or the raw feed.
         
         Args:
             name: Name of the person to search for
             location: Location/municipality to search within
+            raw: Return the full Atom feed instead of the compact payload
             
         Returns:
-            Atom feed XML as string or error message
+            JSON candidate list, Atom feed XML or error message
         """
-        print(f"DEBUG: Searching for '{name}' in '{location}'")
+        result = await self.fetch_feed_async(name, location)
+        return result if raw else self.compact_results(result, name, location)
+    
+    def search_person(self, name: str, location: str, raw: bool = False) -> str:
+        """
+        Blocking variant of search_person_async for callers outside an event loop.
         
-        params = {
-            "was": name,
-            "wo": location,
-            "maxnum": 10  # Return up to 10 results
-        }
+        Args:
+            name: Name of the person to search for
+            location: Location/municipality to search within
+            raw: Return the full Atom feed instead of the compact payload
+            
+        Returns:
+            JSON candidate list, Atom feed XML or error message
+        """
+        result = self.fetch_feed(name, location)
+        return result if raw else self.compact_results(result, name, location)
+    
+    async def lookup_many(
+        self,
+        names: List[str],
+        location: str,
+        deadline: float = DEFAULT_DEADLINE
+    ) -> List[str]:
+        """
+        Look up many names concurrently.
         
-        # Add API key if available
-        if self.api_key:
-            params["key"] = self.api_key
-            print(f"DEBUG: Using API key: {self.api_key[:5]}...")
+        At most max_concurrency lookups run at the same time and each one is
+        cancelled after the given deadline.
         
-        try:
-            url = self.base_url
-            print(f"DEBUG: Requesting URL: {url} with params: {params}")
-            
-            resp = requests.get(url, params=params, timeout=10)
-            print(f"DEBUG: Response status code: {resp.status_code}")
+        Args:
+            names: Names of the people to search for
+            location: Location/municipality to search within
+            deadline: Seconds a single lookup may take
             
-            # Print a sample of the response for debugging
-            resp_sample = resp.text[:200] + "..." if len(resp.text) > 200 else resp.text
-            print(f"DEBUG: Response sample: {resp_sample}")
+        Returns:
+            Atom feed XML or error message per name, in input order
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def lookup(name: str) -> str:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(self.fetch_feed_async(name, location), timeout=deadline)
+                except asyncio.TimeoutError:
+                    print(f"DEBUG: Lookup for '{name}' exceeded deadline of {deadline}s")
+                    return f'{{"error":"Lookup timed out after {deadline}s"}}'
+        
+        return await asyncio.gather(*[lookup(name) for name in names])
+    
+    @kernel_function(
+        name="search_people",
+        description="Search for several people at once in a given Swiss location using tel.search.ch"
+    )
+    async def search_people(
+        self,
+        names: Annotated[List[str], "Names to search for, each as 'FirstName LastName'"],
+        location: Annotated[str, "Location to search in (e.g. Zurich, Basel)"],
+        raw: Annotated[bool, "Return the raw Atom feeds instead of the candidate lists"] = False
+    ) -> str:
+        """
+        Look up a list of people in a single tool call.
+        
+        Args:
+            names: Names of the people to search for
+            location: Location/municipality to search within
+            raw: Return the full Atom feeds instead of the compact payloads
             
-            if resp.status_code != 200:
-                return f'{{"error":"Telsearch returned {resp.status_code}"}}'
+        Returns:
+            JSON array of {name, result} objects in input order, where result
+            is the candidate list (or the raw feed if requested)
+        """
+        results = await self.lookup_many(names, location)
+        if not raw:
+            results = [self.compact_results(result, name, location) for name, result in zip(names, results)]
+            results = [json.loads(r) if r.startswith("[") else r for r in results]
+        return json.dumps(
+            [{"name": name, "result": result} for name, result in zip(names, results)],
+            ensure_ascii=False
+        )
+    
+    def parse_entries(self, xml_response: str, limit: Optional[int] = None) -> List[AddressEntry]:
+        """
+        Parse all entries of a tel.search.ch Atom feed response.
+        
+        Args:
+            xml_response: The XML response from tel.search.ch API
+            limit: Maximum number of entries to read
             
-            # Extract entry titles for debugging
-            entry_titles = re.findall(r"<entry>.*?<title[^>]*>(.*?)</title>", resp.text, re.DOTALL)
-            if entry_titles:
-                print(f"DEBUG: Found entry titles: {entry_titles}")
-                print(f"DEBUG: ResponseText: {resp.text}...")
-            return resp.text
-        except Exception as e:
-            print(f"DEBUG: Error during API call: {str(e)}")
-            return f'{{"error":"Exception occurred: {str(e)}"}}'
+        Returns:
+            List of entries in feed order, empty on errors or no results
+        """
+        if not xml_response or "<feed" not in xml_response:
+            return []
+        return parse_entries(xml_response, limit=limit)
     
     def parse_address(self, xml_response: str) -> Optional[Dict[str, str]]:
         """
@@ -101,61 +489,39 @@ class TelsearchPlugin:
         if "<feed" not in xml_response:
             print(f"DEBUG: Response does not appear to be a valid Atom feed")
             return None
-            
-        # Check for entries
-        entries_count = xml_response.count("<entry")
-        print(f"DEBUG: Found {entries_count} entries in response")
         
-        if entries_count == 0:
+        # Only the first entry is needed, so stop parsing after it
+        entries = self.parse_entries(xml_response, limit=1)
+        if not entries:
             print("DEBUG: No entries found in response")
             return None
-            
-        # Extract first entry
-        entry_match = re.search(r"<entry>(.*?)</entry>", xml_response, re.DOTALL)
-        if not entry_match:
-            print("DEBUG: Could not extract entry from XML")
-            return None
-            
-        entry_content = entry_match.group(1)
-        print(f"DEBUG: Processing entry: {entry_content[:100]}...")
-            
-        address = {}
         
-        # Extract name
-        name_match = re.search(r"<title[^>]*>(.*?)</title>", entry_content)
-        if name_match:
-            print(f"DEBUG: Found name: {name_match.group(1)}")
+        return self.entry_address(entries[0])
+    
+    def entry_address(self, entry: AddressEntry) -> Optional[Dict[str, str]]:
+        """
+        Extract the address components of a single feed entry.
         
-        # Try to extract address from content field
-        content_match = re.search(r"<content[^>]*>(.*?)</content>", entry_content, re.DOTALL)
-        if content_match:
-            content = content_match.group(1)
-            print(f"DEBUG: Found content: {content}")
+        Args:
+            entry: Parsed feed entry
             
-            # Parse address components
+        Returns:
+            Dictionary with address components or None if the entry has none
+        """
+        print(f"DEBUG: Processing entry: {entry.title}")
+        
+        # Prefer the structured tel: fields
+        address = entry.to_address_dict()
+        
+        # Otherwise try to extract the address from the content field
+        if not address and entry.content:
             address_pattern = r"([^,\d]+)\s+(\d+),\s*(\d{4})\s+([^,]+)"
-            addr_match = re.search(address_pattern, content)
+            addr_match = re.search(address_pattern, entry.content)
             if addr_match:
                 address["street"] = addr_match.group(1).strip()
                 address["streetno"] = addr_match.group(2).strip()
                 address["zip"] = addr_match.group(3).strip()
                 address["city"] = addr_match.group(4).strip()
-                print(f"DEBUG: Extracted address from content: {address}")
-        
-        # If content parsing failed, try to extract structured fields
-        if not address:
-            # Extract address components from XML tags
-            fields_to_extract = {
-                "street": r"<tel:street>(.*?)</tel:street>",
-                "streetno": r"<tel:streetno>(.*?)</tel:streetno>",
-                "zip": r"<tel:zip>(.*?)</tel:zip>",
-                "city": r"<tel:city>(.*?)</tel:city>"
-            }
-            
-            for field, pattern in fields_to_extract.items():
-                field_match = re.search(pattern, xml_response)
-                if field_match:
-                    address[field] = field_match.group(1)
         
         print(f"DEBUG: Final extracted address components: {address}")
         
@@ -164,14 +530,14 @@ class TelsearchPlugin:
             return address
         
         # Try to extract address from title as last resort
-        title_match = re.search(r"<title[^>]*>.*?(\d{4}\s+[^<]+)</title>", xml_response)
+        title_match = re.search(r"(\d{4}\s+.+)$", entry.title)
         if title_match:
             partial_address = title_match.group(1).strip()
             print(f"DEBUG: Found address in title: {partial_address}")
             return {"partial": partial_address}
         
         return None
-
+    
     def format_address(self, name: str, address_info: Optional[Dict[str, str]]) -> Tuple[str, Optional[str]]:
         """
         Format the name and address data into a standardized string format.
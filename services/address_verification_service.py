@@ -2,49 +2,96 @@
 services/address_verification_service.py - Service for address verification using agent system
 
 This service manages the process of verifying addresses using a multi-agent system
-that interfaces with the tel.search.ch API.
+that interfaces with the tel.search.ch API. Lookups whose best candidate
+matches the requested person with high confidence are resolved directly by a
+deterministic fast path, misspelled names after correcting them with the
+name index; the agent chat only handles the rest.
+People already verified in an earlier run of the session are reused as is.
 """
 
-from typing import Dict, List, Tuple
+import json
+from typing import Dict, List, Optional, Tuple
 from semantic_kernel import Kernel
 from semantic_kernel.agents import AgentGroupChat
 from semantic_kernel.contents import ChatMessageContent
 from semantic_kernel.contents.utils.author_role import AuthorRole
 
-from models.core import Person, DocumentContext, MAX_MESSAGE_COUNT, COMPLETION_MARKER
+from models.core import (
+    Person, PersonType, DocumentContext, VerificationArtifact, MAX_MESSAGE_COUNT, COMPLETION_MARKER, name_key
+)
 from plugins.report_plugin import ReportPlugin
 from plugins.telsearch_plugin import TelsearchPlugin
-from utils.semantic_kernel_setup import create_kernel
+from utils.candidate_ranking import get_confidence_threshold, select_match
+from utils.name_index import NameIndex, create_name_index
+from utils.semantic_kernel_setup import create_kernel, create_job_kernel
 from agents.agent_chat import setup_agent_chat
 
 class AddressVerificationService:
-    """Service for verifying addresses using multi-agent system."""
+    """
+    Service for verifying addresses using multi-agent system.
     
-    def __init__(self):
-        """Initialize service with a new kernel and agent chat."""
-        self.kernel = create_kernel()
+    The service itself only holds shared, stateless parts (kernel services and
+    the telsearch plugin). Each verification run gets its own ReportPlugin and
+    agent chat, so concurrent users do not see each other's results.
+    """
+    
+    def __init__(
+        self,
+        kernel: Optional[Kernel] = None,
+        fast_path: bool = True,
+        match_threshold: Optional[float] = None,
+        name_index: Optional[NameIndex] = None
+    ):
+        """
+        Initialize the service.
         
-        # Initialize and register plugins
-        self.report_plugin = ReportPlugin()
+        Args:
+            kernel: Prebuilt kernel whose AI services are shared by all runs.
+                    If not provided, a new kernel is created.
+            fast_path: Whether to look up all people directly before
+                       falling back to the agent chat for unresolved names
+            match_threshold: Confidence (0-100) a candidate needs to be accepted
+                             by the fast path. Defaults to MATCH_CONFIDENCE_THRESHOLD.
+            name_index: Known name spellings used to correct misspelled requests.
+                        If not provided, one is built for the address source.
+        """
+        self.fast_path = fast_path
+        self.match_threshold = match_threshold if match_threshold is not None else get_confidence_threshold()
+        self.kernel = kernel if kernel is not None else create_kernel()
         self.telsearch_plugin = TelsearchPlugin()
-        
-        # Register plugins with the kernel
-        self.kernel.add_plugin(self.report_plugin, plugin_name="report")
-        self.kernel.add_plugin(self.telsearch_plugin, plugin_name="telsearch")
-        
-        # Setup agent chat after plugins are registered
-        self.agent_chat = setup_agent_chat(self.kernel)
+        self.name_index = name_index if name_index is not None else create_name_index(self.telsearch_plugin.source)
     
-    def reset(self):
-        """Reset the service state."""
-        self.report_plugin.reset()
+    def _create_agent_chat(self, report_plugin: ReportPlugin, people: List[Person]) -> AgentGroupChat:
+        """
+        Create a fresh agent chat for a single verification run.
         
-    async def verify_addresses(self, context: DocumentContext) -> Tuple[Dict[str, str], str, List[dict]]:
+        Args:
+            report_plugin: Report plugin receiving the results of this run
+            people: People the agents have to verify
+            
+        Returns:
+            AgentGroupChat with empty history
+        """
+        kernel = create_job_kernel(self.kernel)
+        kernel.add_plugin(self.telsearch_plugin, plugin_name="telsearch")
+        kernel.add_plugin(report_plugin, plugin_name="report")
+        return setup_agent_chat(kernel, names=[p.full_name for p in people])
+        
+    async def verify_addresses(
+        self,
+        context: DocumentContext,
+        report_plugin: Optional[ReportPlugin] = None,
+        previous: Optional[VerificationArtifact] = None
+    ) -> Tuple[Dict[str, str], str, List[dict]]:
         """
         Verify addresses for all people in the context.
         
         Args:
             context: Document context with people to verify
+            report_plugin: Plugin that receives the structured results of this
+                           run. A new one is created if not provided.
+            previous: Result of an earlier run in the same session. People it
+                      contains are reused; only new or renamed people are verified.
             
         Returns:
             Tuple containing:
@@ -56,26 +103,257 @@ class AddressVerificationService:
             ValueError: If context is invalid
             RuntimeError: If verification process fails
         """
-        self.reset()
+        if report_plugin is None:
+            report_plugin = ReportPlugin()
+        report_plugin.reset()
         
         if not context.gemeinde or not context.gemeinde.strip():
             raise ValueError("Municipality (gemeinde) cannot be empty")
         
+        people = [context.requestor] + list(context.requested_people)
+        agent_messages = []
+        
+        reused, people = self._reuse_previous(people, context.gemeinde, previous)
+        if reused:
+            agent_messages.append({
+                "role": "system",
+                "content": f"Reused {len(reused)} verified people from verification run {previous.version}"
+            })
+        
+        if not people:
+            resolved, unresolved = [], []
+        elif self.fast_path:
+            resolved, unresolved = await self._verify_direct(people, context.gemeinde)
+            agent_messages.append({
+                "role": "system",
+                "content": f"Resolved {len(resolved)} of {len(people)} people by direct lookup"
+            })
+        else:
+            resolved, unresolved = [], people
+        
+        if unresolved:
+            agent_messages.extend(await self._verify_with_agents(context, unresolved, report_plugin))
+        
+        # Merge reused, fast path and agent results, keeping unresolved people as NOT FOUND.
+        # People are told apart by name and type, so a requested person sharing the
+        # requestor's name is kept as a separate entry.
+        verified = reused + resolved
+        verified_keys = {(name_key(p["firstname"], p["lastname"]), p["type"]) for p in verified}
+        for person_data in report_plugin.people:
+            key = (name_key(person_data["firstname"], person_data["lastname"]), person_data["type"])
+            if key not in verified_keys:
+                verified.append(person_data)
+                verified_keys.add(key)
+        for person in unresolved:
+            if (name_key(person.firstname, person.lastname), person.type.value) not in verified_keys:
+                verified.append(self._to_person_data(person, None))
+        report_plugin.save_people_data(json.dumps(verified))
+        
+        # Get results from report plugin
+        addresses_dict = report_plugin.get_addresses_dict()
+        
+        # Create summary
+        summary_lines = []
+        for name, addr in addresses_dict.items():
+            status = addr or "NOT FOUND"
+            summary_lines.append(f"- {name}: {status}")
+        
+        summary = "\n".join(summary_lines) if summary_lines else "No addresses found."
+        
+        return addresses_dict, summary, agent_messages
+    
+    def create_artifact(
+        self,
+        context: DocumentContext,
+        report_plugin: ReportPlugin,
+        previous: Optional[VerificationArtifact] = None
+    ) -> VerificationArtifact:
+        """
+        Store the results of a verification run for reuse in later phases.
+        
+        Args:
+            context: Document context that was verified
+            report_plugin: Report plugin holding the results of the run
+            previous: Artifact of the previous run in the session, if any
+            
+        Returns:
+            New artifact with the version following the previous one
+        """
+        return VerificationArtifact(
+            gemeinde=context.gemeinde,
+            people=[dict(person) for person in report_plugin.people],
+            version=previous.version + 1 if previous else 1
+        )
+    
+    def _reuse_previous(
+        self,
+        people: List[Person],
+        gemeinde: str,
+        previous: Optional[VerificationArtifact]
+    ) -> Tuple[List[dict], List[Person]]:
+        """
+        Split people into those already verified by a previous run and the rest.
+        
+        Args:
+            people: People to verify
+            gemeinde: Municipality of this run
+            previous: Artifact of an earlier run, ignored for another municipality
+            
+        Returns:
+            Tuple of (reused person data, people that still need verification)
+        """
+        if previous is None or not previous.matches_location(gemeinde):
+            return [], people
+        
+        reused = []
+        remaining = []
+        for person in people:
+            data = previous.lookup(person)
+            if data is not None:
+                reused.append(dict(data))
+            else:
+                remaining.append(person)
+        return reused, remaining
+    
+    async def _verify_direct(
+        self,
+        people: List[Person],
+        gemeinde: str
+    ) -> Tuple[List[dict], List[Person]]:
+        """
+        Look up all people concurrently without involving the LLM.
+        
+        Every returned entry is ranked against the requested person. A person
+        is resolved if the best entry reaches the confidence threshold, is not
+        contradicted by another confident entry and has a complete address.
+        Names not resolved that way are looked up once more in the spelling
+        found by the name index, e.g. "Mueller" for a requested "Muller".
+        
+        Args:
+            people: People to look up
+            gemeinde: Municipality to search in
+            
+        Returns:
+            Tuple of (person data for resolved people, unresolved people)
+        """
+        responses = await self.telsearch_plugin.lookup_many(
+            [person.full_name for person in people],
+            gemeinde
+        )
+        
+        resolved = []
+        unresolved = []
+        for person, response in zip(people, responses):
+            person_data = self._match_response(person, person.full_name, response, gemeinde)
+            if person_data is not None:
+                resolved.append(person_data)
+            else:
+                unresolved.append(person)
+        
+        # Look up known spellings of the remaining names once more
+        corrections = []
+        for person in unresolved:
+            match = self.name_index.resolve(person.full_name, gemeinde)
+            if match is not None and not match.exact:
+                corrections.append((person, match.name.full_name))
+        if corrections:
+            responses = await self.telsearch_plugin.lookup_many([name for _, name in corrections], gemeinde)
+            for (person, corrected_name), response in zip(corrections, responses):
+                person_data = self._match_response(person, corrected_name, response, gemeinde)
+                if person_data is not None:
+                    print(f"DEBUG: Resolved '{person.full_name}' as '{corrected_name}'")
+                    resolved.append(person_data)
+                    unresolved.remove(person)
+        
+        return resolved, unresolved
+    
+    def _match_response(
+        self,
+        person: Person,
+        name: str,
+        response: str,
+        gemeinde: str
+    ) -> Optional[dict]:
+        """
+        Accept the best entry of a lookup response if it is confident and complete.
+        
+        Confirmed spellings are added to the name index.
+        
+        Args:
+            person: Requested person
+            name: Name that was looked up, the requested or a corrected spelling
+            response: Lookup response for the name
+            gemeinde: Municipality that was searched
+            
+        Returns:
+            Person data in the ReportPlugin format, or None if the person needs the agents
+        """
+        ranked = self.telsearch_plugin.rank_entries(response, name, gemeinde)
+        match = select_match(ranked, self.match_threshold)
+        address_info = self.telsearch_plugin.entry_address(match.entry) if match else None
+        # Only complete addresses are accepted, partial ones need the agents
+        if not address_info or not all(address_info.get(k) for k in ("street", "zip", "city")):
+            if ranked:
+                print(f"DEBUG: Escalating '{name}', best confidence {ranked[0].confidence:.0f}")
+            return None
+        
+        print(f"DEBUG: Accepted '{name}' with confidence {match.confidence:.0f}")
+        if match.entry.firstname and match.entry.name:
+            self.name_index.add(match.entry.firstname, match.entry.name, gemeinde)
+        return self._to_person_data(person, address_info)
+    
+    def _to_person_data(self, person: Person, address_info: Optional[Dict[str, str]]) -> dict:
+        """Convert a person and parsed address into the ReportPlugin format."""
+        _, formatted_address = self.telsearch_plugin.format_address(person.full_name, address_info)
+        address, city = None, None
+        if formatted_address:
+            # format_address returns "Street No, ZIP City"
+            address, _, city = formatted_address.partition(", ")
+        
+        return {
+            "firstname": person.firstname,
+            "lastname": person.lastname,
+            "address": address or None,
+            "city": city or None,
+            "type": person.type.value
+        }
+    
+    async def _verify_with_agents(
+        self,
+        context: DocumentContext,
+        people: List[Person],
+        report_plugin: ReportPlugin
+    ) -> List[dict]:
+        """
+        Run the agent chat for people the fast path could not resolve.
+        
+        Args:
+            context: Document context of the verification
+            people: People to verify with the agents
+            report_plugin: Report plugin the agents save their results to
+            
+        Returns:
+            List of agent messages for debugging
+            
+        Raises:
+            RuntimeError: If verification process fails
+        """
         # Create the verification prompt
-        prompt = self._create_verification_prompt(context)
+        prompt = self._create_verification_prompt(context, people)
         
-        # Start the agent chat
-        await self.agent_chat.add_chat_message(ChatMessageContent(
+        # Start a fresh agent chat for this run
+        agent_chat = self._create_agent_chat(report_plugin, people)
+        await agent_chat.add_chat_message(ChatMessageContent(
             role=AuthorRole.USER,
             content=prompt
         ))
         
         agent_messages = []
         verification_complete = False
-        print(f"DEBUG: Starting address verification for people")
+        print(f"DEBUG: Starting agent address verification for {len(people)} people")
         try:
             message_count = 0
-            async for response in self.agent_chat.invoke():
+            async for response in agent_chat.invoke():
                 message_count += 1
                 if message_count > MAX_MESSAGE_COUNT:
                     raise RuntimeError(
@@ -103,36 +381,40 @@ class AddressVerificationService:
         if not verification_complete:
             raise RuntimeError("Address verification did not complete successfully")
         
-        # Get results from report plugin
-        addresses_dict = self.report_plugin.get_addresses_dict()
-        
-        # Create summary
-        summary_lines = []
-        for name, addr in addresses_dict.items():
-            status = addr or "NOT FOUND"
-            summary_lines.append(f"- {name}: {status}")
+        return agent_messages
+    
+    def _create_verification_prompt(self, context: DocumentContext, people: Optional[List[Person]] = None) -> str:
+        """
+        Create the initial prompt for address verification.
         
-        summary = "\n".join(summary_lines) if summary_lines else "No addresses found."
+        Args:
+            context: Document context of the verification
+            people: Subset of people to verify. Defaults to everyone in the context.
+        """
+        if people is None:
+            people = [context.requestor] + list(context.requested_people)
+        requested = [p for p in people if p.type == PersonType.REQUESTED]
+        requestor = next((p for p in people if p.type == PersonType.REQUESTOR), None)
         
-        return addresses_dict, summary, agent_messages
-    
-    def _create_verification_prompt(self, context: DocumentContext) -> str:
-        """Create the initial prompt for address verification."""
-        # Add requestor information
+        # Add requested people
         prompt = f"""
 I need to verify addresses for the following people in {context.gemeinde} (type = 'requested'):
 """
         
         # Add each requested person
-        for person in context.requested_people:
+        for person in requested:
             prompt += f"{person.firstname} {person.lastname}\n"
             
         # Add requestor verification request
-        prompt += f"""
+        if requestor:
+            prompt += f"""
 Additionally, I need to find the address of the requestor (type = 'requestor'):
-{context.requestor.firstname} {context.requestor.lastname}
+{requestor.firstname} {requestor.lastname}
+"""
+        
+        prompt += f"""
 
-Retriever Agent: Verify these people using telsearch.search_person(name="FirstName LastName", location="{context.gemeinde}")
+Retriever Agent: Verify these people using telsearch.search_people(names=["FirstName LastName", ...], location="{context.gemeinde}")
 Report Agent: Check if all names have been verified. If yes, signal "COMPLETE" and save with report.save_people_data().
 
 Here is an example of the JSON structure:
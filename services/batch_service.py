@@ -0,0 +1,370 @@
+"""
+services/batch_service.py - Headless processing of many document requests
+
+This service runs the four phases of the application (verify, generate,
+validate, export) for every request of a manifest without the web interface.
+Requests are processed by a bounded pool of async workers. The state of each
+request is checkpointed to disk after every phase, so an interrupted run
+resumes with the first phase that did not complete. A results index lists the
+outcome of every request.
+"""
+
+import asyncio
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from models.core import DocumentContext, Person, PersonType, VerificationArtifact
+from plugins.report_plugin import ReportPlugin
+from services.address_verification_service import AddressVerificationService
+from services.document_service import DocumentService
+from services.export_service import ExportService
+from utils.document_cache import context_fingerprint
+from utils.people_import import iter_people_file, parse_name
+
+DEFAULT_BATCH_WORKERS = 4  # Requests processed at the same time
+DEFAULT_BATCH_OUTPUT_DIR = os.path.join("output", "batch")
+
+# Phases in processing order
+VERIFY = "verify"
+GENERATE = "generate"
+VALIDATE = "validate"
+EXPORT = "export"
+PHASES = (VERIFY, GENERATE, VALIDATE, EXPORT)
+
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+@dataclass
+class BatchRequest:
+    """A single document request of a batch manifest."""
+    id: str
+    requestor: Person
+    requested_people: List[Person]
+    gemeinde: str
+    zweck: str
+
+    def to_context(self) -> DocumentContext:
+        """Create the document context of the request"""
+        return DocumentContext(
+            requestor=self.requestor,
+            requested_people=self.requested_people,
+            gemeinde=self.gemeinde,
+            zweck=self.zweck
+        )
+
+
+@dataclass
+class BatchCheckpoint:
+    """Progress of one request, written to disk after every phase."""
+    id: str
+    fingerprint: str = ""  # Hash of the request the progress belongs to
+    completed: List[str] = field(default_factory=list)
+    artifact: Optional[Dict] = None
+    document: Optional[str] = None
+    report: Optional[str] = None
+    results: List[Dict] = field(default_factory=list)
+    docx_path: Optional[str] = None
+    error: Optional[str] = None
+
+
+def _parse_request(entry: Dict, base_dir: str, number: int) -> BatchRequest:
+    """Build a batch request from one manifest entry."""
+    request_id = str(entry.get("id") or f"request_{number:04d}")
+    try:
+        requestor = entry["requestor"]
+        if isinstance(requestor, dict):
+            firstname, lastname = requestor["firstname"], requestor["lastname"]
+        else:
+            firstname, lastname = parse_name(requestor)
+
+        if entry.get("people_file"):
+            path = os.path.join(base_dir, entry["people_file"])
+            people = list(iter_people_file(path))
+        else:
+            people = []
+            for name in entry.get("people", []):
+                person_first, person_last = parse_name(name)
+                people.append(Person(firstname=person_first, lastname=person_last, type=PersonType.REQUESTED))
+        if not people:
+            raise ValueError("No requested people given")
+
+        request = BatchRequest(
+            id=request_id,
+            requestor=Person(firstname=firstname, lastname=lastname, type=PersonType.REQUESTOR),
+            requested_people=people,
+            gemeinde=entry["gemeinde"],
+            zweck=entry["zweck"]
+        )
+        request.to_context()  # Validates municipality and purpose
+        return request
+    except KeyError as e:
+        raise ValueError(f"Request {request_id}: missing field {str(e)}")
+    except ValueError as e:
+        raise ValueError(f"Request {request_id}: {str(e)}")
+
+
+def load_manifest(path: str) -> List[BatchRequest]:
+    """
+    Read the requests of a batch manifest.
+
+    The manifest is a JSON file with a list of requests (or an object with a
+    "requests" list), or a JSON Lines file with one request per line. Each
+    request has an id, a requestor ("Lastname, Firstname" or an object with
+    firstname and lastname), gemeinde, zweck and either a "people" list of
+    names or a "people_file" with a CSV/XLSX list relative to the manifest.
+
+    Args:
+        path: Path of the manifest
+
+    Returns:
+        List of requests in manifest order
+
+    Raises:
+        ValueError: If a request is invalid or an id is used twice
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if path.lower().endswith(".jsonl"):
+            entries = [json.loads(line) for line in f if line.strip()]
+        else:
+            entries = json.load(f)
+    if isinstance(entries, dict):
+        entries = entries.get("requests", [])
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    requests = [_parse_request(entry, base_dir, number) for number, entry in enumerate(entries, start=1)]
+
+    ids = [request.id for request in requests]
+    duplicates = sorted({request_id for request_id in ids if ids.count(request_id) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate request ids: {', '.join(duplicates)}")
+    return requests
+
+
+class BatchService:
+    """
+    Service for running the document workflow for many requests.
+
+    The services are shared by all workers; every request gets its own
+    verification and validation state from them, as in the web interface.
+    """
+
+    def __init__(
+        self,
+        address_service: AddressVerificationService,
+        document_service: DocumentService,
+        export_service: ExportService,
+        output_dir: str = DEFAULT_BATCH_OUTPUT_DIR,
+        max_workers: Optional[int] = None
+    ):
+        """
+        Initialize the batch service.
+
+        Args:
+            address_service: Service verifying the addresses
+            document_service: Service generating and validating the documents
+            export_service: Service writing the Word documents
+            output_dir: Directory receiving documents, checkpoints and the index
+            max_workers: Number of requests processed at the same time.
+                         Defaults to BATCH_MAX_WORKERS.
+        """
+        self.address_service = address_service
+        self.document_service = document_service
+        self.export_service = export_service
+        self.output_dir = output_dir
+        self.checkpoint_dir = os.path.join(output_dir, "checkpoints")
+        self.documents_dir = os.path.join(output_dir, "documents")
+        if max_workers is None:
+            max_workers = int(os.environ.get("BATCH_MAX_WORKERS", DEFAULT_BATCH_WORKERS))
+        self.max_workers = max(1, max_workers)
+
+    @property
+    def index_path(self) -> str:
+        """Path of the results index"""
+        return os.path.join(self.output_dir, "index.json")
+
+    def _checkpoint_path(self, request_id: str) -> str:
+        """Path of the checkpoint file of a request"""
+        safe_id = "".join(c if c.isalnum() or c in "-_." else "_" for c in request_id)
+        return os.path.join(self.checkpoint_dir, f"{safe_id}.json")
+
+    def load_checkpoint(self, request_id: str) -> BatchCheckpoint:
+        """
+        Load the progress of a request.
+
+        Args:
+            request_id: Id of the request
+
+        Returns:
+            The stored checkpoint, or an empty one if the request was not started
+        """
+        path = self._checkpoint_path(request_id)
+        if not os.path.exists(path):
+            return BatchCheckpoint(id=request_id)
+        with open(path, "r", encoding="utf-8") as f:
+            return BatchCheckpoint(**json.load(f))
+
+    def save_checkpoint(self, checkpoint: BatchCheckpoint):
+        """
+        Write the progress of a request.
+
+        The file is replaced atomically, so an interruption never leaves a
+        partial checkpoint behind.
+
+        Args:
+            checkpoint: Progress to store
+        """
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        path = self._checkpoint_path(checkpoint.id)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(checkpoint), f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+
+    async def run(self, requests: List[BatchRequest], date: Optional[str] = None) -> List[Dict]:
+        """
+        Process all requests and write the results index.
+
+        Phases completed by an earlier run are skipped. A failed request does
+        not stop the batch; it is listed as failed and retried from the failed
+        phase on the next run.
+
+        Args:
+            requests: Requests to process
+            date: Date inserted into the exported documents. Defaults to today.
+
+        Returns:
+            Index entries, one per request in input order
+        """
+        if date is None:
+            date = datetime.now().strftime("%d.%m.%Y")
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for position, request in enumerate(requests):
+            queue.put_nowait((position, request))
+        entries: List[Optional[Dict]] = [None] * len(requests)
+
+        async def worker():
+            while True:
+                try:
+                    position, request = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                entries[position] = await self.process(request, date)
+
+        workers = min(self.max_workers, len(requests))
+        print(f"DEBUG: Processing {len(requests)} requests with {workers} workers")
+        await asyncio.gather(*[worker() for _ in range(workers)])
+
+        self.write_index(entries)
+        return entries
+
+    async def process(self, request: BatchRequest, date: str) -> Dict:
+        """
+        Run the remaining phases of one request.
+
+        Args:
+            request: Request to process
+            date: Date inserted into the exported document
+
+        Returns:
+            Index entry of the request
+        """
+        fingerprint = context_fingerprint(request.to_context(), "batch")
+        checkpoint = self.load_checkpoint(request.id)
+        if checkpoint.fingerprint != fingerprint:
+            # New request, or the manifest entry changed since the last run
+            checkpoint = BatchCheckpoint(id=request.id, fingerprint=fingerprint)
+        checkpoint.error = None
+        phase = None
+        try:
+            for phase in PHASES:
+                if phase in checkpoint.completed:
+                    continue
+                await self._run_phase(phase, request, checkpoint, date)
+                checkpoint.completed.append(phase)
+                self.save_checkpoint(checkpoint)
+        except Exception as e:
+            print(f"DEBUG: Request {request.id} failed in phase {phase}: {str(e)}")
+            checkpoint.error = f"{phase}: {str(e)}"
+            self.save_checkpoint(checkpoint)
+
+        return self._index_entry(request, checkpoint)
+
+    async def _run_phase(self, phase: str, request: BatchRequest, checkpoint: BatchCheckpoint, date: str):
+        """Run a single phase and record its result in the checkpoint."""
+        if phase == VERIFY:
+            context = request.to_context()
+            report_plugin = ReportPlugin()
+            await self.address_service.verify_addresses(context, report_plugin)
+            artifact = self.address_service.create_artifact(context, report_plugin)
+            checkpoint.artifact = asdict(artifact)
+
+        elif phase == GENERATE:
+            artifact = VerificationArtifact(**checkpoint.artifact)
+            context = DocumentContext(
+                requestor=artifact.get_requestor() or request.requestor,
+                requested_people=artifact.get_requested_people(),
+                gemeinde=request.gemeinde,
+                zweck=request.zweck
+            )
+            checkpoint.document = await self.document_service.generate_document(context)
+
+        elif phase == VALIDATE:
+            report, results, _ = await self.document_service.validate_document(checkpoint.document)
+            checkpoint.report = report
+            checkpoint.results = results
+
+        elif phase == EXPORT:
+            # Conversion is CPU-bound; keep the event loop free for the other workers
+            [(_, docx_path)] = await asyncio.to_thread(
+                self.export_service.export_batch,
+                [checkpoint.document],
+                date=date,
+                output_dir=self.documents_dir,
+                max_workers=1
+            )
+            checkpoint.docx_path = docx_path
+
+    def _index_entry(self, request: BatchRequest, checkpoint: BatchCheckpoint) -> Dict:
+        """Summarize the outcome of a request for the results index."""
+        people = (checkpoint.artifact or {}).get("people", [])
+        statuses = [result.get("status") for result in checkpoint.results]
+        return {
+            "id": request.id,
+            "status": STATUS_FAILED if checkpoint.error else STATUS_DONE,
+            "completed": list(checkpoint.completed),
+            "gemeinde": request.gemeinde,
+            "zweck": request.zweck,
+            "people": len(request.requested_people),
+            "not_found": sum(1 for person in people if not person.get("address")),
+            "validation": {
+                "passed": statuses.count("passed"),
+                "failed": statuses.count("failed")
+            },
+            "docx_path": checkpoint.docx_path,
+            "error": checkpoint.error
+        }
+
+    def write_index(self, entries: List[Dict]):
+        """
+        Write the results index of a run.
+
+        Args:
+            entries: Index entries of all requests
+        """
+        index = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "total": len(entries),
+            "done": sum(1 for entry in entries if entry["status"] == STATUS_DONE),
+            "failed": sum(1 for entry in entries if entry["status"] == STATUS_FAILED),
+            "requests": entries
+        }
+        temp_path = f"{self.index_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.index_path)
@@ -1,44 +1,122 @@
 """
 services/document_service.py - Service for document generation and validation
 
-This service handles document generation and validation using a multi-agent
-system for compliance checking.
+This service handles document generation and validation. Documents are first
+checked against deterministic rules; the remaining checklist items are checked
+item by item with concurrent LLM calls, in one structured call or by the
+multi-agent system for compliance checking.
 """
 
+import asyncio
 import os
-from typing import Optional, Dict, List, Tuple
+from datetime import date
+from typing import AsyncIterator, Optional, Dict, List, Tuple
 from semantic_kernel import Kernel
+from semantic_kernel.agents import AgentGroupChat
 from semantic_kernel.connectors.ai.prompt_execution_settings import PromptExecutionSettings
 from semantic_kernel.contents import ChatMessageContent
 from semantic_kernel.contents.utils.author_role import AuthorRole
 
-from models.core import DocumentContext, MAX_MESSAGE_COUNT, COMPLETION_MARKER
+from models.core import ChecklistItem, DocumentContext, ValidationMode, MAX_MESSAGE_COUNT, COMPLETION_MARKER
 from plugins.compliance_plugin import CompliancePlugin
+from agents.validation_agents import VALIDATOR
 from agents.validation_chat import setup_validation_chat
+from utils.checklist import (
+    VALIDATION_RESULT_SCHEMA, is_evaluated, parse_checklist, parse_item_verdict, parse_structured_results
+)
+from utils.document_cache import (
+    DOCUMENT, VALIDATION, VALIDATION_ITEM, DocumentCache, context_fingerprint, text_fingerprint
+)
+from utils.document_sections import dependent_text, split_blocks
+from utils.semantic_kernel_setup import create_job_kernel
+from utils.template_renderer import DATE_FORMAT, render_document
+from utils.validation_rules import apply_rules, load_rules
+
+DEFAULT_VALIDATION_CONCURRENCY = 4  # Checklist items evaluated at the same time
 
 class DocumentService:
-    """Service for generating and validating documents."""
+    """
+    Service for generating and validating documents.
+    
+    Documents are rendered locally from the template by default. The LLM pass
+    is only used if enabled, e.g. for templates that need free-text phrasing.
+    Generated documents and validation reports are cached by content if a
+    DocumentCache is given.
+    """
     
-    def __init__(self, kernel: Kernel):
+    def __init__(
+        self,
+        kernel: Kernel,
+        use_llm: Optional[bool] = None,
+        cache: Optional[DocumentCache] = None,
+        validation_mode: Optional[ValidationMode] = None,
+        max_concurrency: Optional[int] = None
+    ):
         """
         Initialize the document service.
         
         Args:
             kernel: Configured Semantic Kernel instance
+            use_llm: Generate documents with the LLM instead of filling the
+                     template locally. Defaults to DOCUMENT_GENERATION_MODE=llm.
+            cache: Optional cache for generated documents and validation reports
+            validation_mode: How documents are validated. Defaults to VALIDATION_MODE
+                             ("parallel", "structured" or "chat").
+            max_concurrency: Maximum number of concurrent LLM calls in parallel
+                             validation. Defaults to VALIDATION_MAX_CONCURRENCY.
             
         Raises:
             RuntimeError: If required templates cannot be loaded
         """
         self.kernel = kernel
+        if use_llm is None:
+            use_llm = os.environ.get("DOCUMENT_GENERATION_MODE", "template").strip().lower() == "llm"
+        self.use_llm = use_llm
+        self.cache = cache
+        if validation_mode is None:
+            validation_mode = ValidationMode(
+                os.environ.get("VALIDATION_MODE", ValidationMode.PARALLEL.value).strip().lower()
+            )
+        self.validation_mode = validation_mode
+        if max_concurrency is None:
+            max_concurrency = int(os.environ.get("VALIDATION_MAX_CONCURRENCY", DEFAULT_VALIDATION_CONCURRENCY))
+        self.max_concurrency = max(1, max_concurrency)
         self.verfuegung_template = self._load_template("templates/verfuegung_template.md")
         self.validation_questions = self._load_template("templates/validation_questions.md")
+        self.checklist = parse_checklist(self.validation_questions)
+        self.validation_rules = load_rules()
+    
+    def _create_validation_chat(self, compliance_plugin: CompliancePlugin, item_count: int) -> AgentGroupChat:
+        """
+        Create a fresh validation chat for a single validation run.
         
-        # Initialize and register compliance plugin
-        self.compliance_plugin = CompliancePlugin()
-        self.kernel.add_plugin(self.compliance_plugin, plugin_name="compliance")
-        
-        # Setup validation chat system
-        self.validation_chat = setup_validation_chat(self.kernel)
+        Args:
+            compliance_plugin: Plugin receiving the results of this run
+            item_count: Number of checklist items to validate
+            
+        Returns:
+            AgentGroupChat with empty history
+        """
+        kernel = create_job_kernel(self.kernel)
+        kernel.add_plugin(compliance_plugin, plugin_name="compliance")
+        return setup_validation_chat(kernel, item_count=item_count)
+    
+    def _template_version(self) -> str:
+        """
+        Identify everything besides the context that changes the document:
+        the template text, the generation mode and the printed date.
+        """
+        mode = "llm" if self.use_llm else "template"
+        return text_fingerprint(self.verfuegung_template, mode, date.today().strftime(DATE_FORMAT))
+    
+    def document_key(self, context: DocumentContext) -> str:
+        """Get the cache key of the document generated for a context."""
+        return context_fingerprint(context, self._template_version())
+    
+    def validation_key(self, document_text: str) -> str:
+        """Get the cache key of the validation report for a document."""
+        rules = [(rule.section, rule.mode, [r.pattern.pattern for r in rule.require]) for rule in self.validation_rules]
+        return text_fingerprint(document_text, self.validation_questions, repr(rules))
     
     def _load_template(self, path: str) -> str:
         """Load a template file and return its contents."""
@@ -48,18 +126,8 @@ class DocumentService:
         except Exception as e:
             raise RuntimeError(f"Failed to load template {path}: {str(e)}")
     
-    async def generate_document(self, context: DocumentContext) -> str:
-        """
-        Generate a document based on the provided context.
-        
-        Args:
-            context: Document context containing all required information
-            
-        Returns:
-            Generated document text in markdown format
-        """
-        print(context)
-        # Create prompt for document generation
+    def _create_generation_prompt(self, context: DocumentContext) -> str:
+        """Create the prompt for document generation."""
         prompt = f"""
 You are an expert in creating official documents following strict formats.
 Create a real document (not a template!) based on the template provided below.
@@ -88,23 +156,97 @@ INSTRUCTIONS:
 TEMPLATE:
 {self.verfuegung_template}
 """
+        return prompt
+    
+    def _generation_settings(self) -> PromptExecutionSettings:
+        """Execution settings used for document generation."""
+        return PromptExecutionSettings(
+            temperature=0.7,
+            top_p=1,
+            frequency_penalty=0.0,
+            presence_penalty=0.0
+        )
+    
+    async def generate_document(self, context: DocumentContext) -> str:
+        """
+        Generate a document based on the provided context.
+        
+        Args:
+            context: Document context containing all required information
+            
+        Returns:
+            Generated document text in markdown format
+        """
+        if self.cache is None:
+            return await self._generate_document(context)
+        
+        async def create() -> Dict:
+            return {"markdown": await self._generate_document(context)}
+        
+        cached = await self.cache.get_or_create(DOCUMENT, self.document_key(context), create)
+        return cached["markdown"]
+    
+    async def _generate_document(self, context: DocumentContext) -> str:
+        """Generate a document without consulting the cache."""
+        if not self.use_llm:
+            return render_document(self.verfuegung_template, context)
+        
+        prompt = self._create_generation_prompt(context)
 
         # Generate document using LLM
         result = await self.kernel.invoke_prompt(
             prompt=prompt,
-            settings=PromptExecutionSettings(
-                temperature=0.7,
-                top_p=1,
-                frequency_penalty=0.0,
-                presence_penalty=0.0
-            )
+            settings=self._generation_settings()
         )
         
         return str(result).strip()
     
+    async def generate_document_stream(self, context: DocumentContext) -> AsyncIterator[str]:
+        """
+        Generate a document and yield the text as the model produces it.
+        
+        Args:
+            context: Document context containing all required information
+            
+        Yields:
+            Chunks of the document text in markdown format
+        """
+        key = self.document_key(context) if self.cache is not None else None
+        if key is not None:
+            cached = await self.cache.get_async(DOCUMENT, key)
+            if cached is not None:
+                yield cached["markdown"]
+                return
+        
+        if not self.use_llm:
+            # Local rendering is instant, so the document arrives in one chunk
+            document = render_document(self.verfuegung_template, context)
+            if key is not None:
+                await self.cache.set_async(DOCUMENT, key, {"markdown": document})
+            yield document
+            return
+        
+        prompt = self._create_generation_prompt(context)
+        
+        parts = []
+        async for chunk in self.kernel.invoke_prompt_stream(
+            prompt=prompt,
+            settings=self._generation_settings()
+        ):
+            # Each update is a list of streaming contents, one per choice
+            contents = chunk if isinstance(chunk, list) else [chunk]
+            text = "".join(str(content) for content in contents[:1])
+            if text:
+                parts.append(text)
+                yield text
+        
+        # Only complete documents are cached
+        if key is not None:
+            await self.cache.set_async(DOCUMENT, key, {"markdown": "".join(parts).strip()})
+    
     async def validate_document(self, document_text: str) -> Tuple[str, List[Dict], List[Dict]]:
         """
-        Validate a document against compliance rules using a multi-agent system.
+        Validate a document against the compliance checklist.
         
         Args:
             document_text: The document text to validate
@@ -118,8 +260,291 @@ TEMPLATE:
         Raises:
             RuntimeError: If validation process fails or times out
         """
-        # Reset compliance plugin state
-        self.compliance_plugin.reset()
+        if self.cache is None:
+            return await self._validate_document(document_text)
+        
+        agent_messages = [{
+            "role": "system",
+            "content": "Validation report loaded from cache"
+        }]
+        
+        async def create() -> Dict:
+            report, results, messages = await self._validate_document(document_text)
+            agent_messages[:] = messages
+            return {"report": report, "results": results}
+        
+        def evaluated(value: Dict) -> bool:
+            # A report with unreadable answers is retried on the next run
+            return all(is_evaluated(result) for result in value["results"])
+        
+        cached = await self.cache.get_or_create(
+            VALIDATION, self.validation_key(document_text), create, cacheable=evaluated
+        )
+        return cached["report"], cached["results"], agent_messages
+    
+    async def _validate_document(self, document_text: str) -> Tuple[str, List[Dict], List[Dict]]:
+        """
+        Validate a document without consulting the cache.
+        
+        Items settled by the local rules are recorded first, then verdicts of
+        earlier runs whose document blocks are unchanged. Only the remaining
+        items are checked by the LLM in the configured validation mode.
+        """
+        # Each run collects its results in its own plugin
+        compliance_plugin = CompliancePlugin()
+        
+        rule_results, remaining = apply_rules(document_text, self.checklist, self.validation_rules)
+        compliance_plugin.add_results(rule_results)
+        agent_messages = [{
+            "role": "system",
+            "content": f"Checked {len(rule_results)} of {len(self.checklist)} items with local rules"
+        }]
+        
+        item_keys = self._item_keys(document_text, remaining) if self.cache is not None else {}
+        if self.cache is not None and remaining:
+            reused = []
+            for item in list(remaining):
+                cached = await self.cache.get_async(VALIDATION_ITEM, item_keys[item.position])
+                if cached is not None:
+                    reused.append(cached)
+                    remaining.remove(item)
+            if reused:
+                compliance_plugin.add_results(reused)
+                agent_messages.append({
+                    "role": "system",
+                    "content": f"Reused {len(reused)} results of unchanged document sections"
+                })
+        
+        if remaining:
+            if self.validation_mode == ValidationMode.PARALLEL:
+                validate = self._validate_parallel
+            elif self.validation_mode == ValidationMode.STRUCTURED:
+                validate = self._validate_structured
+            else:
+                validate = self._validate_with_chat
+            agent_messages.extend(await validate(document_text, remaining, compliance_plugin))
+            await self._store_item_results(remaining, item_keys, compliance_plugin)
+        
+        compliance_plugin.sort_results([item.item for item in self.checklist])
+        compliance_plugin.mark_validation_complete()
+        
+        return (
+            compliance_plugin.format_markdown_report(),
+            compliance_plugin.get_validation_results(),
+            agent_messages
+        )
+    
+    def _item_keys(self, document_text: str, items: List[ChecklistItem]) -> Dict[int, str]:
+        """
+        Get the cache keys of checklist items for a document.
+        
+        An item's key covers only the document blocks selected by the
+        depends_on patterns of its rule, so edits elsewhere keep the key.
+        
+        Returns:
+            Dict mapping item positions to cache keys
+        """
+        blocks = split_blocks(document_text)
+        rules_by_section = {rule.section.casefold(): rule for rule in self.validation_rules}
+        keys = {}
+        for item in items:
+            rule = rules_by_section.get(item.section.casefold())
+            text = dependent_text(blocks, rule.depends_on if rule else [])
+            keys[item.position] = text_fingerprint(item.section, item.item, text)
+        return keys
+    
+    async def _store_item_results(
+        self,
+        items: List[ChecklistItem],
+        item_keys: Dict[int, str],
+        compliance_plugin: CompliancePlugin
+    ):
+        """Cache the LLM verdicts of the given items for later runs."""
+        if self.cache is None:
+            return
+        
+        results_by_item = {r["item"]: r for r in compliance_plugin.get_validation_results()}
+        for item in items:
+            result = results_by_item.get(item.item)
+            if result is not None and is_evaluated(result):
+                await self.cache.set_async(VALIDATION_ITEM, item_keys[item.position], result)
+    
+    def _format_checklist(self, items: List[ChecklistItem]) -> str:
+        """Format checklist items for a validation prompt."""
+        return "\n".join(f"- section: {item.section}\n  item: {item.item}" for item in items)
+    
+    def _create_item_prompt(self, document_text: str, item: ChecklistItem) -> str:
+        """Create the prompt checking a single checklist item."""
+        return f"""
+You are checking an official document for compliance.
+Evaluate ONLY the following checklist item against the document.
+
+SECTION: {item.section}
+CHECKLIST ITEM: {item.item}
+
+DOCUMENT:
+{document_text}
+
+Answer with a single JSON object and no other text:
+{{"status": "passed" or "failed", "details": "short justification"}}
+"""
+    
+    async def _validate_item(
+        self,
+        document_text: str,
+        item: ChecklistItem,
+        compliance_plugin: CompliancePlugin,
+        semaphore: asyncio.Semaphore
+    ) -> Dict:
+        """
+        Evaluate one checklist item and store the result in the plugin.
+        
+        Args:
+            document_text: The document text to validate
+            item: Checklist item to evaluate
+            compliance_plugin: Collector for the results of this run
+            semaphore: Bounds the number of concurrent LLM calls
+            
+        Returns:
+            Agent message describing the verdict
+        """
+        async with semaphore:
+            answer = await self.kernel.invoke_prompt(
+                prompt=self._create_item_prompt(document_text, item),
+                settings=PromptExecutionSettings(temperature=0.0)
+            )
+        
+        result = parse_item_verdict(item, str(answer))
+        compliance_plugin.add_result(result)
+        return {
+            "role": "assistant",
+            "name": VALIDATOR,
+            "content": f"{item.section}: {item.item} -> {result['status']}"
+        }
+    
+    async def _validate_parallel(
+        self,
+        document_text: str,
+        items: List[ChecklistItem],
+        compliance_plugin: CompliancePlugin
+    ) -> List[Dict]:
+        """
+        Validate checklist items with one concurrent LLM call per item.
+        
+        Args:
+            document_text: The document text to validate
+            items: Checklist items to evaluate
+            compliance_plugin: Collector for the results of this run
+            
+        Returns:
+            List of agent messages for debugging
+            
+        Raises:
+            RuntimeError: If an item cannot be evaluated
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        print(f"DEBUG: Validating {len(items)} checklist items in parallel")
+        try:
+            agent_messages = await asyncio.gather(*[
+                self._validate_item(document_text, item, compliance_plugin, semaphore)
+                for item in items
+            ])
+        except Exception as e:
+            raise RuntimeError(f"Validation failed: {str(e)}") from e
+        
+        return list(agent_messages)
+    
+    def _create_structured_prompt(self, document_text: str, items: List[ChecklistItem]) -> str:
+        """Create the prompt checking several checklist items in one call."""
+        return f"""
+You are checking an official document for compliance.
+Evaluate EVERY checklist item below against the document.
+
+DOCUMENT:
+{document_text}
+
+CHECKLIST:
+{self._format_checklist(items)}
+
+Return one result per checklist item. Copy section and item exactly as given,
+set status to "passed" or "failed" and give a short justification in details.
+"""
+    
+    def _structured_settings(self) -> PromptExecutionSettings:
+        """Execution settings constraining the answer to VALIDATION_RESULT_SCHEMA."""
+        return PromptExecutionSettings(
+            temperature=0.0,
+            response_format={
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "validation_results",
+                    "strict": True,
+                    "schema": VALIDATION_RESULT_SCHEMA
+                }
+            }
+        )
+    
+    async def _validate_structured(
+        self,
+        document_text: str,
+        items: List[ChecklistItem],
+        compliance_plugin: CompliancePlugin
+    ) -> List[Dict]:
+        """
+        Validate checklist items with a single schema-constrained LLM call.
+        
+        Args:
+            document_text: The document text to validate
+            items: Checklist items to evaluate
+            compliance_plugin: Collector for the results of this run
+            
+        Returns:
+            List of agent messages for debugging
+            
+        Raises:
+            RuntimeError: If the call fails or the answer cannot be read
+        """
+        try:
+            answer = await self.kernel.invoke_prompt(
+                prompt=self._create_structured_prompt(document_text, items),
+                settings=self._structured_settings()
+            )
+            results = parse_structured_results(str(answer), items)
+        except Exception as e:
+            raise RuntimeError(f"Validation failed: {str(e)}") from e
+        
+        status = compliance_plugin.add_results(results)
+        if status.startswith("Error"):
+            raise RuntimeError(f"Validation failed: {status}")
+        
+        return [{
+            "role": "assistant",
+            "name": VALIDATOR,
+            "content": f"{status} in one structured call"
+        }]
+    
+    async def _validate_with_chat(
+        self,
+        document_text: str,
+        items: List[ChecklistItem],
+        compliance_plugin: CompliancePlugin
+    ) -> List[Dict]:
+        """
+        Validate checklist items with the sequential two-agent chat.
+        
+        Args:
+            document_text: The document text to validate
+            items: Checklist items to evaluate
+            compliance_plugin: Collector for the results of this run
+            
+        Returns:
+            List of agent messages for debugging
+            
+        Raises:
+            RuntimeError: If validation process fails or times out
+        """
+        validation_chat = self._create_validation_chat(compliance_plugin, len(items))
         
         # Create initial prompt for validation
         prompt = f"""
@@ -130,14 +555,14 @@ DOCUMENT:
 {document_text}
 
 VALIDATION CHECKLIST:
-{self.validation_questions}
+{self._format_checklist(items)}
 
 Validator Agent: Check each item individually and save the result with compliance.save_validation_result()
 ComplianceReporter: Monitor progress and mark when all items have been checked.
 """
         
         # Start the validation chat
-        await self.validation_chat.add_chat_message(ChatMessageContent(
+        await validation_chat.add_chat_message(ChatMessageContent(
             role=AuthorRole.USER,
             content=prompt
         ))
@@ -148,7 +573,7 @@ ComplianceReporter: Monitor progress and mark when all items have been checked.
         
         try:
             message_count = 0
-            async for response in self.validation_chat.invoke():
+            async for response in validation_chat.invoke():
                 message_count += 1
                 if message_count > MAX_MESSAGE_COUNT:
                     raise RuntimeError(
@@ -175,9 +600,5 @@ ComplianceReporter: Monitor progress and mark when all items have been checked.
             
         if not validation_complete:
             raise RuntimeError("Validation did not complete successfully")
-            
-        # Get validation results and format report
-        validation_results = self.compliance_plugin.get_validation_results()
-        report = self.compliance_plugin.format_markdown_report()
         
-        return report, validation_results, agent_messages
\ No newline at end of file
+        return agent_messages
@@ -2,25 +2,68 @@
 services/export_service.py - Service for converting documents to Word format
 
 This service handles the conversion of Markdown documents to properly formatted
-Word documents using pandoc with custom styling.
+Word documents. By default the documents are written in-process with python-docx;
+pandoc with custom styling is used if configured or as a fallback. Batches of
+documents are converted in a process pool and can be bundled into a ZIP archive.
 """
 
+import asyncio
 import os
+import re
+import shutil
 import tempfile
+import uuid
+import zipfile
 import pypandoc
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
+from typing import List, Optional, Tuple
 from utils.create_reference_template import create_reference_template
+from utils.document_cache import EXPORT, DocumentCache, text_fingerprint
+from utils.docx_writer import markdown_to_docx as write_docx
+
+ENGINE_DOCX = "docx"  # In-process python-docx writer
+ENGINE_PANDOC = "pandoc"
+OUTPUT_DIR = "output"
+DATE_PATTERN = re.compile(r"\*\*\d{2}\.\d{2}\.\d{4}\*\*")  # Bold date in the documents
+
+def _convert_document(markdown_text: str, output_path: str, reference_template_path: str, engine: str) -> str:
+    """Convert a single document in a worker process."""
+    ExportService(reference_template_path, engine=engine).convert(markdown_text, output_path)
+    return output_path
+
+def unique_filename(prefix: str, suffix: str) -> str:
+    """
+    Create a file name that does not collide with exports in the same second.
+    
+    Args:
+        prefix: Start of the file name, e.g. "verfuegung"
+        suffix: File extension including the dot
+        
+    Returns:
+        File name such as "verfuegung_20250308_101500_1a2b3c4d.docx"
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"{prefix}_{timestamp}_{uuid.uuid4().hex[:8]}{suffix}"
 
 class ExportService:
     """Service for exporting documents to Word format."""
     
-    def __init__(self, reference_template_path: str = None):
+    def __init__(
+        self,
+        reference_template_path: str = None,
+        cache: Optional[DocumentCache] = None,
+        engine: Optional[str] = None
+    ):
         """
         Initialize the export service.
         
         Args:
             reference_template_path: Optional path to custom reference template.
                                    If not provided, uses default template.
+            cache: Optional cache mapping exported markdown to its docx path
+            engine: "docx" to write documents in-process or "pandoc".
+                    Defaults to EXPORT_ENGINE.
         """
         if reference_template_path is None:
             reference_template_path = os.path.join("templates", "reference.docx")
@@ -30,6 +73,12 @@ class ExportService:
             reference_template_path = create_reference_template(reference_template_path)
             
         self.reference_template_path = reference_template_path
+        self.cache = cache
+        if engine is None:
+            engine = os.environ.get("EXPORT_ENGINE", ENGINE_DOCX).strip().lower()
+        if engine not in (ENGINE_DOCX, ENGINE_PANDOC):
+            raise ValueError(f"Unknown export engine: {engine}")
+        self.engine = engine
     
     def markdown_to_docx(self, markdown_text: str, date: str = None) -> tuple[str, str]:
         """
@@ -42,66 +91,233 @@ class ExportService:
         Returns:
             Tuple of (markdown with substituted date, path to generated docx)
         """
-        # Replace date if provided
-        if date:
-            # Find the date in the markdown (assuming it's bold with **)
-            import re
-            date_pattern = r"\*\*\d{2}\.\d{2}\.\d{4}\*\*"
-            markdown_text = re.sub(date_pattern, f"**{date}**", markdown_text)
-        
-        # Create temp file for markdown
-        with tempfile.NamedTemporaryFile(mode='w', 
-                                       suffix='.md', 
-                                       encoding='utf-8',
-                                       delete=False) as md_file:
-            md_file.write(markdown_text)
-            md_path = md_file.name
+        markdown_text = self._replace_date(markdown_text, date)
+        
+        # Reuse the file of an identical earlier export if it still exists
+        key = None
+        if self.cache is not None:
+            key = self._export_key(markdown_text)
+            cached = self.cache.get(EXPORT, key)
+            if cached is not None:
+                if os.path.exists(cached["docx_path"]):
+                    return markdown_text, cached["docx_path"]
+                self.cache.delete(EXPORT, key)
+        
+        output_path = self._output_path()
+        self.convert(markdown_text, output_path)
+        
+        if key is not None:
+            self.cache.set(EXPORT, key, {"docx_path": output_path})
+        
+        return markdown_text, output_path
+    
+    async def markdown_to_docx_async(self, markdown_text: str, date: str = None) -> tuple[str, str]:
+        """
+        Convert markdown text to a Word document without blocking the event loop.
+        
+        The cache is accessed with its async methods and the conversion runs
+        in a worker thread.
+        
+        Args:
+            markdown_text: The markdown text to convert
+            date: Optional date to insert in the document
+            
+        Returns:
+            Tuple of (markdown with substituted date, path to generated docx)
+        """
+        markdown_text = self._replace_date(markdown_text, date)
+        
+        key = None
+        if self.cache is not None:
+            key = self._export_key(markdown_text)
+            cached = await self.cache.get_async(EXPORT, key)
+            if cached is not None:
+                if os.path.exists(cached["docx_path"]):
+                    return markdown_text, cached["docx_path"]
+                await self.cache.delete_async(EXPORT, key)
+        
+        output_path = self._output_path()
+        await asyncio.to_thread(self.convert, markdown_text, output_path)
+        
+        if key is not None:
+            await self.cache.set_async(EXPORT, key, {"docx_path": output_path})
+        
+        return markdown_text, output_path
+    
+    def _export_key(self, markdown_text: str) -> str:
+        """Get the cache key of an export, covering template and engine."""
+        return text_fingerprint(markdown_text, self.reference_template_path, self.engine)
+    
+    def _output_path(self) -> str:
+        """Create the output directory and a new docx path in it."""
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        return os.path.join(OUTPUT_DIR, unique_filename("verfuegung", ".docx"))
+    
+    def export_batch(
+        self,
+        documents: List[str],
+        date: str = None,
+        output_dir: str = OUTPUT_DIR,
+        max_workers: Optional[int] = None
+    ) -> List[Tuple[str, str]]:
+        """
+        Convert several markdown documents to Word documents in parallel.
+        
+        Args:
+            documents: Markdown texts to convert
+            date: Optional date to insert in every document
+            output_dir: Directory receiving the docx files
+            max_workers: Number of worker processes. Defaults to the CPU count.
+            
+        Returns:
+            List of (markdown with substituted date, path to generated docx),
+            in the order of the input documents
             
-        # Create output path
-        output_dir = "output"
+        Raises:
+            RuntimeError: If a document cannot be converted
+        """
         os.makedirs(output_dir, exist_ok=True)
+        texts = [self._replace_date(text, date) for text in documents]
+        paths = [
+            os.path.join(output_dir, unique_filename(f"verfuegung_{index:03d}", ".docx"))
+            for index in range(1, len(texts) + 1)
+        ]
+        
+        for _ in self._convert_all(texts, paths, max_workers):
+            pass
+        return list(zip(texts, paths))
+    
+    def export_zip(
+        self,
+        documents: List[str],
+        date: str = None,
+        zip_path: Optional[str] = None,
+        max_workers: Optional[int] = None
+    ) -> str:
+        """
+        Convert several markdown documents and bundle them into one ZIP archive.
+        
+        Each document is added to the archive as soon as it is converted.
+        
+        Args:
+            documents: Markdown texts to convert
+            date: Optional date to insert in every document
+            zip_path: Path of the archive. Defaults to a new file in output/.
+            max_workers: Number of worker processes. Defaults to the CPU count.
+            
+        Returns:
+            Path to the ZIP archive
+            
+        Raises:
+            RuntimeError: If a document cannot be converted
+        """
+        if zip_path is None:
+            os.makedirs(OUTPUT_DIR, exist_ok=True)
+            zip_path = os.path.join(OUTPUT_DIR, unique_filename("verfuegungen", ".zip"))
+        
+        texts = [self._replace_date(text, date) for text in documents]
+        work_dir = tempfile.mkdtemp(prefix="export_")
+        names = [f"verfuegung_{index:03d}.docx" for index in range(1, len(texts) + 1)]
+        paths = [os.path.join(work_dir, name) for name in names]
+        
+        try:
+            with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for index in self._convert_all(texts, paths, max_workers):
+                    archive.write(paths[index], arcname=names[index])
+                    os.unlink(paths[index])
+        except Exception:
+            if os.path.exists(zip_path):
+                os.unlink(zip_path)
+            raise
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        
+        return zip_path
+    
+    def _convert_all(self, texts: List[str], paths: List[str], max_workers: Optional[int]):
+        """
+        Convert documents in a process pool.
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_path = os.path.join(output_dir, f"verfuegung_{timestamp}.docx")
+        Yields:
+            Index of each converted document, in completion order
+        """
+        workers = min(max_workers or os.cpu_count() or 1, len(texts))
+        if workers <= 1:
+            # Not worth starting a pool
+            for index, (text, path) in enumerate(zip(texts, paths)):
+                try:
+                    self.convert(text, path)
+                except Exception as e:
+                    raise RuntimeError(f"Export of document {index + 1} failed: {str(e)}") from e
+                yield index
+            return
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_convert_document, text, path, self.reference_template_path, self.engine): index
+                for index, (text, path) in enumerate(zip(texts, paths))
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    raise RuntimeError(f"Export of document {index + 1} failed: {str(e)}") from e
+                yield index
+    
+    def _replace_date(self, markdown_text: str, date: Optional[str]) -> str:
+        """Replace the bold date of a document if a date is given."""
+        if not date:
+            return markdown_text
+        return DATE_PATTERN.sub(f"**{date}**", markdown_text)
+    
+    def convert(self, markdown_text: str, output_path: str):
+        """
+        Write markdown text to a docx file with the configured engine.
+        
+        Args:
+            markdown_text: The markdown text to convert
+            output_path: Path where docx should be saved
+        """
+        if self.engine == ENGINE_DOCX:
+            try:
+                write_docx(markdown_text, output_path, self.reference_template_path)
+                return
+            except Exception as e:
+                print(f"Warning: In-process export failed: {e}")
+                print("Trying with pandoc...")
         
         try:
             # First try with reference doc
-            self._convert_with_pandoc(md_path, output_path, use_reference=True)
+            self._convert_with_pandoc(markdown_text, output_path, use_reference=True)
         except Exception as e:
             print(f"Warning: Failed conversion with reference doc: {e}")
             print("Trying without reference doc...")
-            self._convert_with_pandoc(md_path, output_path, use_reference=False)
-            
-        # Clean up temp file
-        os.unlink(md_path)
-        
-        return markdown_text, output_path
+            self._convert_with_pandoc(markdown_text, output_path, use_reference=False)
     
-    def _convert_with_pandoc(self, input_path: str, output_path: str, use_reference: bool = True):
+    def _convert_with_pandoc(self, markdown_text: str, output_path: str, use_reference: bool = True):
         """
         Convert markdown to docx using pandoc with optional reference doc.
         
+        The markdown is passed to pandoc on stdin, so no temporary file is written.
+        
         Args:
-            input_path: Path to input markdown file
+            markdown_text: The markdown text to convert
             output_path: Path where docx should be saved
             use_reference: Whether to use reference doc for styling
         """
         # Base arguments
-        args = [
-            "--from", "markdown",
-            "--to", "docx",
-            "-o", output_path,
-            "--standalone"
-        ]
+        args = ["--standalone"]
         
         # Add reference doc if requested
         if use_reference:
             args.extend(["--reference-doc", self.reference_template_path])
         
         # Convert using pandoc
-        pypandoc.convert_file(
-            input_path,
+        pypandoc.convert_text(
+            markdown_text,
             "docx",
+            format="markdown",
             outputfile=output_path,
             extra_args=args
-        )
\ No newline at end of file
+        )
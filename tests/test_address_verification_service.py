@@ -0,0 +1,293 @@
+"""
+tests/test_address_verification_service.py - Tests for the address verification fast path
+"""
+
+import asyncio
+from models.core import Person, PersonType, DocumentContext
+from plugins.report_plugin import ReportPlugin
+from plugins.telsearch_plugin import TelsearchPlugin
+from services.address_verification_service import AddressVerificationService
+from utils.name_index import NameIndex
+
+FOUND_FEED = """<feed xmlns="http://www.w3.org/2005/Atom" xmlns:tel="http://tel.search.ch/api/spec/result/1.0/">
+<entry><title>{name}</title>
+<tel:street>Bahnhofstrasse</tel:street><tel:streetno>10</tel:streetno>
+<tel:zip>8001</tel:zip><tel:city>Zürich</tel:city></entry>
+</feed>"""
+
+EMPTY_FEED = """<feed xmlns="http://www.w3.org/2005/Atom"></feed>"""
+
+class FakeTelsearchPlugin(TelsearchPlugin):
+    """Telsearch plugin answering from a fixed set of known names"""
+    
+    def __init__(self, known):
+        self.known = known
+        self.calls = []
+        self.max_concurrency = 4
+    
+    async def fetch_feed_async(self, name, location):
+        self.calls.append((name, location))
+        return FOUND_FEED.format(name=name) if name in self.known else EMPTY_FEED
+
+def _make_service(known):
+    """Create a service without kernel or agents"""
+    service = AddressVerificationService.__new__(AddressVerificationService)
+    service.fast_path = True
+    service.match_threshold = 95
+    service.name_index = NameIndex()
+    service.telsearch_plugin = FakeTelsearchPlugin(known)
+    return service
+
+def _make_context():
+    """Create a context with a requestor and two requested people"""
+    return DocumentContext(
+        requestor=Person(firstname="Max", lastname="Muster", type=PersonType.REQUESTOR),
+        requested_people=[
+            Person(firstname="Hans", lastname="Meier"),
+            Person(firstname="Anna", lastname="Schmidt")
+        ],
+        gemeinde="Zürich",
+        zweck="Test"
+    )
+
+def test_fast_path_resolves_without_agents():
+    """Test that found people are resolved without running the agent chat"""
+    service = _make_service({"Max Muster", "Hans Meier", "Anna Schmidt"})
+    
+    async def no_agents(context, people, report_plugin):
+        raise AssertionError("Agent chat should not run")
+    service._verify_with_agents = no_agents
+    
+    report_plugin = ReportPlugin()
+    addresses, summary, _ = asyncio.run(service.verify_addresses(_make_context(), report_plugin))
+    
+    assert addresses["Hans Meier"] == "Bahnhofstrasse 10, 8001 Zürich"
+    assert report_plugin.get_requestor()["firstname"] == "Max"
+    assert len(report_plugin.get_requested_people()) == 2
+    assert len(service.telsearch_plugin.calls) == 3
+
+def test_fast_path_falls_back_for_unresolved():
+    """Test that only unresolved people are passed to the agent chat"""
+    service = _make_service({"Max Muster", "Hans Meier"})
+    fallback_people = []
+    
+    async def fake_agents(context, people, report_plugin):
+        fallback_people.extend(people)
+        report_plugin.save_people_data(
+            '[{"firstname": "Anna", "lastname": "Schmidt", "address": "Seeweg 1",'
+            ' "city": "8002 Zürich", "type": "requested"}]'
+        )
+        return []
+    service._verify_with_agents = fake_agents
+    
+    addresses, _, _ = asyncio.run(service.verify_addresses(_make_context()))
+    
+    assert [p.full_name for p in fallback_people] == ["Anna Schmidt"]
+    assert addresses["Anna Schmidt"] == "Seeweg 1, 8002 Zürich"
+    assert addresses["Hans Meier"] == "Bahnhofstrasse 10, 8001 Zürich"
+
+def test_unverified_people_reported_as_not_found():
+    """Test that people missing from the agent results are kept without address"""
+    service = _make_service({"Max Muster"})
+    
+    async def fake_agents(context, people, report_plugin):
+        return []
+    service._verify_with_agents = fake_agents
+    
+    addresses, summary, _ = asyncio.run(service.verify_addresses(_make_context()))
+    
+    assert addresses["Hans Meier"] is None
+    assert "Hans Meier: NOT FOUND" in summary
+
+def test_requested_person_with_requestor_name_is_kept():
+    """Test that a requested person named like the requestor is not merged into the requestor"""
+    service = _make_service(set())
+    service.fast_path = False
+    context = _make_context()
+    context.requested_people = [Person(firstname="Max", lastname="Muster")]
+    
+    async def fake_agents(context, people, report_plugin):
+        report_plugin.save_people_data(
+            '[{"firstname": "Max", "lastname": "Muster", "address": "Seeweg 1", "city": "8002 Zürich",'
+            ' "type": "requestor"}, {"firstname": "Max", "lastname": "Muster", "address": "Bergstrasse 5",'
+            ' "city": "8003 Zürich", "type": "requested"}]'
+        )
+        return []
+    service._verify_with_agents = fake_agents
+    
+    report_plugin = ReportPlugin()
+    asyncio.run(service.verify_addresses(context, report_plugin))
+    
+    assert report_plugin.get_requestor()["address"] == "Seeweg 1"
+    assert [p["address"] for p in report_plugin.get_requested_people()] == ["Bergstrasse 5"]
+
+def test_concurrent_runs_are_isolated():
+    """Test that concurrent verifications write to separate report plugins"""
+    service = _make_service({"Max Muster", "Hans Meier", "Anna Schmidt"})
+    
+    other_context = DocumentContext(
+        requestor=Person(firstname="Eva", lastname="Keller", type=PersonType.REQUESTOR),
+        requested_people=[Person(firstname="Hans", lastname="Meier")],
+        gemeinde="Zürich",
+        zweck="Test"
+    )
+    
+    async def fake_agents(context, people, report_plugin):
+        return []
+    service._verify_with_agents = fake_agents
+    
+    async def run_both():
+        first, second = ReportPlugin(), ReportPlugin()
+        await asyncio.gather(
+            service.verify_addresses(_make_context(), first),
+            service.verify_addresses(other_context, second)
+        )
+        return first, second
+    
+    first, second = asyncio.run(run_both())
+    assert first.get_requestor()["firstname"] == "Max"
+    assert len(first.get_requested_people()) == 2
+    assert second.get_requestor()["firstname"] == "Eva"
+    assert len(second.get_requested_people()) == 1
+
+def test_previous_artifact_is_reused():
+    """Test that a second run with unchanged inputs does no lookups"""
+    service = _make_service({"Max Muster", "Hans Meier", "Anna Schmidt"})
+    
+    first_plugin = ReportPlugin()
+    asyncio.run(service.verify_addresses(_make_context(), first_plugin))
+    artifact = service.create_artifact(_make_context(), first_plugin)
+    service.telsearch_plugin.calls.clear()
+    
+    async def no_agents(context, people, report_plugin):
+        raise AssertionError("Agent chat should not run")
+    service._verify_with_agents = no_agents
+    
+    second_plugin = ReportPlugin()
+    addresses, _, messages = asyncio.run(service.verify_addresses(_make_context(), second_plugin, artifact))
+    
+    assert service.telsearch_plugin.calls == []
+    assert addresses["Anna Schmidt"] == "Bahnhofstrasse 10, 8001 Zürich"
+    assert "Reused 3 verified people" in messages[0]["content"]
+    assert service.create_artifact(_make_context(), second_plugin, artifact).version == 2
+
+def test_only_changed_names_are_verified_again():
+    """Test that only people missing from the previous run are looked up"""
+    service = _make_service({"Max Muster", "Hans Meier", "Anna Schmidt", "Peter Müller"})
+    
+    report_plugin = ReportPlugin()
+    asyncio.run(service.verify_addresses(_make_context(), report_plugin))
+    artifact = service.create_artifact(_make_context(), report_plugin)
+    service.telsearch_plugin.calls.clear()
+    
+    context = _make_context()
+    context.requested_people[1] = Person(firstname="Peter", lastname="Müller")
+    addresses, _, _ = asyncio.run(service.verify_addresses(context, ReportPlugin(), artifact))
+    
+    assert service.telsearch_plugin.calls == [("Peter Müller", "Zürich")]
+    assert set(addresses) == {"Max Muster", "Hans Meier", "Peter Müller"}
+
+def test_not_found_verdicts_are_reused():
+    """Test that people not found in the previous run are not looked up or sent to the agents again"""
+    service = _make_service({"Max Muster", "Hans Meier"})
+    
+    async def fake_agents(context, people, report_plugin):
+        return []
+    service._verify_with_agents = fake_agents
+    
+    report_plugin = ReportPlugin()
+    asyncio.run(service.verify_addresses(_make_context(), report_plugin))
+    artifact = service.create_artifact(_make_context(), report_plugin)
+    service.telsearch_plugin.calls.clear()
+    
+    async def no_agents(context, people, report_plugin):
+        raise AssertionError("Agent chat should not run")
+    service._verify_with_agents = no_agents
+    
+    addresses, summary, _ = asyncio.run(service.verify_addresses(_make_context(), ReportPlugin(), artifact))
+    
+    assert service.telsearch_plugin.calls == []
+    assert addresses["Anna Schmidt"] is None
+    assert "Anna Schmidt: NOT FOUND" in summary
+
+def test_previous_artifact_ignored_for_other_municipality():
+    """Test that results from another municipality are not reused"""
+    service = _make_service({"Max Muster", "Hans Meier", "Anna Schmidt"})
+    
+    report_plugin = ReportPlugin()
+    asyncio.run(service.verify_addresses(_make_context(), report_plugin))
+    artifact = service.create_artifact(_make_context(), report_plugin)
+    artifact.gemeinde = "Bern"
+    service.telsearch_plugin.calls.clear()
+    
+    asyncio.run(service.verify_addresses(_make_context(), ReportPlugin(), artifact))
+    
+    assert len(service.telsearch_plugin.calls) == 3
+
+def test_fast_path_escalates_low_confidence_matches():
+    """Test that entries not matching the requested name are left to the agents"""
+    service = _make_service({"Max Muster", "Anna Schmidt"})
+    known_feed = service.telsearch_plugin.fetch_feed_async
+    
+    async def fetch_feed_async(name, location):
+        if name == "Hans Meier":
+            # A different person and the same name at two addresses
+            return FOUND_FEED.format(name="Hans Meyer")
+        if name == "Anna Schmidt":
+            second = FOUND_FEED.format(name=name).replace("<tel:streetno>10", "<tel:streetno>12")
+            return (await known_feed(name, location)).replace("</feed>", second.split(">", 1)[1])
+        return await known_feed(name, location)
+    service.telsearch_plugin.fetch_feed_async = fetch_feed_async
+    
+    fallback_people = []
+    
+    async def fake_agents(context, people, report_plugin):
+        fallback_people.extend(people)
+        return []
+    service._verify_with_agents = fake_agents
+    
+    asyncio.run(service.verify_addresses(_make_context()))
+    
+    assert [p.full_name for p in fallback_people] == ["Hans Meier", "Anna Schmidt"]
+
+def test_fast_path_accepts_transliterated_names():
+    """Test that umlaut spellings and name order do not prevent a direct match"""
+    service = _make_service(set())
+    
+    async def fetch_feed_async(name, location):
+        return FOUND_FEED.format(name="Mueller, Peter")
+    service.telsearch_plugin.fetch_feed_async = fetch_feed_async
+    
+    resolved, unresolved = asyncio.run(service._verify_direct([Person(firstname="Peter", lastname="Müller")], "Zürich"))
+    
+    assert unresolved == []
+    assert resolved[0]["address"] == "Bahnhofstrasse 10"
+
+def test_fast_path_corrects_known_spelling_variants():
+    """Test that a misspelled name is looked up again in its known spelling"""
+    service = _make_service({"Peter Müller"})
+    service.name_index.add("Peter", "Müller", "Zürich")
+    
+    resolved, unresolved = asyncio.run(service._verify_direct([Person(firstname="Peter", lastname="Muller")], "Zürich"))
+    
+    assert unresolved == []
+    assert resolved[0]["lastname"] == "Muller"
+    assert resolved[0]["address"] == "Bahnhofstrasse 10"
+    assert service.telsearch_plugin.calls == [("Peter Muller", "Zürich"), ("Peter Müller", "Zürich")]
+
+def test_name_index_learns_verified_spellings():
+    """Test that spellings confirmed by a lookup correct later requests"""
+    service = _make_service({"Anna Schärer"})
+    
+    async def fetch_feed_async(name, location):
+        service.telsearch_plugin.calls.append((name, location))
+        if name == "Anna Schärer":
+            return FOUND_FEED.replace("<title>{name}</title>", "<tel:firstname>Anna</tel:firstname><tel:name>Schärer</tel:name>")
+        return EMPTY_FEED
+    service.telsearch_plugin.fetch_feed_async = fetch_feed_async
+    
+    asyncio.run(service._verify_direct([Person(firstname="Anna", lastname="Schärer")], "Zürich"))
+    resolved, _ = asyncio.run(service._verify_direct([Person(firstname="Anna", lastname="Scherer")], "Zürich"))
+    
+    assert len(service.name_index) == 1
+    assert resolved[0]["address"] == "Bahnhofstrasse 10"
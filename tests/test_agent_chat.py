@@ -1,13 +1,21 @@
 import unittest
-from unittest.mock import MagicMock
 from semantic_kernel import Kernel
 from semantic_kernel.agents import AgentGroupChat
+from semantic_kernel.agents.strategies import KernelFunctionSelectionStrategy
+from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
 from agents.agent_chat import setup_agent_chat
 from agents.address_agents import RETRIEVER, REPORT_AGENT
+from agents.selection_strategy import LookupProgress, RuleBasedSelectionStrategy
 
 class TestAgentChat(unittest.TestCase):
     def setUp(self):
-        self.kernel = MagicMock(spec=Kernel)
+        self.kernel = Kernel()
+        self.kernel.add_service(AzureChatCompletion(
+            deployment_name="gpt-4o",
+            endpoint="https://example.openai.azure.com",
+            api_key="key",
+            api_version="2024-10-21"
+        ))
 
     def test_setup_agent_chat_returns_agent_group_chat(self):
         chat = setup_agent_chat(self.kernel)
@@ -24,5 +32,20 @@ class TestAgentChat(unittest.TestCase):
         self.assertIsNotNone(chat.selection_strategy)
         self.assertEqual(chat.selection_strategy.initial_agent.name, RETRIEVER)
 
+    def test_rule_based_selection_is_default(self):
+        chat = setup_agent_chat(self.kernel, llm_selection=False)
+        self.assertIsInstance(chat.selection_strategy, RuleBasedSelectionStrategy)
+        self.assertEqual(chat.selection_strategy.worker_name, RETRIEVER)
+        self.assertEqual(chat.selection_strategy.reporter_name, REPORT_AGENT)
+
+    def test_rule_based_selection_tracks_names(self):
+        chat = setup_agent_chat(self.kernel, llm_selection=False, names=["Hans Meier", "Anna Schmidt"])
+        self.assertIsInstance(chat.selection_strategy.progress, LookupProgress)
+        self.assertEqual(chat.selection_strategy.progress.pending(set()), 2)
+
+    def test_llm_selection_is_opt_in(self):
+        chat = setup_agent_chat(self.kernel, llm_selection=True)
+        self.assertIsInstance(chat.selection_strategy, KernelFunctionSelectionStrategy)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,100 @@
+"""
+tests/test_atom_feed.py - Tests for the streaming tel.search.ch feed parser
+"""
+
+import pytest
+import xml.etree.ElementTree as ET
+from models.core import AddressEntry
+from utils.atom_feed import iter_entries, parse_entries, render_feed
+
+def _entry(firstname, lastname, street, streetno, zip_code, city):
+    """Build a tel.search.ch style Atom entry"""
+    return f"""
+  <entry>
+    <id>urn:uuid:{lastname}</id>
+    <title type="text">{lastname}, {firstname}</title>
+    <content type="text">{firstname} {lastname}, {street} {streetno}, {zip_code} {city}</content>
+    <tel:name>{lastname}</tel:name>
+    <tel:firstname>{firstname}</tel:firstname>
+    <tel:street>{street}</tel:street>
+    <tel:streetno>{streetno}</tel:streetno>
+    <tel:zip>{zip_code}</tel:zip>
+    <tel:city>{city}</tel:city>
+    <tel:phone>+41441234567</tel:phone>
+  </entry>"""
+
+def _feed(*entries):
+    """Wrap entries in an Atom feed with the tel namespace"""
+    return ('<?xml version="1.0" encoding="utf-8" ?>\n'
+            '<feed xmlns="http://www.w3.org/2005/Atom" '
+            'xmlns:tel="http://tel.search.ch/api/spec/result/1.0/">'
+            + "".join(entries) + "\n</feed>")
+
+FEED = _feed(
+    _entry("Hans", "Meier", "Bahnhofstrasse", "10", "8001", "Zürich"),
+    _entry("Anna", "Meier", "Seeweg", "3a", "8002", "Zürich"),
+    _entry("Peter", "Meier", "Dorfstrasse", "1", "8003", "Zürich")
+)
+
+def test_iter_entries_reads_all_entries():
+    """Test that every entry is returned with its tel: fields"""
+    entries = list(iter_entries(FEED))
+    
+    assert len(entries) == 3
+    first = entries[0]
+    assert first.firstname == "Hans"
+    assert first.name == "Meier"
+    assert first.street_address == "Bahnhofstrasse 10"
+    assert first.zip_city == "8001 Zürich"
+    assert first.phone == "+41441234567"
+    assert entries[1].streetno == "3a"
+
+def test_iter_entries_stops_at_limit():
+    """Test that parsing stops after the requested number of entries"""
+    # Anything after the first entry is never parsed, even if malformed
+    truncated = FEED.split("<entry>")[0] + "<entry>" + FEED.split("<entry>")[1] + "<entry><broken"
+    entries = list(iter_entries(truncated, limit=1))
+    
+    assert len(entries) == 1
+    assert entries[0].firstname == "Hans"
+
+def test_iter_entries_large_feed():
+    """Test parsing a feed larger than a single parser chunk"""
+    feed = _feed(*[_entry(f"Person{i}", "Muster", "Weg", str(i), "8000", "Zürich") for i in range(200)])
+    entries = list(iter_entries(feed))
+    
+    assert len(entries) == 200
+    assert entries[-1].firstname == "Person199"
+
+def test_iter_entries_nested_in_other_element():
+    """Test that entries below another element are parsed and removed from that parent"""
+    feed = FEED.replace("<entry>", "<group><entry>", 1).replace("</entry>", "</entry></group>", 1)
+    entries = list(iter_entries(feed))
+    
+    assert [e.firstname for e in entries] == ["Hans", "Anna", "Peter"]
+
+def test_empty_feed():
+    """Test that a feed without entries yields nothing"""
+    assert parse_entries(_feed()) == []
+
+def test_malformed_feed():
+    """Test that malformed XML raises in iter_entries and is ignored by parse_entries"""
+    with pytest.raises(ET.ParseError):
+        list(iter_entries("<feed><entry></feed>"))
+    assert parse_entries("<feed><entry></feed>") == []
+
+def test_to_address_dict_skips_missing_fields():
+    """Test that only available address components are returned"""
+    entry = parse_entries(_feed("<entry><title>Meier</title><tel:zip>8001</tel:zip></entry>"))[0]
+    assert entry.to_address_dict() == {"zip": "8001"}
+
+def test_render_feed_round_trip():
+    """Test that rendered entries are parsed back unchanged"""
+    entries = [
+        AddressEntry(title="Meier, Hans", name="Meier", firstname="Hans", street="Bahnhofstrasse",
+                     streetno="10", zip="8001", city="Zürich & Umgebung"),
+        AddressEntry(title="Müller, Peter", name="Müller", firstname="Peter")
+    ]
+    
+    assert parse_entries(render_feed(entries)) == entries
+    assert parse_entries(render_feed([])) == []
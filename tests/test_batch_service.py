@@ -0,0 +1,173 @@
+"""
+tests/test_batch_service.py - Tests for the headless batch runner
+"""
+
+import asyncio
+import json
+import os
+import pytest
+from models.core import VerificationArtifact
+from services.batch_service import EXPORT, GENERATE, VALIDATE, VERIFY, BatchService, load_manifest
+
+class FakeAddressService:
+    """Address service marking every person as verified"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def verify_addresses(self, context, report_plugin=None, previous=None):
+        self.calls += 1
+        people = [context.requestor] + list(context.requested_people)
+        report_plugin.save_people_data(json.dumps([
+            {"firstname": p.firstname, "lastname": p.lastname, "address": "Bahnhofstrasse 1",
+             "city": "8001 Zürich", "type": p.type.value}
+            for p in people
+        ]))
+        return {}, "", []
+
+    def create_artifact(self, context, report_plugin, previous=None):
+        return VerificationArtifact(gemeinde=context.gemeinde, people=list(report_plugin.people))
+
+class FakeDocumentService:
+    """Document service rendering the names and failing validation on request"""
+
+    def __init__(self, fail_validation=False):
+        self.fail_validation = fail_validation
+        self.generated = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def generate_document(self, context):
+        self.generated += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        names = ", ".join(p.full_name for p in context.requested_people)
+        return f"# Declaration\n**01.01.2024**\n\n{names}"
+
+    async def validate_document(self, document_text):
+        if self.fail_validation:
+            raise RuntimeError("Validation failed: timeout")
+        return "report", [{"section": "A", "item": "Q", "status": "passed", "details": ""}], []
+
+class FakeExportService:
+    """Export service writing the markdown instead of a docx file"""
+
+    def export_batch(self, documents, date=None, output_dir="output", max_workers=None):
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"doc_{len(os.listdir(output_dir))}.docx")
+        text = documents[0].replace("**01.01.2024**", f"**{date}**")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return [(text, path)]
+
+def _write_manifest(tmp_path, count=3):
+    """Write a manifest with the given number of requests"""
+    manifest = tmp_path / "requests.json"
+    manifest.write_text(json.dumps({"requests": [
+        {
+            "id": f"req-{i}",
+            "requestor": "Mustermann, Max",
+            "gemeinde": "Zürich",
+            "zweck": "Neighborhood Contact",
+            "people": ["Hans Meier", f"Müller, Anna{i}"]
+        }
+        for i in range(count)
+    ]}), encoding="utf-8")
+    return str(manifest)
+
+def _make_service(tmp_path, document_service, max_workers=2):
+    """Create a batch service with fake services"""
+    return BatchService(
+        FakeAddressService(),
+        document_service,
+        FakeExportService(),
+        output_dir=str(tmp_path / "batch"),
+        max_workers=max_workers
+    )
+
+def test_load_manifest(tmp_path):
+    """Test that manifest entries become batch requests"""
+    requests = load_manifest(_write_manifest(tmp_path, count=2))
+
+    assert [r.id for r in requests] == ["req-0", "req-1"]
+    assert requests[0].requestor.firstname == "Max"
+    assert requests[1].requested_people[1].firstname == "Anna1"
+
+def test_load_manifest_rejects_invalid_requests(tmp_path):
+    """Test that missing fields and duplicate ids are reported with the request id"""
+    manifest = tmp_path / "requests.jsonl"
+    manifest.write_text('{"id": "a", "requestor": "Max Muster", "zweck": "X", "people": ["Hans Meier"]}\n')
+    with pytest.raises(ValueError, match="Request a: missing field 'gemeinde'"):
+        load_manifest(str(manifest))
+
+    entry = {"id": "a", "requestor": "Max Muster", "gemeinde": "Bern", "zweck": "X", "people": ["Hans Meier"]}
+    manifest.write_text(json.dumps(entry) + "\n" + json.dumps(entry) + "\n")
+    with pytest.raises(ValueError, match="Duplicate request ids: a"):
+        load_manifest(str(manifest))
+
+def test_people_file_in_manifest(tmp_path):
+    """Test that a people list file is resolved relative to the manifest"""
+    (tmp_path / "people.csv").write_text("Vorname;Nachname\nHans;Meier\n", encoding="utf-8")
+    manifest = tmp_path / "requests.json"
+    manifest.write_text(json.dumps([{
+        "id": "a", "requestor": {"firstname": "Max", "lastname": "Muster"},
+        "gemeinde": "Bern", "zweck": "X", "people_file": "people.csv"
+    }]))
+
+    requests = load_manifest(str(manifest))
+
+    assert [p.full_name for p in requests[0].requested_people] == ["Hans Meier"]
+
+def test_run_processes_all_phases_with_bounded_workers(tmp_path):
+    """Test that every request passes all phases and the index lists the results"""
+    documents = FakeDocumentService()
+    service = _make_service(tmp_path, documents, max_workers=2)
+    requests = load_manifest(_write_manifest(tmp_path, count=5))
+
+    entries = asyncio.run(service.run(requests, date="15.03.2024"))
+
+    assert [e["id"] for e in entries] == [f"req-{i}" for i in range(5)]
+    assert all(e["status"] == "done" for e in entries)
+    assert entries[0]["completed"] == [VERIFY, GENERATE, VALIDATE, EXPORT]
+    assert entries[0]["validation"] == {"passed": 1, "failed": 0}
+    assert documents.max_active <= 2
+    with open(entries[3]["docx_path"], encoding="utf-8") as f:
+        assert "**15.03.2024**" in f.read()
+
+    with open(service.index_path, encoding="utf-8") as f:
+        index = json.load(f)
+    assert index["total"] == 5 and index["done"] == 5 and index["failed"] == 0
+
+def test_run_resumes_after_failed_phase(tmp_path):
+    """Test that a rerun continues with the failed phase and skips completed ones"""
+    documents = FakeDocumentService(fail_validation=True)
+    service = _make_service(tmp_path, documents)
+    requests = load_manifest(_write_manifest(tmp_path, count=2))
+
+    entries = asyncio.run(service.run(requests))
+    assert all(e["status"] == "failed" for e in entries)
+    assert entries[0]["completed"] == [VERIFY, GENERATE]
+    assert entries[0]["error"] == "validate: Validation failed: timeout"
+
+    documents.fail_validation = False
+    entries = asyncio.run(service.run(requests))
+
+    assert all(e["status"] == "done" for e in entries)
+    assert documents.generated == 2  # Documents of the first run are reused
+    assert service.address_service.calls == 2
+    assert service.load_checkpoint("req-1").error is None
+
+def test_changed_request_starts_over(tmp_path):
+    """Test that the progress of a changed manifest entry is discarded"""
+    documents = FakeDocumentService()
+    service = _make_service(tmp_path, documents)
+    requests = load_manifest(_write_manifest(tmp_path, count=1))
+    asyncio.run(service.run(requests))
+
+    requests[0].gemeinde = "Bern"
+    asyncio.run(service.run(requests))
+
+    assert documents.generated == 2
+    assert service.address_service.calls == 2
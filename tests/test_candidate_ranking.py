@@ -0,0 +1,52 @@
+"""
+tests/test_candidate_ranking.py - Tests for fuzzy ranking of lookup candidates
+"""
+
+from models.core import AddressEntry
+from utils.candidate_ranking import rank_candidates, score_candidate, select_match, transliterate
+
+def _entry(firstname, name, city="Zürich", street="Bahnhofstrasse", streetno="10"):
+    """Create a lookup entry with a complete address"""
+    return AddressEntry(firstname=firstname, name=name, street=street, streetno=streetno, zip="8001", city=city)
+
+def test_transliterate():
+    """Test that umlauts, ß, accents, case and whitespace are normalized"""
+    assert transliterate("Müller-Großmann") == "mueller-grossmann"
+    assert transliterate("  Hélène   SCHÄRER ") == "helene schaerer"
+
+def test_score_ignores_spelling_variants_and_order():
+    """Test that transliterated names in any order score as exact matches"""
+    candidate = score_candidate("Meier, Jürg", "Zürich", _entry("Juerg", "Meier"))
+    assert candidate.name_score == 100
+    assert candidate.confidence == 100
+
+def test_score_penalizes_other_location():
+    """Test that an entry from another municipality loses confidence"""
+    local = score_candidate("Hans Meier", "Zürich", _entry("Hans", "Meier"))
+    remote = score_candidate("Hans Meier", "Zürich", _entry("Hans", "Meier", city="Genève"))
+    assert remote.confidence < local.confidence
+
+def test_title_used_without_name_fields():
+    """Test that the entry title is scored if the name fields are missing"""
+    entry = AddressEntry(title="Meier, Hans", city="Zürich")
+    assert score_candidate("Hans Meier", "Zürich", entry).name_score == 100
+
+def test_rank_candidates_best_first():
+    """Test that the best matching entry is ranked first regardless of feed order"""
+    entries = [_entry("Peter", "Meier"), _entry("Hans", "Meyer"), _entry("Hans", "Meier")]
+    ranked = rank_candidates("Hans Meier", "Zürich", entries)
+    assert [c.entry.firstname + " " + c.entry.name for c in ranked] == ["Hans Meier", "Hans Meyer", "Peter Meier"]
+
+def test_select_match_threshold():
+    """Test that only confident matches are accepted"""
+    assert select_match(rank_candidates("Hans Meier", "Zürich", [_entry("Hans", "Meyer")]), 95) is None
+    match = select_match(rank_candidates("Hans Meier", "Zürich", [_entry("Hans", "Meier")]), 95)
+    assert match.entry.name == "Meier"
+    assert select_match([], 95) is None
+
+def test_select_match_rejects_ambiguous_addresses():
+    """Test that two confident entries at different addresses need the agents"""
+    same = [_entry("Hans", "Meier"), _entry("Hans", "Meier")]
+    different = [_entry("Hans", "Meier"), _entry("Hans", "Meier", streetno="12")]
+    assert select_match(rank_candidates("Hans Meier", "Zürich", same), 95) is not None
+    assert select_match(rank_candidates("Hans Meier", "Zürich", different), 95) is None
@@ -0,0 +1,91 @@
+"""
+tests/test_checklist.py - Tests for checklist parsing and item verdicts
+"""
+
+import json
+import pytest
+from models.core import ChecklistItem
+from utils.checklist import parse_checklist, parse_item_verdict, parse_structured_results
+
+def test_parse_validation_questions():
+    """Test that the shipped checklist splits into one item per section"""
+    with open("templates/validation_questions.md", encoding="utf-8") as f:
+        items = parse_checklist(f.read())
+    
+    assert [item.section for item in items] == [
+        "Legal Basis",
+        "List Inquiry",
+        "Declaration of Commitment - General Obligations",
+        "Legal Remedies"
+    ]
+    assert items[3].item.startswith("Is there a correct reference to the Municipal Act")
+    assert [item.position for item in items] == [0, 1, 2, 3]
+
+def test_parse_checklist_multiple_items_per_section():
+    """Test that all items of a section are returned in order"""
+    items = parse_checklist("1. First\n☐ Item A\n☐ Item B\n\n2. Second\n☐ Item C\n")
+    
+    assert [(item.section, item.item) for item in items] == [
+        ("First", "Item A"), ("First", "Item B"), ("Second", "Item C")
+    ]
+
+def test_parse_item_verdict():
+    """Test that a fenced JSON verdict is converted into a result"""
+    item = ChecklistItem(section="Legal Basis", item="Are the legal foundations specified?")
+    
+    result = parse_item_verdict(item, '```json\n{"status": "Passed", "details": "All present"}\n```')
+    
+    assert result == {
+        "section": "Legal Basis",
+        "item": "Are the legal foundations specified?",
+        "status": "passed",
+        "details": "All present"
+    }
+
+def test_parse_item_verdict_invalid_answer_fails():
+    """Test that an unreadable answer is recorded as failed"""
+    item = ChecklistItem(section="Legal Basis", item="Are the legal foundations specified?")
+    
+    result = parse_item_verdict(item, "The document looks fine.")
+    
+    assert result["status"] == "failed"
+    assert "Could not evaluate" in result["details"]
+
+def _checklist():
+    """Create a checklist with two items"""
+    return [
+        ChecklistItem(section="Legal Basis", item="Are the legal foundations specified?", position=0),
+        ChecklistItem(section="Legal Remedies", item="Is the Municipal Act referenced?", position=1)
+    ]
+
+def test_parse_structured_results_in_checklist_order():
+    """Test that results are matched by item text and returned in checklist order"""
+    answer = json.dumps({"results": [
+        {"section": "Legal Remedies", "item": "is the municipal act referenced?",
+         "status": "failed", "details": "§§ 172 ff. missing"},
+        {"section": "Legal Basis", "item": "Are the legal foundations specified?",
+         "status": "passed", "details": "Complete"}
+    ]})
+    
+    results = parse_structured_results(answer, _checklist())
+    
+    assert [r["status"] for r in results] == ["passed", "failed"]
+    assert results[1]["item"] == "Is the Municipal Act referenced?"
+    assert results[1]["details"] == "§§ 172 ff. missing"
+
+def test_parse_structured_results_missing_item_fails():
+    """Test that a checklist item without a result is recorded as failed"""
+    answer = json.dumps({"results": [
+        {"section": "Legal Basis", "item": "Are the legal foundations specified?",
+         "status": "passed", "details": "Complete"}
+    ]})
+    
+    results = parse_structured_results(answer, _checklist())
+    
+    assert results[1]["status"] == "failed"
+    assert "No valid result" in results[1]["details"]
+
+def test_parse_structured_results_rejects_invalid_json():
+    """Test that an answer that is not JSON raises ValueError"""
+    with pytest.raises(ValueError):
+        parse_structured_results("not json", _checklist())
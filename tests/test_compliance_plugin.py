@@ -2,6 +2,7 @@
 tests/test_compliance_plugin.py - Tests for the compliance validation plugin
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from plugins.compliance_plugin import CompliancePlugin
 
 def test_compliance_plugin_init():
@@ -82,4 +83,51 @@ def test_get_validation_summary():
     assert len(summary["Section A"]) == 2
     assert len(summary["Section B"]) == 1
     assert summary["Section A"][0]["item"] == "Item 1"
-    assert summary["Section B"][0]["status"] == "passed"
\ No newline at end of file
+    assert summary["Section B"][0]["status"] == "passed"
+
+def test_add_result_from_concurrent_threads():
+    """Test that results added from several threads are all kept"""
+    plugin = CompliancePlugin()
+    
+    def add(index):
+        return plugin.add_result({"section": "S", "item": f"Item {index}", "status": "passed"})
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(add, range(100)))
+    
+    assert len(plugin.get_validation_results()) == 100
+    assert plugin.get_validation_results()[0]["details"] is None
+
+def test_sort_results_in_checklist_order():
+    """Test that results are sorted into the given item order"""
+    plugin = CompliancePlugin()
+    plugin.add_result({"section": "B", "item": "Item 2", "status": "failed"})
+    plugin.add_result({"section": "A", "item": "Item 1", "status": "passed"})
+    
+    plugin.sort_results(["Item 1", "Item 2"])
+    
+    assert [r["item"] for r in plugin.get_validation_results()] == ["Item 1", "Item 2"]
+
+def test_save_validation_results_bulk():
+    """Test that a JSON array of results is saved in one call"""
+    plugin = CompliancePlugin()
+    
+    result = plugin.save_validation_results(
+        '[{"section": "A", "item": "Item 1", "status": "passed", "details": "ok"},'
+        ' {"section": "B", "item": "Item 2", "status": "failed"}]'
+    )
+    
+    assert "Successfully saved 2" in result
+    assert plugin.get_validation_results()[1]["details"] is None
+
+def test_save_validation_results_is_all_or_nothing():
+    """Test that no result is stored if one of them is invalid"""
+    plugin = CompliancePlugin()
+    
+    result = plugin.save_validation_results(
+        '[{"section": "A", "item": "Item 1", "status": "passed"},'
+        ' {"section": "B", "item": "Item 2", "status": "unknown"}]'
+    )
+    
+    assert "status must be 'passed' or 'failed'" in result
+    assert plugin.get_validation_results() == []
@@ -0,0 +1,134 @@
+"""
+tests/test_document_cache.py - Tests for the content-addressed document cache
+"""
+
+import asyncio
+import threading
+from models.core import Person, PersonType, DocumentContext
+from utils.document_cache import DOCUMENT, VALIDATION, DocumentCache, context_fingerprint, text_fingerprint
+
+def _make_context(people, zweck="Neighborhood Contact"):
+    """Create a context for the given requested people"""
+    return DocumentContext(
+        requestor=Person(firstname="Max", lastname="Muster", type=PersonType.REQUESTOR),
+        requested_people=people,
+        gemeinde="Zürich",
+        zweck=zweck
+    )
+
+def test_fingerprint_ignores_order_of_people():
+    """Test that the order of the requested people does not change the key"""
+    hans = Person(firstname="Hans", lastname="Meier")
+    anna = Person(firstname="Anna", lastname="Keller")
+    
+    assert context_fingerprint(_make_context([hans, anna]), "v1") == \
+        context_fingerprint(_make_context([anna, hans]), "v1")
+
+def test_fingerprint_normalizes_whitespace():
+    """Test that extra whitespace does not change the key"""
+    hans = Person(firstname="Hans", lastname="Meier")
+    
+    assert context_fingerprint(_make_context([hans], "Neighborhood Contact"), "v1") == \
+        context_fingerprint(_make_context([hans], " Neighborhood   Contact "), "v1")
+
+def test_fingerprint_changes_with_content_and_template_version():
+    """Test that different people, purposes and templates get different keys"""
+    hans = Person(firstname="Hans", lastname="Meier")
+    anna = Person(firstname="Anna", lastname="Keller")
+    base = context_fingerprint(_make_context([hans]), "v1")
+    
+    assert context_fingerprint(_make_context([anna]), "v1") != base
+    assert context_fingerprint(_make_context([hans], "Debt Collection"), "v1") != base
+    assert context_fingerprint(_make_context([hans]), "v2") != base
+
+def test_text_fingerprint_separates_parts():
+    """Test that the boundary between parts is part of the hash"""
+    assert text_fingerprint("ab", "c") != text_fingerprint("a", "bc")
+
+def test_cache_round_trip_on_disk(tmp_path):
+    """Test that artifacts are persisted across cache instances"""
+    path = str(tmp_path / "documents.sqlite3")
+    DocumentCache(path=path).set(DOCUMENT, "key", {"markdown": "# Order"})
+    
+    assert DocumentCache(path=path).get(DOCUMENT, "key") == {"markdown": "# Order"}
+
+def test_async_access_uses_worker_thread(tmp_path):
+    """Test that the async methods read and write the disk tier off the event loop"""
+    cache = DocumentCache(path=str(tmp_path / "documents.sqlite3"))
+    disk_threads = []
+    write_disk = cache._store._set_disk
+    
+    def recording_set_disk(*args):
+        disk_threads.append(threading.get_ident())
+        return write_disk(*args)
+    cache._store._set_disk = recording_set_disk
+    
+    async def run():
+        await cache.set_async(DOCUMENT, "key", {"markdown": "# Order"})
+        cache._store._memory.clear()
+        value = await cache.get_async(DOCUMENT, "key")
+        await cache.delete_async(DOCUMENT, "key")
+        return value, await cache.get_async(DOCUMENT, "key"), threading.get_ident()
+    
+    value, deleted, loop_thread = asyncio.run(run())
+    
+    assert value == {"markdown": "# Order"}
+    assert deleted is None
+    assert disk_threads and loop_thread not in disk_threads
+
+def test_get_or_create_deduplicates_concurrent_requests():
+    """Test that concurrent identical requests share one computation"""
+    cache = DocumentCache()
+    calls = []
+    
+    async def create():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"markdown": "# Order"}
+    
+    async def run():
+        return await asyncio.gather(*[cache.get_or_create(DOCUMENT, "key", create) for _ in range(5)])
+    
+    results = asyncio.run(run())
+    
+    assert len(calls) == 1
+    assert all(result == {"markdown": "# Order"} for result in results)
+
+def test_get_or_create_does_not_cache_failures():
+    """Test that a failed computation is retried on the next request"""
+    cache = DocumentCache()
+    
+    async def fail():
+        raise RuntimeError("LLM unavailable")
+    
+    async def succeed():
+        return {"markdown": "# Order"}
+    
+    async def run():
+        try:
+            await cache.get_or_create(DOCUMENT, "key", fail)
+        except RuntimeError:
+            pass
+        return await cache.get_or_create(DOCUMENT, "key", succeed)
+    
+    assert asyncio.run(run()) == {"markdown": "# Order"}
+
+def test_get_or_create_skips_rejected_values(tmp_path):
+    """Test that values rejected by cacheable are neither stored nor served"""
+    path = str(tmp_path / "documents.sqlite3")
+    cache = DocumentCache(path=path)
+    cache.set(VALIDATION, "key", {"complete": False})
+    values = iter([{"complete": False}, {"complete": True}])
+    
+    async def create():
+        return next(values)
+    
+    def complete(value):
+        return value["complete"]
+    
+    first = asyncio.run(cache.get_or_create(VALIDATION, "key", create, cacheable=complete))
+    assert first == {"complete": False}
+    assert DocumentCache(path=path).get(VALIDATION, "key") is None
+    
+    asyncio.run(cache.get_or_create(VALIDATION, "key", create, cacheable=complete))
+    assert DocumentCache(path=path).get(VALIDATION, "key") == {"complete": True}
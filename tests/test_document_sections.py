@@ -0,0 +1,54 @@
+"""
+tests/test_document_sections.py - Tests for splitting documents into sections
+"""
+
+import re
+from utils.document_sections import dependent_text, split_blocks
+
+DOCUMENT = """# Order
+
+### Order:
+
+1. Disclosure to **Max Muster**.
+   The purpose of this data disclosure is exclusively: **Neighborhood Contact**
+
+2. Obligations:
+
+   a) Use only for the stated purpose.
+
+---
+
+Legal Remedies pursuant to §§ 172 ff. of the Municipal Act
+"""
+
+def test_split_blocks_at_headings_items_and_rules():
+    """Test that nested lines stay with their list item"""
+    blocks = split_blocks(DOCUMENT)
+    
+    assert blocks[0] == "# Order"
+    assert blocks[1] == "### Order:"
+    assert blocks[2].startswith("1. Disclosure") and "Neighborhood Contact" in blocks[2]
+    assert blocks[3].startswith("2. Obligations") and "a) Use only" in blocks[3]
+    assert blocks[4].startswith("---") and "Municipal Act" in blocks[4]
+
+def test_dependent_text_selects_matching_blocks():
+    """Test that only blocks matching a pattern are selected"""
+    blocks = split_blocks(DOCUMENT)
+    
+    text = dependent_text(blocks, [re.compile("Municipal Act")])
+    
+    assert "§§ 172 ff." in text
+    assert "Neighborhood Contact" not in text
+
+def test_dependent_text_ignores_edits_elsewhere():
+    """Test that editing an unrelated block keeps the dependent text"""
+    patterns = [re.compile("Legal Remedies")]
+    edited = DOCUMENT.replace("Neighborhood Contact", "Donation Request")
+    
+    assert dependent_text(split_blocks(DOCUMENT), patterns) == dependent_text(split_blocks(edited), patterns)
+
+def test_dependent_text_without_patterns_is_whole_document():
+    """Test that items without dependencies depend on the whole document"""
+    blocks = split_blocks(DOCUMENT)
+    
+    assert dependent_text(blocks, []) == "\n\n".join(blocks)
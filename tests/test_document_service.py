@@ -0,0 +1,220 @@
+"""
+tests/test_document_service.py - Tests for document generation in the document service
+"""
+
+import asyncio
+import json
+from models.core import Person, PersonType, DocumentContext, ValidationMode
+from services.document_service import DocumentService
+from utils.document_cache import DocumentCache
+
+class FakeStreamingContent:
+    """Stand-in for a streaming chat message chunk"""
+    
+    def __init__(self, text):
+        self.text = text
+    
+    def __str__(self):
+        return self.text
+
+class FakeKernel:
+    """Kernel stand-in streaming a fixed answer"""
+    
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.prompts = []
+    
+    async def invoke_prompt_stream(self, prompt, settings=None):
+        self.prompts.append(prompt)
+        for chunk in self.chunks:
+            yield [FakeStreamingContent(chunk)]
+
+def _make_context():
+    """Create a context with one requested person"""
+    return DocumentContext(
+        requestor=Person(firstname="Max", lastname="Muster", address="Hauptstrasse 1",
+                         city="8000 Zürich", type=PersonType.REQUESTOR),
+        requested_people=[Person(firstname="Hans", lastname="Meier")],
+        gemeinde="Zürich",
+        zweck="Neighborhood Contact"
+    )
+
+def test_generate_document_stream_yields_chunks():
+    """Test that the document is streamed chunk by chunk"""
+    kernel = FakeKernel(["# Order", " for ", "Disclosure"])
+    service = DocumentService(kernel, use_llm=True)
+    
+    async def collect():
+        return [chunk async for chunk in service.generate_document_stream(_make_context())]
+    
+    chunks = asyncio.run(collect())
+    assert chunks == ["# Order", " for ", "Disclosure"]
+    assert "Max Muster" in kernel.prompts[0]
+    assert "Hans Meier: NOT FOUND" in kernel.prompts[0]
+
+def test_generate_document_from_template_without_llm():
+    """Test that the template is filled locally without calling the kernel"""
+    kernel = FakeKernel([])
+    service = DocumentService(kernel, use_llm=False)
+    
+    document = asyncio.run(service.generate_document(_make_context()))
+    
+    assert kernel.prompts == []
+    assert "**Max Muster** (residing at: Hauptstrasse 1, 8000 Zürich)" in document
+    assert "**Neighborhood Contact**" in document
+    assert "{" not in document
+
+def test_generate_document_stream_uses_cache():
+    """Test that a repeated request is answered from the cache without the LLM"""
+    kernel = FakeKernel(["# Order", " for ", "Disclosure"])
+    service = DocumentService(kernel, use_llm=True, cache=DocumentCache())
+    
+    async def collect():
+        return [chunk async for chunk in service.generate_document_stream(_make_context())]
+    
+    asyncio.run(collect())
+    chunks = asyncio.run(collect())
+    
+    assert chunks == ["# Order for Disclosure"]
+    assert len(kernel.prompts) == 1
+
+class FakeValidationKernel:
+    """Kernel stand-in answering each checklist item after a delay"""
+    
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    async def invoke_prompt(self, prompt, settings=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        status = "failed" if "SECTION: Legal Remedies" in prompt else "passed"
+        return f'{{"status": "{status}", "details": "checked"}}'
+
+def test_parallel_validation_checks_items_concurrently():
+    """Test that checklist items are evaluated concurrently and reported in order"""
+    kernel = FakeValidationKernel()
+    service = DocumentService(kernel, use_llm=False, validation_mode=ValidationMode.PARALLEL, max_concurrency=4)
+    service.validation_rules = []
+    
+    report, results, messages = asyncio.run(service.validate_document("# Order"))
+    
+    assert kernel.max_in_flight == 4
+    assert [r["section"] for r in results] == [item.section for item in service.checklist]
+    assert results[-1]["status"] == "failed"
+    assert "❌" in report
+    assert len(messages) == len(service.checklist) + 1
+
+def test_parallel_validation_respects_concurrency_limit():
+    """Test that no more than max_concurrency LLM calls run at once"""
+    kernel = FakeValidationKernel()
+    service = DocumentService(kernel, use_llm=False, validation_mode=ValidationMode.PARALLEL, max_concurrency=2)
+    service.validation_rules = []
+    
+    asyncio.run(service.validate_document("# Order"))
+    
+    assert kernel.max_in_flight == 2
+
+class FakeStructuredKernel:
+    """Kernel stand-in answering the whole checklist in one call"""
+    
+    def __init__(self, results):
+        self.results = results
+        self.calls = []
+    
+    async def invoke_prompt(self, prompt, settings=None):
+        self.calls.append(settings)
+        return json.dumps({"results": self.results})
+
+def test_structured_validation_uses_single_call():
+    """Test that the structured mode validates all items with one LLM call"""
+    service = DocumentService(FakeStructuredKernel([]), use_llm=False, validation_mode=ValidationMode.STRUCTURED)
+    service.validation_rules = []
+    service.kernel.results = [
+        {"section": item.section, "item": item.item, "status": "passed", "details": "ok"}
+        for item in service.checklist
+    ]
+    
+    report, results, _ = asyncio.run(service.validate_document("# Order"))
+    
+    assert len(service.kernel.calls) == 1
+    assert len(results) == len(service.checklist)
+    assert all(r["status"] == "passed" for r in results)
+    assert "❌" not in report
+
+def test_rules_settle_rendered_document_items():
+    """Test that a rendered document only sends subjective items to the LLM"""
+    kernel = FakeValidationKernel(delay=0)
+    service = DocumentService(kernel, use_llm=False, validation_mode=ValidationMode.PARALLEL)
+    document = asyncio.run(service.generate_document(_make_context()))
+    
+    _, results, messages = asyncio.run(service.validate_document(document))
+    
+    assert kernel.max_in_flight == 2
+    assert "Checked 2 of 4 items with local rules" in messages[0]["content"]
+    assert [r["status"] for r in results] == ["passed"] * 4
+
+def test_rules_fail_document_without_llm():
+    """Test that a document missing the citations fails without any LLM call"""
+    kernel = FakeValidationKernel(delay=0)
+    service = DocumentService(kernel, use_llm=False, validation_mode=ValidationMode.PARALLEL)
+    
+    report, results, _ = asyncio.run(service.validate_document("# Order"))
+    
+    assert kernel.max_in_flight == 0
+    assert all(r["status"] == "failed" for r in results)
+    assert "Missing: § 3 para. 3 RRA" in report
+
+def test_revalidation_only_checks_changed_sections():
+    """Test that edits outside an item's sections reuse its cached verdict"""
+    kernel = FakeValidationKernel(delay=0)
+    service = DocumentService(kernel, use_llm=False, validation_mode=ValidationMode.PARALLEL, cache=DocumentCache())
+    document = asyncio.run(service.generate_document(_make_context()))
+    calls = []
+    original = kernel.invoke_prompt
+    
+    async def counting_invoke_prompt(prompt, settings=None):
+        calls.append(prompt)
+        return await original(prompt, settings)
+    kernel.invoke_prompt = counting_invoke_prompt
+    
+    asyncio.run(service.validate_document(document))
+    assert len(calls) == 2
+    
+    # Editing the purpose only requires the list inquiry to be checked again
+    edited = document.replace("**Neighborhood Contact**", "**Citizen Initiative**")
+    _, results, messages = asyncio.run(service.validate_document(edited))
+    assert len(calls) == 3
+    assert "SECTION: List Inquiry" in calls[-1]
+    assert any("Reused 1 results" in m["content"] for m in messages)
+    assert len(results) == 4
+    
+    # Editing the obligations requires a new check
+    edited = edited.replace("destroyed immediately", "destroyed without delay")
+    asyncio.run(service.validate_document(edited))
+    assert len(calls) == 4
+
+def test_report_with_unreadable_answers_is_not_cached():
+    """Test that a report with unevaluated items is validated again on the next run"""
+    kernel = FakeValidationKernel(delay=0)
+    service = DocumentService(kernel, use_llm=False, validation_mode=ValidationMode.PARALLEL, cache=DocumentCache())
+    document = asyncio.run(service.generate_document(_make_context()))
+    answers = ["I cannot tell"] + ['{"status": "passed", "details": "checked"}'] * 2
+    
+    async def flaky_invoke_prompt(prompt, settings=None):
+        return answers.pop(0)
+    kernel.invoke_prompt = flaky_invoke_prompt
+    
+    _, results, _ = asyncio.run(service.validate_document(document))
+    assert [r["status"] for r in results].count("failed") == 1
+    
+    _, results, messages = asyncio.run(service.validate_document(document))
+    assert answers == []
+    assert [r["status"] for r in results] == ["passed"] * 4
+    assert "loaded from cache" not in messages[0]["content"]
+    
+    _, _, messages = asyncio.run(service.validate_document(document))
+    assert "loaded from cache" in messages[0]["content"]
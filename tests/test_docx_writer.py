@@ -0,0 +1,67 @@
+"""
+tests/test_docx_writer.py - Tests for the in-process DOCX writer
+"""
+
+from docx import Document
+from utils.create_reference_template import create_reference_template
+from utils.docx_writer import markdown_to_docx
+
+MARKDOWN = """<div style="text-align: right;">
+**Municipality of Contoso**  
+Main Street 99, 9999 Contoso  
+</div>
+
+# Order
+
+1. Disclosure to **Max Muster**.  
+   The purpose is exclusively: **Neighborhood Contact**
+
+   1. Hans Meier, Bahnhofstrasse 10, 8001 Zürich
+   2. Anna Keller, [ADDRESS NOT AVAILABLE]
+
+   *"Quoted text."*
+
+---
+
+**17.10.2026**
+"""
+
+def _write(tmp_path):
+    """Write the sample markdown with the reference template and read it back"""
+    reference = create_reference_template(str(tmp_path / "reference.docx"))
+    output = str(tmp_path / "out.docx")
+    markdown_to_docx(MARKDOWN, output, reference)
+    return Document(output)
+
+def test_reference_example_content_removed(tmp_path):
+    """Test that the example paragraphs of the reference document are dropped"""
+    document = _write(tmp_path)
+    
+    assert "Heading 1 Example" not in [p.text for p in document.paragraphs]
+
+def test_headings_and_right_aligned_header(tmp_path):
+    """Test that headings and the <div> header get their styles"""
+    paragraphs = _write(tmp_path).paragraphs
+    
+    assert paragraphs[0].style.name == "RightAligned"
+    assert paragraphs[0].text == "Municipality of Contoso\nMain Street 99, 9999 Contoso"
+    assert paragraphs[1].style.name == "Heading 1"
+    assert paragraphs[1].text == "Order"
+
+def test_inline_formatting_and_line_breaks(tmp_path):
+    """Test bold and italic runs and hard line breaks within a list item"""
+    paragraphs = _write(tmp_path).paragraphs
+    item = paragraphs[2]
+    
+    assert item.text == "1. Disclosure to Max Muster.\nThe purpose is exclusively: Neighborhood Contact"
+    assert [run.text for run in item.runs if run.bold] == ["Max Muster", "Neighborhood Contact"]
+    assert any(run.italic for run in paragraphs[5].runs)
+
+def test_nested_list_items_are_indented(tmp_path):
+    """Test that nested list items become indented paragraphs"""
+    paragraphs = _write(tmp_path).paragraphs
+    
+    assert paragraphs[3].text == "1. Hans Meier, Bahnhofstrasse 10, 8001 Zürich"
+    assert paragraphs[3].paragraph_format.left_indent is not None
+    assert paragraphs[2].paragraph_format.left_indent is None
+    assert paragraphs[-1].text == "17.10.2026"
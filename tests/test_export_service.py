@@ -2,8 +2,13 @@
 tests/test_export_service.py - Tests for document export functionality
 """
 
+import asyncio
 import os
+import zipfile
+import pytest
+from docx import Document
 from services.export_service import ExportService
+from utils.document_cache import DocumentCache
 
 def test_export_service_init():
     """Test that ExportService initializes correctly"""
@@ -60,4 +65,59 @@ def test_markdown_to_docx_no_date():
     markdown = "# Test Document\nNo date here\nJust regular content"
     
     result_md, _ = service.markdown_to_docx(markdown)
-    assert result_md == markdown  # Should return unchanged if no date to substitute
\ No newline at end of file
+    assert result_md == markdown  # Should return unchanged if no date to substitute
+
+def test_markdown_to_docx_in_process(ensure_output_dir):
+    """Test that the docx engine writes the file without pandoc"""
+    service = ExportService(engine="docx")
+    
+    _, output_path = service.markdown_to_docx("# Test Document\n**01.01.2024**")
+    
+    assert os.path.exists(output_path)
+    assert "Test Document" in [p.text for p in Document(output_path).paragraphs]
+
+def test_async_export_reuses_cached_file(ensure_output_dir):
+    """Test that the async export writes the file once and reuses it from the cache"""
+    service = ExportService(engine="docx", cache=DocumentCache())
+    
+    async def export_twice():
+        first = await service.markdown_to_docx_async("# Cached\n**01.01.2024**", date="15.03.2024")
+        second = await service.markdown_to_docx_async("# Cached\n**01.01.2024**", date="15.03.2024")
+        return first, second
+    
+    (markdown, first_path), (_, second_path) = asyncio.run(export_twice())
+    
+    assert "**15.03.2024**" in markdown
+    assert first_path == second_path
+    assert os.path.exists(first_path)
+
+def test_unknown_export_engine():
+    """Test that an unknown engine is rejected"""
+    with pytest.raises(ValueError):
+        ExportService(engine="latex")
+
+def test_export_batch_names_do_not_collide(tmp_path):
+    """Test that a batch exported within one second gets distinct file names"""
+    service = ExportService(engine="docx")
+    documents = [f"# Document {i}\n**01.01.2024**" for i in range(4)]
+    
+    results = service.export_batch(documents, date="15.03.2024", output_dir=str(tmp_path), max_workers=2)
+    
+    paths = [path for _, path in results]
+    assert len(set(paths)) == 4
+    assert all(os.path.exists(path) for path in paths)
+    assert all("**15.03.2024**" in markdown for markdown, _ in results)
+    assert Document(paths[2]).paragraphs[0].text == "Document 2"
+
+def test_export_zip_contains_all_documents(tmp_path):
+    """Test that the ZIP archive holds one docx per document"""
+    service = ExportService(engine="docx")
+    zip_path = str(tmp_path / "batch.zip")
+    
+    result = service.export_zip(["# First", "# Second", "# Third"], zip_path=zip_path, max_workers=2)
+    
+    assert result == zip_path
+    with zipfile.ZipFile(zip_path) as archive:
+        assert sorted(archive.namelist()) == [
+            "verfuegung_001.docx", "verfuegung_002.docx", "verfuegung_003.docx"
+        ]
@@ -0,0 +1,140 @@
+"""
+tests/test_history_reducer.py - Tests for agent chat history reduction
+"""
+
+import asyncio
+import json
+from semantic_kernel import Kernel
+from semantic_kernel.agents import ChatCompletionAgent
+from semantic_kernel.agents.strategies import SequentialSelectionStrategy
+from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
+from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
+from semantic_kernel.contents import ChatMessageContent, FunctionResultContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
+from agents.address_agents import RETRIEVER, REPORT_AGENT, create_address_agents
+from agents.agent_chat import setup_agent_chat
+from agents.history_reducer import (
+    ReducingAgentGroupChat, ToolOutputHistoryReducer, compact_tool_output,
+    create_history_reducer, reduce_messages, summarize_feed
+)
+from agents.validation_agents import VALIDATOR, COMPLIANCE_REPORTER, create_validation_agents
+from agents.validation_chat import setup_validation_chat
+
+FEED = """<feed xmlns="http://www.w3.org/2005/Atom" xmlns:tel="http://tel.search.ch/api/spec/result/1.0/">
+<entry><title>Meier, Hans</title><tel:name>Meier</tel:name><tel:firstname>Hans</tel:firstname>
+<tel:street>Bahnhofstrasse</tel:street><tel:streetno>10</tel:streetno>
+<tel:zip>8001</tel:zip><tel:city>Zürich</tel:city></entry>
+</feed>"""
+
+def _tool_message(result):
+    """Create a tool result message as produced by function calling"""
+    return ChatMessageContent(
+        role=AuthorRole.TOOL,
+        items=[FunctionResultContent(id="call_1", function_name="search_person",
+                                     plugin_name="telsearch", result=result)]
+    )
+
+def test_summarize_feed():
+    """Test that a feed is reduced to address lines"""
+    assert summarize_feed(FEED) == "Hans Meier: Bahnhofstrasse 10, 8001 Zürich"
+    assert summarize_feed("<feed></feed>") == "NOT FOUND"
+
+def test_compact_batch_output():
+    """Test that feeds inside search_people results are compacted"""
+    batch = json.dumps([{"name": "Hans Meier", "result": FEED}])
+    compacted = json.loads(compact_tool_output(batch))
+    assert compacted == [{"name": "Hans Meier", "result": "Hans Meier: Bahnhofstrasse 10, 8001 Zürich"}]
+
+def test_compact_leaves_other_output_unchanged():
+    """Test that results without feeds are kept as they are"""
+    assert compact_tool_output("Successfully saved data for 2 people") == "Successfully saved data for 2 people"
+
+def test_reduce_messages_compacts_tool_results():
+    """Test that raw feeds in tool results are replaced"""
+    messages = [
+        ChatMessageContent(role=AuthorRole.USER, content="Verify Hans Meier"),
+        _tool_message(FEED)
+    ]
+    reduced = reduce_messages(messages, max_tokens=10000)
+    
+    assert reduced is not None
+    assert reduced[1].items[0].result == "Hans Meier: Bahnhofstrasse 10, 8001 Zürich"
+
+def test_reduce_messages_enforces_token_ceiling():
+    """Test that the oldest turns are dropped but the task is kept"""
+    messages = [ChatMessageContent(role=AuthorRole.USER, content="Verify these people")]
+    for i in range(10):
+        messages.append(ChatMessageContent(role=AuthorRole.ASSISTANT, content=f"Turn {i} " + "x" * 400))
+    
+    reduced = reduce_messages(messages, max_tokens=300)
+    
+    assert reduced[0].content == "Verify these people"
+    assert reduced[-1].content.startswith("Turn 9")
+    assert len(reduced) < len(messages)
+
+def test_reduce_messages_unchanged():
+    """Test that a small history without feeds is left alone"""
+    messages = [ChatMessageContent(role=AuthorRole.USER, content="Verify Hans Meier")]
+    assert reduce_messages(messages, max_tokens=1000) is None
+
+class RecordingChatCompletion(ChatCompletionClientBase):
+    """Chat service answering with a fixed text and recording the histories it receives"""
+
+    histories: list = []
+
+    async def _inner_get_chat_message_contents(self, chat_history, settings):
+        self.histories.append([m.model_copy(deep=True) for m in chat_history.messages])
+        return [ChatMessageContent(role=AuthorRole.ASSISTANT, content="Done")]
+
+def _azure_kernel():
+    """Create a kernel with a real Azure chat service and dummy credentials"""
+    kernel = Kernel()
+    kernel.add_service(AzureChatCompletion(
+        deployment_name="gpt-4o",
+        endpoint="https://example.openai.azure.com",
+        api_key="key",
+        api_version="2024-10-21"
+    ))
+    return kernel
+
+def test_agents_build_with_azure_service():
+    """Test that both agent sets and chats can be created with a real chat service"""
+    kernel = _azure_kernel()
+    
+    retriever, reporter = create_address_agents(kernel)
+    validator, compliance_reporter = create_validation_agents(kernel)
+    
+    assert (retriever.name, reporter.name) == (RETRIEVER, REPORT_AGENT)
+    assert (validator.name, compliance_reporter.name) == (VALIDATOR, COMPLIANCE_REPORTER)
+    for llm_selection in (False, True):
+        for chat in (setup_agent_chat(kernel, llm_selection), setup_validation_chat(kernel, llm_selection)):
+            assert isinstance(chat, ReducingAgentGroupChat)
+            assert isinstance(chat.history, ToolOutputHistoryReducer)
+
+def test_group_chat_reduces_history_between_turns():
+    """Test that the next agent sees the compacted tool output, not the raw feed"""
+    service = RecordingChatCompletion(ai_model_id="recording", histories=[])
+    agents = [
+        ChatCompletionAgent(service=service, name=name, instructions="Answer")
+        for name in (RETRIEVER, REPORT_AGENT)
+    ]
+    chat = ReducingAgentGroupChat(
+        agents=agents,
+        chat_history=create_history_reducer(max_tokens=10000),
+        selection_strategy=SequentialSelectionStrategy()
+    )
+    chat.termination_strategy.maximum_iterations = 2
+    
+    async def run():
+        await chat.add_chat_messages([
+            ChatMessageContent(role=AuthorRole.USER, content="Verify Hans Meier"),
+            _tool_message(FEED)
+        ])
+        return [message async for message in chat.invoke()]
+    
+    messages = asyncio.run(run())
+    
+    assert [m.name for m in messages] == [RETRIEVER, REPORT_AGENT]
+    sent = [str(item.result) for history in service.histories for m in history
+            for item in m.items if isinstance(item, FunctionResultContent)]
+    assert sent == ["Hans Meier: Bahnhofstrasse 10, 8001 Zürich"] * 2
@@ -0,0 +1,130 @@
+"""
+tests/test_lookup_cache.py - Tests for the two-tier lookup cache
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from utils.lookup_cache import LookupCache
+
+def test_memory_cache_hit_and_miss():
+    """Test basic get/set with hit and miss counters"""
+    cache = LookupCache()
+    
+    assert cache.get("a") is None
+    cache.set("a", "value")
+    assert cache.get("a") == "value"
+    
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+def test_entry_expires_after_ttl():
+    """Test that entries are not returned after their TTL"""
+    cache = LookupCache(ttl=60)
+    cache.set("short", "value", ttl=0.01)
+    cache.set("long", "value")
+    
+    time.sleep(0.02)
+    assert cache.get("short") is None
+    assert cache.get("long") == "value"
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted first"""
+    cache = LookupCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", "3")
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+def test_disk_cache_survives_restart(tmp_path):
+    """Test that entries are persisted to the SQLite file"""
+    path = str(tmp_path / "cache.sqlite3")
+    cache = LookupCache(path=path)
+    cache.set("hans meier|zürich", "<feed/>")
+    cache.close()
+    
+    reopened = LookupCache(path=path)
+    assert reopened.get("hans meier|zürich") == "<feed/>"
+    assert reopened.stats()["hits"] == 1
+
+def test_disk_cache_namespaces_are_separate(tmp_path):
+    """Test that namespaces sharing a file do not see each other's entries"""
+    path = str(tmp_path / "cache.sqlite3")
+    first = LookupCache(path=path, namespace="first")
+    second = LookupCache(path=path, namespace="second")
+    
+    first.set("key", "value")
+    assert second.get("key") is None
+
+def test_disk_eviction(tmp_path):
+    """Test that the disk tier is bounded"""
+    cache = LookupCache(path=str(tmp_path / "cache.sqlite3"), max_entries=1, max_disk_entries=2)
+    cache.set("a", "1")
+    time.sleep(0.01)
+    cache.set("b", "2")
+    time.sleep(0.01)
+    cache.set("c", "3")
+    
+    assert cache.get("a") is None
+    assert cache.get("b") == "2"
+
+def test_clear():
+    """Test clearing entries and counters"""
+    cache = LookupCache()
+    cache.set("a", "1")
+    cache.get("a")
+    cache.clear()
+    
+    assert cache.stats()["hits"] == 0
+    assert cache.get("a") is None
+
+def _accessed_at(path, key):
+    """Read the committed access time of a disk entry through a separate connection"""
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT accessed_at FROM cache WHERE key = ?", (key,)).fetchone()[0]
+
+def test_disk_hits_do_not_commit(tmp_path):
+    """Test that access times of disk hits are written with the next write or on close"""
+    path = str(tmp_path / "cache.sqlite3")
+    writer = LookupCache(path=path)
+    writer.set("a", "1")
+    writer.close()
+    stored = _accessed_at(path, "a")
+    
+    cache = LookupCache(path=path)
+    time.sleep(0.01)
+    assert cache.get("a") == "1"
+    assert _accessed_at(path, "a") == stored
+    
+    cache.close()
+    assert _accessed_at(path, "a") > stored
+
+def test_async_access_reads_disk_in_worker_thread(tmp_path):
+    """Test that the async methods keep the SQLite work off the event loop thread"""
+    path = str(tmp_path / "cache.sqlite3")
+    cache = LookupCache(path=path)
+    disk_threads = []
+    read_disk = cache._get_disk
+    
+    def recording_get_disk(key, now):
+        disk_threads.append(threading.get_ident())
+        return read_disk(key, now)
+    cache._get_disk = recording_get_disk
+    
+    async def run():
+        await cache.set_async("a", "1")
+        cache._memory.clear()
+        return await cache.get_async("a"), await cache.get_async("a"), threading.get_ident()
+    
+    first, second, loop_thread = asyncio.run(run())
+    
+    assert first == second == "1"
+    assert len(disk_threads) == 1  # The second read is a memory hit
+    assert disk_threads[0] != loop_thread
+    assert cache.stats()["hits"] == 2
@@ -2,7 +2,7 @@
 tests/test_models.py - Tests for core domain models
 """
 
-from models.core import Person, PersonType, DocumentContext
+from models.core import Person, PersonType, DocumentContext, VerificationArtifact, name_key
 
 def test_person_full_name():
     """Test that Person.full_name property works correctly"""
@@ -65,4 +65,28 @@ def test_document_context_addresses_dict():
     addresses = context.get_addresses_dict()
     assert addresses["John Doe"] == "Main Street 1, 8000 Zurich"
     assert addresses["Jane Smith"] == "Side Street 2, 8000 Zurich"
-    assert "Bob Brown" not in addresses  # Should not include people without addresses
\ No newline at end of file
+    assert "Bob Brown" not in addresses  # Should not include people without addresses
+
+def test_name_key_ignores_case_and_whitespace():
+    """Test that name_key matches differently typed names"""
+    assert name_key("hans ", " MEIER") == name_key("Hans", "Meier")
+    assert name_key("Hans", "Meier") != name_key("Hans", "Meyer")
+
+def test_verification_artifact_lookup():
+    """Test that VerificationArtifact finds people by name and type, including NOT FOUND verdicts"""
+    artifact = VerificationArtifact(
+        gemeinde="Zürich",
+        people=[
+            {"firstname": "John", "lastname": "Doe", "address": "Main Street 1",
+             "city": "8000 Zurich", "type": "requestor"},
+            {"firstname": "Jane", "lastname": "Smith", "address": None,
+             "city": None, "type": "requested"}
+        ]
+    )
+    
+    assert artifact.lookup(Person(firstname="John", lastname="doe ", type=PersonType.REQUESTOR))["lastname"] == "Doe"
+    assert artifact.lookup(Person(firstname="John", lastname="Doe")) is None
+    assert artifact.lookup(Person(firstname="jane", lastname="smith"))["address"] is None
+    assert artifact.get_requestor().full_address == "Main Street 1, 8000 Zurich"
+    assert [p.full_name for p in artifact.get_requested_people()] == ["Jane Smith"]
+    assert artifact.matches_location(" zürich ")
@@ -0,0 +1,64 @@
+"""
+tests/test_name_index.py - Tests for the phonetic and trigram name index
+"""
+
+from utils.name_index import NameIndex, cologne_phonetic, create_name_index, normalize_name
+from utils.register_source import RegisterSource
+
+def test_cologne_phonetic():
+    """Test Kölner Phonetik codes of common spelling variants"""
+    assert cologne_phonetic("Müller") == cologne_phonetic("Mueller") == cologne_phonetic("Muller") == "657"
+    assert cologne_phonetic("Schärer") == cologne_phonetic("Schaerer") == "877"
+    assert cologne_phonetic("Meier") == cologne_phonetic("Meyer") == cologne_phonetic("Mayr") == "67"
+    assert cologne_phonetic("Wikipedia") == "3412"
+    assert cologne_phonetic("Müller-Lüdenscheidt") == "65752682"
+
+def test_normalize_name_ignores_order_and_hyphens():
+    """Test that double last names in either order normalize the same way"""
+    assert normalize_name("Keller-Brunner, Eva") == normalize_name("Eva Brunner Keller")
+
+def _make_index():
+    """Create an index with a few residents of Zürich"""
+    index = NameIndex()
+    for firstname, lastname in [("Hans", "Meier"), ("Peter", "Müller"), ("Anna", "Schärer"), ("Eva", "Keller-Brunner")]:
+        index.add(firstname, lastname, "Zürich")
+    return index
+
+def test_resolve_spelling_variants():
+    """Test that variants resolve to the known spelling in one step"""
+    index = _make_index()
+    
+    match = index.resolve("Peter Muller", "Zürich")
+    assert (match.name.full_name, match.exact) == ("Peter Müller", False)
+    assert index.resolve("Hans Meyer", "Zürich").name.full_name == "Hans Meier"
+    assert index.resolve("Anna Schaerer", "Zürich").exact
+    assert index.resolve("Eva Brunner-Keller", "Zürich").name.lastname == "Keller-Brunner"
+
+def test_resolve_rejects_unknown_and_other_locations():
+    """Test that dissimilar names and residents of other municipalities are not returned"""
+    index = _make_index()
+    
+    assert index.resolve("Fritz Müller", "Zürich") is None
+    assert index.resolve("Peter Muller", "Bern") is None
+    assert index.resolve("Peter Muller").name.full_name == "Peter Müller"
+
+def test_resolve_ambiguous_variants():
+    """Test that equally similar but different names are left unresolved"""
+    index = NameIndex()
+    index.add("Hans", "Meyer", "Zürich")
+    index.add("Hans", "Maier", "Zürich")
+    
+    assert index.resolve("Hans Meier", "Zürich") is None
+
+def test_index_built_from_register(tmp_path):
+    """Test that a register source contributes all its residents"""
+    snapshot = tmp_path / "register.csv"
+    snapshot.write_text("Vorname,Nachname,Strasse,Nr,PLZ,Ort\nPeter,Müller,Langstrasse,5,8004,Zürich\n", encoding="utf-8")
+    source = RegisterSource.from_snapshot(str(snapshot))
+    
+    index = create_name_index(source)
+    
+    assert len(index) == 1
+    assert index.resolve("Peter Mueler", "Zürich").name.full_name == "Peter Müller"
+    assert len(create_name_index()) == 0
+    source.close()
@@ -0,0 +1,90 @@
+"""
+tests/test_people_import.py - Tests for importing people lists
+"""
+
+import pytest
+from openpyxl import Workbook
+from models.core import PersonType
+from utils.people_import import iter_people_file, iter_people_rows, parse_name, parse_people_text
+
+def test_parse_name_formats():
+    """Test that both name formats are split into first and last name"""
+    assert parse_name("Hans Meier") == ("Hans", "Meier")
+    assert parse_name("Meier, Hans") == ("Hans", "Meier")
+    assert parse_name("Anna  von Allmen") == ("Anna", "von Allmen")
+    
+    with pytest.raises(ValueError):
+        parse_name("Meier")
+
+def test_parse_people_text_drops_duplicates():
+    """Test that the same person entered twice is imported once"""
+    people = parse_people_text("Hans Meier\nMeier, Hans\n\nanna  müller")
+    
+    assert [p.full_name for p in people] == ["Hans Meier", "anna müller"]
+    assert all(p.type == PersonType.REQUESTED for p in people)
+
+def test_parse_people_text_invalid_line():
+    """Test that an invalid line keeps the original error message"""
+    with pytest.raises(ValueError, match="Invalid format for person: Meier"):
+        parse_people_text("Hans Meier\nMeier")
+
+def test_rows_with_header():
+    """Test that Vorname/Name columns are recognized in any order"""
+    rows = [["Name", "Vorname", "Gemeinde"], ["Meier", "Hans", "Zürich"], ["Müller", "Anna", "Bern"]]
+    
+    people = list(iter_people_rows(rows))
+    
+    assert [(p.firstname, p.lastname) for p in people] == [("Hans", "Meier"), ("Anna", "Müller")]
+
+def test_rows_without_header_and_skipped_rows():
+    """Test headerless full names and the reporting of invalid rows"""
+    skipped = []
+    rows = [["Meier, Hans"], ["Anna Müller"], ["Solo"], [None, ""], ["Peter", "Keller"], ["Hans Meier"]]
+    
+    people = list(iter_people_rows(rows, skipped))
+    
+    assert [p.full_name for p in people] == ["Hans Meier", "Anna Müller"]
+    assert skipped == [
+        "Row 3: Name needs at least two parts: Solo",
+        "Row 5: Several values without a header, expected one full name"
+    ]
+
+def test_unrecognized_header_is_rejected():
+    """Test that an unknown header row is reported instead of imported as a person"""
+    rows = [["Teilnehmer", "Wohnort"], ["Hans Meier", "Zürich"]]
+    
+    with pytest.raises(ValueError, match="Unrecognized header: Teilnehmer, Wohnort"):
+        list(iter_people_rows(rows))
+
+def test_headerless_columns_are_not_guessed():
+    """Test that several columns without a header are rejected, not read as lastname, firstname"""
+    with pytest.raises(ValueError, match="Unrecognized header: Meier, Hans"):
+        list(iter_people_rows([["Meier", "Hans"], ["Müller", "Anna"]]))
+
+def test_csv_file_with_semicolons(tmp_path):
+    """Test that a semicolon separated CSV with BOM is imported"""
+    path = tmp_path / "people.csv"
+    path.write_text("Vorname;Nachname\nHans;Meier\nAnna;Müller\nhans;meier\n", encoding="utf-8-sig")
+    
+    people = list(iter_people_file(str(path)))
+    
+    assert [p.full_name for p in people] == ["Hans Meier", "Anna Müller"]
+
+def test_xlsx_file(tmp_path):
+    """Test that the first sheet of an XLSX file is imported"""
+    path = tmp_path / "people.xlsx"
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Full Name"])
+    sheet.append(["Meier, Hans"])
+    sheet.append(["Anna Müller"])
+    workbook.save(path)
+    
+    people = list(iter_people_file(str(path)))
+    
+    assert [p.full_name for p in people] == ["Hans Meier", "Anna Müller"]
+
+def test_unsupported_file_type(tmp_path):
+    """Test that other file types are rejected"""
+    with pytest.raises(ValueError):
+        list(iter_people_file(str(tmp_path / "people.txt")))
@@ -0,0 +1,55 @@
+"""
+tests/test_rate_limiter.py - Tests for the token bucket rate limiter
+"""
+
+import asyncio
+import time
+from utils.rate_limiter import TokenBucket
+
+def test_burst_within_capacity_does_not_wait():
+    """Test that requests up to the capacity pass immediately"""
+    bucket = TokenBucket(rate=10, capacity=3)
+    
+    start = time.monotonic()
+    for _ in range(3):
+        bucket.acquire_sync()
+    assert time.monotonic() - start < 0.05
+
+def test_requests_beyond_capacity_are_delayed():
+    """Test that requests beyond the burst are spaced by the rate"""
+    bucket = TokenBucket(rate=20, capacity=1)
+    
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(*[bucket.acquire() for _ in range(3)])
+        return time.monotonic() - start
+    
+    elapsed = asyncio.run(run())
+    assert elapsed >= 0.09  # Two requests had to wait 50 ms each
+
+def test_zero_rate_disables_limiting():
+    """Test that a rate of zero never waits"""
+    bucket = TokenBucket(rate=0)
+    
+    start = time.monotonic()
+    for _ in range(100):
+        bucket.acquire_sync()
+    assert time.monotonic() - start < 0.05
+
+def test_cancelled_wait_returns_token():
+    """Test that a wait cut off by a deadline gives its reservation back"""
+    bucket = TokenBucket(rate=2, capacity=1)
+    
+    async def run():
+        await bucket.acquire()
+        for _ in range(5):
+            try:
+                await asyncio.wait_for(bucket.acquire(), timeout=0.01)
+            except asyncio.TimeoutError:
+                pass
+        start = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - start
+    
+    elapsed = asyncio.run(run())
+    assert elapsed < 0.6  # Only the first token is owed, not the five cancelled ones
@@ -0,0 +1,87 @@
+"""
+tests/test_register_source.py - Tests for the resident register address source
+"""
+
+import asyncio
+import json
+import os
+import pytest
+from plugins.telsearch_plugin import TelsearchPlugin
+from utils.lookup_cache import LookupCache
+from utils.register_source import RegisterSource, build_index, name_index_key
+
+SNAPSHOT = """Vorname;Nachname;Strasse;Hausnummer;PLZ;Ort;Gemeinde
+Hans;Meier;Bahnhofstrasse;10;8001;Zürich;Zürich
+Hans;Meier;Seeweg;3;3000;Bern;Bern
+Peter;Müller;Langstrasse;5;8004;Zürich;Zürich
+Anna;von Allmen;Dorfstrasse;1;8001;Zürich;Zürich
+"""
+
+@pytest.fixture
+def snapshot(tmp_path):
+    """Fixture writing a small register export"""
+    path = tmp_path / "register.csv"
+    path.write_text(SNAPSHOT, encoding="utf-8")
+    return str(path)
+
+def test_name_index_key():
+    """Test that name order, case and umlaut spelling do not change the key"""
+    assert name_index_key("Meier, Hans") == name_index_key("hans  MEIER")
+    assert name_index_key("Peter Müller") == name_index_key("Mueller Peter")
+
+def test_lookup_by_name_and_municipality(snapshot):
+    """Test that lookups find the residents of the requested municipality only"""
+    source = RegisterSource.from_snapshot(snapshot)
+    
+    assert source.count == 4
+    entries = source.lookup("Meier, Hans", "zürich")
+    assert [(e.street, e.streetno, e.zip, e.city) for e in entries] == [("Bahnhofstrasse", "10", "8001", "Zürich")]
+    assert source.lookup("Peter Mueller", "Zuerich")[0].name == "Müller"
+    assert source.lookup("Anna von Allmen", "Zürich")[0].firstname == "Anna"
+    assert source.lookup("Hans Meier", "Basel") == []
+    source.close()
+
+def test_index_rebuilt_for_newer_snapshot(snapshot):
+    """Test that the index follows changes of the snapshot"""
+    RegisterSource.from_snapshot(snapshot).close()
+    with open(snapshot, "a", encoding="utf-8") as f:
+        f.write("Eva;Keller;Seeweg;7;8001;Zürich;Zürich\n")
+    os.utime(snapshot, (os.path.getmtime(snapshot) + 10,) * 2)
+    
+    source = RegisterSource.from_snapshot(snapshot)
+    assert source.lookup("Eva Keller", "Zürich")
+    source.close()
+
+def test_build_index_requires_name_columns(tmp_path):
+    """Test that snapshots without name columns are rejected"""
+    path = tmp_path / "register.csv"
+    path.write_text("Strasse,Ort\nSeeweg,Bern\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="firstname, lastname"):
+        build_index(str(path), str(tmp_path / "register.idx"))
+
+def test_large_municipality(tmp_path):
+    """Test lookups among 50,000 residents of one municipality"""
+    path = tmp_path / "register.csv"
+    rows = [f"Vorname{i},Nachname{i},Weg,{i},8001,Zürich" for i in range(50000)]
+    path.write_text("Vorname,Nachname,Strasse,Nr,PLZ,Ort\n" + "\n".join(rows), encoding="utf-8")
+    
+    source = RegisterSource.from_snapshot(str(path))
+    
+    assert source.count == 50000
+    assert source.lookup("Vorname31337 Nachname31337", "Zürich")[0].streetno == "31337"
+    assert source.lookup("Vorname50000 Nachname50000", "Zürich") == []
+    source.close()
+
+def test_plugin_functions_on_register(snapshot):
+    """Test that the agent plugin functions work on top of the register"""
+    cache = LookupCache()
+    plugin = TelsearchPlugin(cache=cache, source=RegisterSource.from_snapshot(snapshot))
+    
+    result = json.loads(asyncio.run(plugin.search_person_async("Hans Meier", "Zürich")))
+    assert result == [
+        {"name": "Hans Meier", "street": "Bahnhofstrasse", "no": "10", "zip": "8001", "city": "Zürich", "score": 100}
+    ]
+    address = plugin.parse_address(plugin.search_person("Peter Müller", "Zürich", raw=True))
+    assert address == {"street": "Langstrasse", "streetno": "5", "zip": "8004", "city": "Zürich"}
+    assert json.loads(plugin.search_person("Eva Keller", "Zürich")) == []
+    assert cache.stats()["misses"] == 0  # Register results bypass the cache
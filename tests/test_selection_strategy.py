@@ -0,0 +1,154 @@
+"""
+tests/test_selection_strategy.py - Tests for the rule-based agent selection
+"""
+
+import asyncio
+import json
+from semantic_kernel.agents import ChatCompletionAgent
+from semantic_kernel.contents import ChatMessageContent, FunctionCallContent, FunctionResultContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
+from agents.selection_strategy import (
+    LookupProgress, RuleBasedSelectionStrategy, ValidationProgress, next_agent_name
+)
+from agents.address_agents import RETRIEVER, REPORT_AGENT
+from agents.validation_agents import VALIDATOR, COMPLIANCE_REPORTER
+
+def _message(name, content="", role=AuthorRole.ASSISTANT):
+    """Create a text message of an agent"""
+    return ChatMessageContent(role=role, name=name, content=content)
+
+def _tool_call(name, call_id, plugin, function, arguments, result):
+    """Create the function call and result messages of one agent tool call"""
+    return [
+        ChatMessageContent(role=AuthorRole.ASSISTANT, name=name, items=[FunctionCallContent(
+            id=call_id, plugin_name=plugin, function_name=function, arguments=json.dumps(arguments)
+        )]),
+        ChatMessageContent(role=AuthorRole.TOOL, name=name, items=[FunctionResultContent(
+            id=call_id, plugin_name=plugin, function_name=function, result=result
+        )])
+    ]
+
+TASK = _message(None, "Please verify Hans Meier and Anna Schmidt", role=AuthorRole.USER)
+
+ADDRESS_RULES = {
+    "agent_names": [RETRIEVER, REPORT_AGENT],
+    "worker_name": RETRIEVER,
+    "reporter_name": REPORT_AGENT,
+    "initial_agent_name": RETRIEVER
+}
+
+VALIDATION_RULES = {
+    "agent_names": [VALIDATOR, COMPLIANCE_REPORTER],
+    "worker_name": VALIDATOR,
+    "reporter_name": COMPLIANCE_REPORTER,
+    "initial_agent_name": VALIDATOR,
+    "hand_over_each_result": True,
+    "handoff_markers": {VALIDATOR: "NEXT"}
+}
+
+def test_initial_agent_without_history():
+    """Test that the initial agent starts when no agent has spoken"""
+    assert next_agent_name([TASK], **ADDRESS_RULES) == RETRIEVER
+
+def test_lookup_progress_from_tool_results():
+    """Test that names count as looked up once their tool call returned"""
+    progress = LookupProgress(["Hans Meier", "Müller, Anna"])
+    history = [TASK] + _tool_call(
+        RETRIEVER, "call_1", "telsearch", "search_person", {"name": "Meier, Hans", "location": "Zürich"}, "[]"
+    )
+
+    assert progress.pending(progress.completed(history)) == 1
+
+    history += _tool_call(
+        RETRIEVER, "call_2", "telsearch", "search_people", {"names": ["Anna Mueller"], "location": "Zürich"},
+        json.dumps([{"name": "Anna Mueller", "result": []}])
+    )
+    assert progress.pending(progress.completed(history)) == 0
+
+def test_failed_lookups_stay_pending():
+    """Test that lookups returning an error do not count"""
+    progress = LookupProgress(["Hans Meier"])
+    history = _tool_call(
+        RETRIEVER, "call_1", "telsearch", "search_person", {"name": "Hans Meier", "location": "Zürich"},
+        '{"error":"Telsearch returned 500"}'
+    )
+    assert progress.pending(progress.completed(history)) == 1
+
+def test_retriever_keeps_turn_while_names_are_pending():
+    """Test that the retriever continues after a lookup until every name is done"""
+    history = [TASK] + _tool_call(
+        RETRIEVER, "call_1", "telsearch", "search_person", {"name": "Hans Meier", "location": "Zürich"}, "[]"
+    ) + [_message(RETRIEVER, "Hans Meier: NOT FOUND")]
+
+    assert next_agent_name(history, pending=1, **ADDRESS_RULES) == RETRIEVER
+    assert next_agent_name(history, pending=0, **ADDRESS_RULES) == REPORT_AGENT
+
+def test_retriever_hands_over_after_tool_result_without_progress():
+    """Test that the retriever hands over after a lookup if no names are tracked"""
+    history = [TASK, _message(RETRIEVER, "Let me look these people up")]
+    assert next_agent_name(history, **ADDRESS_RULES) == RETRIEVER
+
+    history += _tool_call(
+        RETRIEVER, "call_1", "telsearch", "search_person", {"name": "Hans Meier", "location": "Zürich"}, "[]"
+    )
+    assert next_agent_name(history, **ADDRESS_RULES) == REPORT_AGENT
+
+def test_report_agent_hands_back_while_names_are_pending():
+    """Test that the report agent returns the turn until all names are looked up"""
+    history = [TASK, _message(REPORT_AGENT, "Anna Schmidt has not been verified yet")]
+
+    assert next_agent_name(history, pending=1, **ADDRESS_RULES) == RETRIEVER
+    assert next_agent_name(history, pending=0, **ADDRESS_RULES) == REPORT_AGENT
+
+def test_validator_hands_over_after_each_saved_result():
+    """Test that the validator passes the turn after saving a result or signalling NEXT"""
+    history = [_message(VALIDATOR, "Checking the legal basis")]
+    assert next_agent_name(history, pending=2, **VALIDATION_RULES) == VALIDATOR
+
+    history += _tool_call(
+        VALIDATOR, "call_1", "compliance", "save_validation_result", {"validation_data": "{}"},
+        "Successfully saved validation result for Legal Basis: § 3"
+    )
+    assert next_agent_name(history, pending=1, **VALIDATION_RULES) == COMPLIANCE_REPORTER
+
+    history.append(_message(COMPLIANCE_REPORTER, "Next section: Legal Remedies"))
+    assert next_agent_name(history, pending=1, **VALIDATION_RULES) == VALIDATOR
+
+    history.append(_message(VALIDATOR, "Checked. NEXT"))
+    assert next_agent_name(history, pending=1, **VALIDATION_RULES) == COMPLIANCE_REPORTER
+
+def test_validation_progress_counts_saved_results():
+    """Test that single and batch saves count, failed saves do not"""
+    progress = ValidationProgress(4)
+    history = _tool_call(
+        VALIDATOR, "call_1", "compliance", "save_validation_result", {"validation_data": "{}"},
+        "Error: status must be 'passed' or 'failed', got maybe"
+    ) + _tool_call(
+        VALIDATOR, "call_2", "compliance", "save_validation_results", {"validation_data": "[]"},
+        "Successfully saved 3 validation results"
+    )
+    assert progress.pending(progress.completed(history)) == 1
+
+def test_unknown_names_are_ignored():
+    """Test that messages from other authors do not affect selection"""
+    history = _tool_call(
+        RETRIEVER, "call_1", "telsearch", "search_person", {"name": "Hans Meier", "location": "Zürich"}, "[]"
+    ) + [_message("user", "Any progress?", role=AuthorRole.USER)]
+    assert next_agent_name(history, **ADDRESS_RULES) == REPORT_AGENT
+
+def test_strategy_remembers_lookups_dropped_from_history():
+    """Test that lookups still count after the history reducer removed them"""
+    agents = [ChatCompletionAgent(name=name, instructions="Answer") for name in (RETRIEVER, REPORT_AGENT)]
+    strategy = RuleBasedSelectionStrategy(
+        initial_agent=agents[0],
+        worker_name=RETRIEVER,
+        reporter_name=REPORT_AGENT,
+        progress=LookupProgress(["Hans Meier"])
+    )
+    history = [TASK] + _tool_call(
+        RETRIEVER, "call_1", "telsearch", "search_person", {"name": "Hans Meier", "location": "Zürich"}, "[]"
+    )
+
+    assert asyncio.run(strategy.select_agent(agents, history)).name == REPORT_AGENT
+    reduced = [TASK, _message(REPORT_AGENT, "Saving the results")]
+    assert asyncio.run(strategy.select_agent(agents, reduced)).name == REPORT_AGENT
@@ -0,0 +1,55 @@
+"""
+tests/test_semantic_kernel_setup.py - Tests for the shared kernel and chat service factory
+"""
+
+import pytest
+import utils.semantic_kernel_setup as setup
+
+class FakeChatCompletion:
+    """Stand-in for AzureChatCompletion recording its arguments"""
+    
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+@pytest.fixture
+def azure_env(monkeypatch):
+    """Configure fake Azure settings and an empty service pool"""
+    monkeypatch.setattr(setup, "load_dotenv", lambda **kwargs: None)
+    monkeypatch.setattr(setup, "AzureChatCompletion", FakeChatCompletion)
+    monkeypatch.setattr(setup, "_services", {})
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://example.openai.azure.com/")
+    monkeypatch.setenv("AZURE_OPENAI_KEY", "key")
+    monkeypatch.setenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o")
+    monkeypatch.setenv("AZURE_OPENAI_REASONING_DEPLOYMENT", "o3-mini")
+    monkeypatch.delenv("AZURE_OPENAI_API_VERSION", raising=False)
+
+def test_chat_service_is_reused(azure_env):
+    """Test that the same deployment always gets the same service instance"""
+    first = setup.get_chat_service()
+    second = setup.get_chat_service("gpt-4o")
+    
+    assert first is second
+    assert first.kwargs["endpoint"] == "https://example.openai.azure.com"
+
+def test_chat_service_keeps_default_api_version(azure_env, monkeypatch):
+    """Test that the service is created with the same arguments as before pooling"""
+    monkeypatch.setenv("AZURE_OPENAI_API_VERSION", "2024-10-21")
+    
+    service = setup.get_chat_service()
+    
+    assert set(service.kwargs) == {"deployment_name", "endpoint", "api_key"}
+
+def test_reasoning_service_uses_own_deployment(azure_env):
+    """Test that the reasoning deployment gets its own pooled service"""
+    chat = setup.get_chat_service()
+    reasoning = setup.get_reasoning_service()
+    
+    assert reasoning is not chat
+    assert reasoning.kwargs["deployment_name"] == "o3-mini"
+    assert setup.get_reasoning_service() is reasoning
+
+def test_missing_settings_raise(azure_env, monkeypatch):
+    """Test that missing credentials are reported"""
+    monkeypatch.delenv("AZURE_OPENAI_KEY")
+    with pytest.raises(ValueError):
+        setup.get_chat_service()
@@ -0,0 +1,226 @@
+"""
+tests/test_telsearch_plugin.py - Tests for the tel.search.ch lookup plugin
+"""
+
+import asyncio
+import json
+import httpx
+import plugins.telsearch_plugin as telsearch_module
+import utils.http_client as http_client
+from plugins.telsearch_plugin import TelsearchPlugin
+from utils.lookup_cache import LookupCache
+
+SAMPLE_FEED = """<?xml version="1.0" encoding="utf-8" ?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:tel="http://tel.search.ch/api/spec/result/1.0/">
+  <entry>
+    <title type="text">Meier, Hans</title>
+    <content type="text">Hans Meier, Bahnhofstrasse 10, 8001 Zürich</content>
+    <tel:name>Meier</tel:name>
+    <tel:firstname>Hans</tel:firstname>
+    <tel:street>Bahnhofstrasse</tel:street>
+    <tel:streetno>10</tel:streetno>
+    <tel:zip>8001</tel:zip>
+    <tel:city>Zürich</tel:city>
+    <tel:phone>+41441234567</tel:phone>
+  </entry>
+</feed>"""
+
+def _mock_clients(monkeypatch, handler):
+    """Route the plugin's shared HTTP clients through a mock transport"""
+    transport = httpx.MockTransport(handler)
+    monkeypatch.setattr(telsearch_module, "get_sync_client",
+                        lambda: httpx.Client(transport=transport))
+    monkeypatch.setattr(telsearch_module, "get_async_client",
+                        lambda: httpx.AsyncClient(transport=transport))
+
+def test_search_person_async_returns_feed(monkeypatch):
+    """Test that the async lookup returns the raw Atom feed"""
+    requests_seen = []
+    
+    def handler(request):
+        requests_seen.append(request)
+        return httpx.Response(200, text=SAMPLE_FEED)
+    
+    _mock_clients(monkeypatch, handler)
+    plugin = TelsearchPlugin(cache=LookupCache())
+    
+    result = asyncio.run(plugin.search_person_async("Hans Meier", "Zürich", raw=True))
+    assert result == SAMPLE_FEED
+    assert requests_seen[0].url.params["was"] == "Hans Meier"
+    assert requests_seen[0].url.params["wo"] == "Zürich"
+
+def test_search_person_sync_wrapper(monkeypatch):
+    """Test that the blocking wrapper returns the same result"""
+    _mock_clients(monkeypatch, lambda request: httpx.Response(200, text=SAMPLE_FEED))
+    plugin = TelsearchPlugin(cache=LookupCache())
+    
+    assert plugin.search_person("Hans Meier", "Zürich", raw=True) == SAMPLE_FEED
+
+def test_search_person_http_error(monkeypatch):
+    """Test that non-200 responses are reported as error strings"""
+    _mock_clients(monkeypatch, lambda request: httpx.Response(503, text="unavailable"))
+    plugin = TelsearchPlugin(cache=LookupCache())
+    
+    result = asyncio.run(plugin.search_person_async("Hans Meier", "Zürich"))
+    assert '"error"' in result
+    assert "503" in result
+
+def test_search_person_exception(monkeypatch):
+    """Test that transport errors are reported as error strings"""
+    def handler(request):
+        raise httpx.ConnectTimeout("timed out")
+    
+    _mock_clients(monkeypatch, handler)
+    plugin = TelsearchPlugin(cache=LookupCache())
+    
+    result = plugin.search_person("Hans Meier", "Zürich")
+    assert "Exception occurred" in result
+
+def test_search_person_uses_cache(monkeypatch):
+    """Test that repeated lookups are answered from the cache"""
+    calls = []
+    
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, text=SAMPLE_FEED)
+    
+    _mock_clients(monkeypatch, handler)
+    plugin = TelsearchPlugin(cache=LookupCache())
+    
+    assert asyncio.run(plugin.fetch_feed_async("Hans Meier", "Zürich")) == SAMPLE_FEED
+    assert plugin.fetch_feed("hans  meier", "zürich") == SAMPLE_FEED
+    assert len(calls) == 1
+    assert plugin.cache_stats()["hits"] == 1
+
+def test_search_person_does_not_cache_errors(monkeypatch):
+    """Test that failed lookups are retried instead of cached"""
+    calls = []
+    
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(500, text="error")
+    
+    _mock_clients(monkeypatch, handler)
+    plugin = TelsearchPlugin(cache=LookupCache())
+    
+    plugin.search_person("Hans Meier", "Zürich")
+    plugin.search_person("Hans Meier", "Zürich")
+    assert len(calls) == 2
+
+def test_lookup_many_preserves_order():
+    """Test that batch results are returned in input order"""
+    plugin = TelsearchPlugin(cache=LookupCache(), max_concurrency=2, rate_limit=0)
+    
+    async def fake_search(name, location):
+        await asyncio.sleep(0.03 if name == "Slow Person" else 0)
+        return f"feed for {name}"
+    plugin.fetch_feed_async = fake_search
+    
+    names = ["Slow Person", "Hans Meier", "Anna Schmidt"]
+    results = asyncio.run(plugin.lookup_many(names, "Zürich"))
+    assert results == [f"feed for {name}" for name in names]
+
+def test_lookup_many_bounds_concurrency():
+    """Test that no more than max_concurrency lookups run at once"""
+    plugin = TelsearchPlugin(cache=LookupCache(), max_concurrency=2, rate_limit=0)
+    running = []
+    peak = []
+    
+    async def fake_search(name, location):
+        running.append(name)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(name)
+        return name
+    plugin.fetch_feed_async = fake_search
+    
+    asyncio.run(plugin.lookup_many([f"Person {i}" for i in range(6)], "Zürich"))
+    assert max(peak) == 2
+
+def test_lookup_many_deadline():
+    """Test that slow lookups are reported as timed out"""
+    plugin = TelsearchPlugin(cache=LookupCache(), rate_limit=0)
+    
+    async def fake_search(name, location):
+        await asyncio.sleep(1)
+        return name
+    plugin.fetch_feed_async = fake_search
+    
+    results = asyncio.run(plugin.lookup_many(["Hans Meier"], "Zürich", deadline=0.01))
+    assert "timed out" in results[0]
+
+def test_search_people_returns_json(monkeypatch):
+    """Test the batch kernel function output format"""
+    _mock_clients(monkeypatch, lambda request: httpx.Response(200, text=SAMPLE_FEED))
+    plugin = TelsearchPlugin(cache=LookupCache(), rate_limit=0)
+    
+    result = json.loads(asyncio.run(plugin.search_people(["Hans Meier", "Anna Schmidt"], "Zürich")))
+    assert [r["name"] for r in result] == ["Hans Meier", "Anna Schmidt"]
+    assert result[0]["result"][0]["street"] == "Bahnhofstrasse"
+    
+    raw_result = json.loads(asyncio.run(plugin.search_people(["Hans Meier"], "Zürich", raw=True)))
+    assert raw_result[0]["result"] == SAMPLE_FEED
+
+def test_search_person_compact_output(monkeypatch):
+    """Test that the default output is a short candidate list"""
+    _mock_clients(monkeypatch, lambda request: httpx.Response(200, text=SAMPLE_FEED))
+    plugin = TelsearchPlugin(cache=LookupCache(), rate_limit=0)
+    
+    result = asyncio.run(plugin.search_person_async("Hans Meier", "Zürich"))
+    assert json.loads(result) == [
+        {"name": "Hans Meier", "street": "Bahnhofstrasse", "no": "10", "zip": "8001", "city": "Zürich", "score": 100}
+    ]
+    assert len(result) < len(SAMPLE_FEED) / 2
+
+def test_compact_results_top_k():
+    """Test that compact output is capped and keeps empty and error results"""
+    plugin = TelsearchPlugin(cache=LookupCache(), top_k=2)
+    entry = SAMPLE_FEED.split("<entry>")[1].split("</entry>")[0]
+    feed = SAMPLE_FEED.replace(f"<entry>{entry}</entry>", f"<entry>{entry}</entry>" * 5)
+    
+    assert len(json.loads(plugin.compact_results(feed))) == 2
+    assert plugin.compact_results('<feed xmlns="http://www.w3.org/2005/Atom"></feed>') == "[]"
+    assert plugin.compact_results('{"error":"Telsearch returned 500"}') == '{"error":"Telsearch returned 500"}'
+
+def test_compact_results_ranks_best_match_first():
+    """Test that candidates are ordered by similarity to the requested name"""
+    plugin = TelsearchPlugin(cache=LookupCache(), top_k=2)
+    other = SAMPLE_FEED.split("<entry>")[1].split("</entry>")[0].replace("Hans", "Peter")
+    feed = SAMPLE_FEED.replace("<entry>", f"<entry>{other}</entry><entry>", 1)
+    
+    assert json.loads(plugin.compact_results(feed))[0]["name"] == "Peter Meier"
+    ranked = json.loads(plugin.compact_results(feed, "Meier, Hans", "Zürich"))
+    assert [c["name"] for c in ranked] == ["Hans Meier", "Peter Meier"]
+    assert ranked[0]["score"] == 100 > ranked[1]["score"]
+
+def test_plugins_share_one_lookup_cache(monkeypatch):
+    """Test that plugins without an explicit cache use the shared instance until it is closed"""
+    monkeypatch.setenv("TELSEARCH_CACHE_PATH", "")
+    monkeypatch.setattr(telsearch_module, "_shared_cache", None)
+    
+    first = TelsearchPlugin()
+    second = TelsearchPlugin()
+    assert first.cache is second.cache
+    
+    telsearch_module.close_lookup_cache()
+    assert TelsearchPlugin().cache is not first.cache
+
+async def _get_async_client():
+    """Get the shared async client of the running loop"""
+    return http_client.get_async_client()
+
+def test_close_clients_closes_pooled_clients():
+    """Test that shutdown closes the shared clients and drops those of closed loops"""
+    sync_client = http_client.get_sync_client()
+    stale_client = asyncio.run(_get_async_client())
+    
+    async def open_and_close():
+        client = http_client.get_async_client()
+        await http_client.close_clients()
+        return client
+    
+    client = asyncio.run(open_and_close())
+    
+    assert sync_client.is_closed and client.is_closed
+    assert not stale_client.is_closed  # Its loop is gone, so it is only dropped
+    assert http_client._async_clients == {}
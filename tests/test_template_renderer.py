@@ -0,0 +1,61 @@
+"""
+tests/test_template_renderer.py - Tests for local template rendering
+"""
+
+import pytest
+from datetime import date
+from models.core import Person, PersonType, DocumentContext
+from utils.template_renderer import (
+    format_address_list, render_document, render_template, template_placeholders
+)
+
+def _make_context(people):
+    """Create a document context for the given requested people"""
+    return DocumentContext(
+        requestor=Person(firstname="Max", lastname="Muster", address="Hauptstrasse 1",
+                         city="8000 Zürich", type=PersonType.REQUESTOR),
+        requested_people=people,
+        gemeinde="Zürich",
+        zweck="Organization of a Neighborhood Festival"
+    )
+
+def test_template_placeholders():
+    """Test that the document template uses the known placeholders"""
+    with open("templates/verfuegung_template.md", encoding="utf-8") as f:
+        template = f.read()
+    assert template_placeholders(template) == {
+        "requestor_name", "requestor_address", "zweck", "address_list", "current_date"
+    }
+
+def test_single_person_is_inline():
+    """Test that one person is written without a list"""
+    people = [Person(firstname="Hans", lastname="Meier", address="Bahnhofstrasse 10", city="8001 Zürich")]
+    assert format_address_list(people) == "Hans Meier, Bahnhofstrasse 10, 8001 Zürich"
+
+def test_multiple_people_are_numbered():
+    """Test that several people become a numbered list"""
+    people = [
+        Person(firstname="Hans", lastname="Meier", address="Bahnhofstrasse 10", city="8001 Zürich"),
+        Person(firstname="Anna", lastname="Schmidt")
+    ]
+    result = format_address_list(people)
+    assert "   1. Hans Meier, Bahnhofstrasse 10, 8001 Zürich" in result
+    assert "   2. Anna Schmidt, [ADDRESS NOT AVAILABLE]" in result
+
+def test_render_document_is_deterministic():
+    """Test that rendering the same input twice gives identical output"""
+    with open("templates/verfuegung_template.md", encoding="utf-8") as f:
+        template = f.read()
+    context = _make_context([Person(firstname="Hans", lastname="Meier")])
+    
+    first = render_document(template, context, current_date=date(2024, 3, 8))
+    second = render_document(template, context, current_date=date(2024, 3, 8))
+    
+    assert first == second
+    assert "**08.03.2024**" in first
+    assert "**Organization of a Neighborhood Festival**" in first
+
+def test_render_template_missing_value():
+    """Test that unknown placeholders are reported"""
+    with pytest.raises(KeyError):
+        render_template("Hello {name}", {})
@@ -0,0 +1,83 @@
+"""
+tests/test_validation_rules.py - Tests for the deterministic pre-validation rules
+"""
+
+import pytest
+from models.core import ChecklistItem
+from utils.validation_rules import RULE_PRECONDITION, apply_rules, load_rules, parse_rules
+
+CHECKLIST = [
+    ChecklistItem(section="Legal Basis", item="Legal foundations?", position=0),
+    ChecklistItem(section="List Inquiry", item="Purpose described?", position=1),
+    ChecklistItem(section="Declaration of Commitment - General Obligations", item="Obligations?", position=2),
+    ChecklistItem(section="Legal Remedies", item="Municipal Act referenced?", position=3)
+]
+
+def test_shipped_rules_compile():
+    """Test that the rules next to the checklist load and cover known sections"""
+    rules = load_rules()
+    
+    assert {rule.section for rule in rules} == {item.section for item in CHECKLIST}
+
+def test_legal_citations_are_recognized():
+    """Test that the citation patterns accept common spellings"""
+    rules = load_rules()
+    document = (
+        "pursuant to § 3 para. 3 Registration and Register Act (RRA)\n"
+        "Art. 292 CC applies.\n"
+        "See § 34 para. 2 lit. b IDPA in conjunction with § 25 IDPO.\n"
+        "Legal Remedies pursuant to §§ 172 ff. of the Municipal Act\n"
+    )
+    
+    results, _ = apply_rules(document, CHECKLIST, rules)
+    by_section = {r["section"]: r for r in results}
+    
+    assert by_section["Legal Basis"]["status"] == "passed"
+    assert by_section["Legal Remedies"]["status"] == "passed"
+
+def test_empty_address_list_fails():
+    """Test that a document with an empty address list fails the list inquiry"""
+    rules = load_rules()
+    document = (
+        "The purpose of this data disclosure is exclusively: **Neighborhood Contact**\n"
+        "The provided information includes the following addresses: none\n"
+    )
+    
+    results, _ = apply_rules(document, CHECKLIST, rules)
+    list_inquiry = next(r for r in results if r["section"] == "List Inquiry")
+    
+    assert list_inquiry["status"] == "failed"
+    assert list_inquiry["details"] == "Missing: non-empty address list"
+
+def test_filled_list_inquiry_is_left_to_llm():
+    """Test that a matching purpose and address list do not pass the list inquiry on their own"""
+    rules = load_rules()
+    document = (
+        "The purpose of this data disclosure is exclusively: **Neighborhood Contact**\n"
+        "The provided information includes the following addresses: Hans Meier, Bahnhofstrasse 10\n"
+    )
+    
+    results, remaining = apply_rules(document, CHECKLIST[1:2], rules)
+    
+    assert results == []
+    assert remaining == CHECKLIST[1:2]
+
+def test_precondition_leaves_item_to_llm():
+    """Test that a passed precondition rule does not settle the item"""
+    rules = parse_rules({"rules": [
+        {"section": "Legal Basis", "mode": RULE_PRECONDITION,
+         "require": [{"label": "RRA", "pattern": "RRA"}]}
+    ]})
+    
+    results, remaining = apply_rules("§ 3 RRA", CHECKLIST[:1], rules)
+    assert results == []
+    assert remaining == CHECKLIST[:1]
+    
+    results, remaining = apply_rules("no citation", CHECKLIST[:1], rules)
+    assert results[0]["status"] == "failed"
+    assert remaining == []
+
+def test_invalid_rule_mode_raises():
+    """Test that an unknown rule mode is rejected when loading"""
+    with pytest.raises(ValueError):
+        parse_rules({"rules": [{"section": "Legal Basis", "mode": "maybe", "require": []}]})
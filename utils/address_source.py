@@ -0,0 +1,48 @@
+"""
+utils/address_source.py - Interface of the backends answering address lookups
+
+tel.search.ch stands in for the municipal resident register. Both are
+address sources: they take a name and a municipality and return the matching
+entries as a tel.search.ch style Atom feed (see utils/atom_feed.py), so
+TelsearchPlugin ranks, caches and compacts the results of every backend the
+same way and the agents use the same kernel functions on top of any of them.
+"""
+
+from abc import ABC, abstractmethod
+
+SOURCE_TELSEARCH = "telsearch"  # tel.search.ch web API
+SOURCE_REGISTER = "register"  # Local snapshot of the resident register
+
+
+class AddressSource(ABC):
+    """A backend looking up the addresses of people in a municipality."""
+
+    # Whether results are worth keeping in the lookup cache. Local sources
+    # answer faster than the cache and are always current.
+    cacheable: bool = True
+
+    @abstractmethod
+    async def fetch_feed_async(self, name: str, location: str) -> str:
+        """
+        Look up a person without blocking the event loop.
+
+        Args:
+            name: Name of the person to search for
+            location: Location/municipality to search within
+
+        Returns:
+            Atom feed XML as string or a JSON-like string with 'error'
+        """
+
+    @abstractmethod
+    def fetch_feed(self, name: str, location: str) -> str:
+        """
+        Blocking variant of fetch_feed_async.
+
+        Args:
+            name: Name of the person to search for
+            location: Location/municipality to search within
+
+        Returns:
+            Atom feed XML as string or a JSON-like string with 'error'
+        """
@@ -0,0 +1,135 @@
+"""
+utils/atom_feed.py - Streaming parser for tel.search.ch Atom feeds
+
+This module reads the Atom feed returned by the tel.search.ch API entry by
+entry with a pull parser, so large result sets are never held as a full tree
+and parsing can stop as soon as enough entries have been read. Local address
+sources write their results in the same format with render_feed.
+"""
+
+import xml.etree.ElementTree as ET
+from typing import Iterator, List, Optional
+from xml.sax.saxutils import escape
+
+from models.core import AddressEntry
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+TEL_NS = "http://tel.search.ch/api/spec/result/1.0/"
+
+CHUNK_SIZE = 8192  # Characters fed to the parser at a time
+
+# Child elements copied into AddressEntry fields, by local tag name
+_ENTRY_FIELDS = {
+    "title": "title",
+    "content": "content",
+    "name": "name",
+    "firstname": "firstname",
+    "street": "street",
+    "streetno": "streetno",
+    "zip": "zip",
+    "city": "city",
+    "phone": "phone"
+}
+
+
+def _local_name(tag: str) -> str:
+    """Strip the '{namespace}' prefix from an element tag."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _to_entry(element: ET.Element) -> AddressEntry:
+    """Convert an <entry> element into an AddressEntry."""
+    values = {}
+    for child in element:
+        field = _ENTRY_FIELDS.get(_local_name(child.tag))
+        # The first occurrence wins, e.g. the first tel:phone of an entry
+        if field and field not in values and child.text:
+            values[field] = child.text.strip()
+    return AddressEntry(**values)
+
+
+def iter_entries(xml_text: str, limit: Optional[int] = None) -> Iterator[AddressEntry]:
+    """
+    Yield the entries of an Atom feed one at a time.
+
+    Args:
+        xml_text: The Atom feed XML
+        limit: Stop after this many entries. None reads all entries.
+
+    Yields:
+        One AddressEntry per <entry> element, in feed order
+
+    Raises:
+        xml.etree.ElementTree.ParseError: If the feed is not well-formed XML
+    """
+    if limit is not None and limit <= 0:
+        return
+
+    parser = ET.XMLPullParser(events=("start", "end"))
+    open_elements = []  # Elements started but not yet ended, innermost last
+    count = 0
+
+    for offset in range(0, len(xml_text), CHUNK_SIZE):
+        parser.feed(xml_text[offset:offset + CHUNK_SIZE])
+        for event, element in parser.read_events():
+            if event == "start":
+                open_elements.append(element)
+                continue
+            open_elements.pop()
+            if _local_name(element.tag) != "entry":
+                continue
+
+            yield _to_entry(element)
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+            # Drop the processed entry from its parent so memory stays flat
+            element.clear()
+            if open_elements:
+                open_elements[-1].remove(element)
+
+    parser.close()
+
+
+def parse_entries(xml_text: str, limit: Optional[int] = None) -> List[AddressEntry]:
+    """
+    Parse the entries of an Atom feed, ignoring malformed input.
+
+    Args:
+        xml_text: The Atom feed XML
+        limit: Maximum number of entries to return
+
+    Returns:
+        List of entries, empty if the feed is malformed or has no entries
+    """
+    entries = []
+    try:
+        for entry in iter_entries(xml_text, limit=limit):
+            entries.append(entry)
+    except ET.ParseError as e:
+        print(f"DEBUG: Could not parse Atom feed: {str(e)}")
+    return entries
+
+
+def render_feed(entries: List[AddressEntry]) -> str:
+    """
+    Write entries as a tel.search.ch style Atom feed.
+
+    Args:
+        entries: Entries to write
+
+    Returns:
+        Atom feed XML that iter_entries reads back into the same entries
+    """
+    parts = [f'<feed xmlns="{ATOM_NS}" xmlns:tel="{TEL_NS}">']
+    for entry in entries:
+        parts.append("<entry>")
+        for tag, field in _ENTRY_FIELDS.items():
+            value = getattr(entry, field)
+            if value:
+                name = tag if tag in ("title", "content") else f"tel:{tag}"
+                parts.append(f"<{name}>{escape(value)}</{name}>")
+        parts.append("</entry>")
+    parts.append("</feed>")
+    return "".join(parts)
@@ -0,0 +1,134 @@
+"""
+utils/candidate_ranking.py - Fuzzy ranking of address lookup candidates
+
+tel.search.ch returns up to ten entries per lookup, not necessarily with the
+requested person first. This module scores every entry against the requested
+name and municipality with thefuzz, after transliterating umlauts and ß
+("Müller" and "Mueller" compare equal) and ignoring token order ("Meier, Hans"
+and "Hans Meier" compare equal). The confidence of the best entry decides
+whether it is accepted directly or the lookup is left to the agents.
+"""
+
+import os
+import unicodedata
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from thefuzz import fuzz
+
+from models.core import AddressEntry
+
+DEFAULT_CONFIDENCE_THRESHOLD = 95  # Minimum confidence (0-100) for accepting a match
+
+# German spellings without umlauts, as used by registers and in e-mail addresses
+_TRANSLITERATION = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+
+
+def transliterate(text: str) -> str:
+    """
+    Normalize a name for comparison.
+
+    Umlauts and ß are spelled out, other accents are dropped and case and
+    surplus whitespace are ignored, e.g. "Müller-Großmann" becomes
+    "mueller-grossmann" and "Hélène" becomes "helene".
+
+    Args:
+        text: Name or place to normalize
+
+    Returns:
+        Normalized text
+    """
+    text = text.casefold().translate(_TRANSLITERATION)
+    text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return " ".join(text.split())
+
+
+def get_confidence_threshold() -> float:
+    """Get the confidence a candidate needs to be accepted without the agents (env MATCH_CONFIDENCE_THRESHOLD)."""
+    return float(os.environ.get("MATCH_CONFIDENCE_THRESHOLD", DEFAULT_CONFIDENCE_THRESHOLD))
+
+
+@dataclass
+class RankedCandidate:
+    """A lookup entry with its similarity to the requested person."""
+    entry: AddressEntry
+    name_score: int  # Similarity of the names, 0-100
+    location_score: int  # Similarity of municipality and city, 0-100
+
+    @property
+    def confidence(self) -> float:
+        """Overall confidence (0-100) that the entry is the requested person"""
+        return self.name_score * self.location_score / 100
+
+
+def candidate_name(entry: AddressEntry) -> str:
+    """Get the person name of an entry, falling back to the title."""
+    name = f"{entry.firstname} {entry.name}".strip()
+    return name or entry.title
+
+
+def score_candidate(name: str, location: str, entry: AddressEntry) -> RankedCandidate:
+    """
+    Score a single entry against the requested person.
+
+    Args:
+        name: Requested name, e.g. "Hans Meier" or "Meier, Hans"
+        location: Requested municipality
+        entry: Lookup entry to score
+
+    Returns:
+        The entry with its name and location scores
+    """
+    name_score = fuzz.token_sort_ratio(transliterate(name), transliterate(candidate_name(entry)))
+
+    city = transliterate(entry.city)
+    if not city:
+        # Entries without a city come from the searched municipality
+        location_score = 100
+    else:
+        location_score = fuzz.partial_ratio(transliterate(location), city)
+
+    return RankedCandidate(entry=entry, name_score=name_score, location_score=location_score)
+
+
+def rank_candidates(name: str, location: str, entries: Sequence[AddressEntry]) -> List[RankedCandidate]:
+    """
+    Rank all entries of a lookup by confidence.
+
+    Args:
+        name: Requested name
+        location: Requested municipality
+        entries: Lookup entries in feed order
+
+    Returns:
+        Scored entries, best first; entries with equal confidence keep their feed order
+    """
+    ranked = [score_candidate(name, location, entry) for entry in entries]
+    return sorted(ranked, key=lambda candidate: candidate.confidence, reverse=True)
+
+
+def select_match(ranked: Sequence[RankedCandidate], threshold: float) -> Optional[RankedCandidate]:
+    """
+    Pick the candidate that can be accepted without further checks.
+
+    The best candidate must reach the threshold, and no other candidate above
+    the threshold may point to a different address (e.g. two residents with
+    the same name in one municipality).
+
+    Args:
+        ranked: Candidates ordered by rank_candidates
+        threshold: Minimum confidence
+
+    Returns:
+        The accepted candidate or None if the lookup needs the agents
+    """
+    if not ranked or ranked[0].confidence < threshold:
+        return None
+
+    best = ranked[0]
+    for other in ranked[1:]:
+        if other.confidence < threshold:
+            break
+        if other.entry.to_address_dict() != best.entry.to_address_dict():
+            return None
+    return best
@@ -0,0 +1,183 @@
+"""
+utils/checklist.py - Parsing of the validation checklist and of item verdicts
+
+This module splits templates/validation_questions.md into independent
+checklist items, so each item can be evaluated on its own, and reads the
+JSON verdicts the model returns for a single item or the whole checklist.
+"""
+
+import json
+import re
+from typing import Dict, List
+
+from models.core import ChecklistItem
+
+SECTION_PATTERN = re.compile(r"^\s*(\d+)\.\s+(.+?)\s*$")
+ITEM_PATTERN = re.compile(r"^\s*[☐☑✅❌\-\*]\s*(.+?)\s*$")
+VALID_STATUSES = ("passed", "failed")
+UNEXPECTED_ANSWER = "Could not evaluate item, unexpected answer"
+NO_RESULT = "No valid result returned for this item"
+
+# JSON schema constraining the answer of the structured single-call validation
+VALIDATION_RESULT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "section": {"type": "string"},
+                    "item": {"type": "string"},
+                    "status": {"type": "string", "enum": list(VALID_STATUSES)},
+                    "details": {"type": "string"}
+                },
+                "required": ["section", "item", "status", "details"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["results"],
+    "additionalProperties": False
+}
+
+
+def parse_checklist(text: str) -> List[ChecklistItem]:
+    """
+    Split a checklist into its items.
+
+    Sections are numbered lines such as "1. Legal Basis", items are the
+    "☐ ..." lines below them.
+
+    Args:
+        text: Checklist in the format of validation_questions.md
+
+    Returns:
+        Checklist items in document order
+    """
+    items = []
+    section = ""
+    for line in text.splitlines():
+        section_match = SECTION_PATTERN.match(line)
+        if section_match:
+            section = section_match.group(2)
+            continue
+
+        item_match = ITEM_PATTERN.match(line)
+        if item_match and section:
+            items.append(ChecklistItem(section=section, item=item_match.group(1), position=len(items)))
+    return items
+
+
+def _strip_code_fence(text: str) -> str:
+    """Remove a ```json ... ``` fence around a model answer."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    return text.strip()
+
+
+def parse_item_verdict(item: ChecklistItem, answer: str) -> Dict:
+    """
+    Convert the model answer for one checklist item into a validation result.
+
+    Answers that are not valid JSON or have an unknown status are recorded as
+    failed, so a broken answer never passes the check silently.
+
+    Args:
+        item: The checklist item that was evaluated
+        answer: Model answer, expected as {"status": ..., "details": ...}
+
+    Returns:
+        Validation result with section, item, status and details
+    """
+    try:
+        verdict = json.loads(_strip_code_fence(answer))
+        status = str(verdict.get("status", "")).strip().lower()
+        details = verdict.get("details")
+    except (ValueError, AttributeError):
+        status, details = "", None
+
+    if status not in VALID_STATUSES:
+        return {
+            "section": item.section,
+            "item": item.item,
+            "status": "failed",
+            "details": f"{UNEXPECTED_ANSWER}: {answer.strip()[:200]}"
+        }
+
+    return {
+        "section": item.section,
+        "item": item.item,
+        "status": status,
+        "details": details
+    }
+
+
+def is_evaluated(result: Dict) -> bool:
+    """
+    Check whether a result holds an actual verdict of the model.
+
+    Results recorded as failed because the answer could not be read are not
+    evaluated and must not be reused.
+    """
+    return not (result.get("details") or "").startswith((UNEXPECTED_ANSWER, NO_RESULT))
+
+
+def _normalize(text: str) -> str:
+    """Normalize item text for matching model output to the checklist."""
+    return " ".join(str(text).casefold().split())
+
+
+def parse_structured_results(answer: str, checklist: List[ChecklistItem]) -> List[Dict]:
+    """
+    Check the answer of the structured validation against the checklist.
+
+    Results are matched to checklist items by item text, falling back to their
+    position. Section and item texts are taken from the checklist, so the report
+    does not depend on how the model copied them. Items without a valid result
+    are recorded as failed.
+
+    Args:
+        answer: Model answer following VALIDATION_RESULT_SCHEMA
+        checklist: Checklist items that had to be evaluated
+
+    Returns:
+        One validation result per checklist item, in checklist order
+
+    Raises:
+        ValueError: If the answer is not JSON of the expected shape
+    """
+    data = json.loads(_strip_code_fence(answer))
+    results = data.get("results") if isinstance(data, dict) else data
+    if not isinstance(results, list):
+        raise ValueError("Expected a list of validation results")
+
+    results = [r for r in results if isinstance(r, dict)]
+    by_item = {_normalize(r.get("item", "")): r for r in results}
+
+    parsed = []
+    for index, item in enumerate(checklist):
+        result = by_item.get(_normalize(item.item))
+        if result is None and index < len(results) and \
+                _normalize(results[index].get("section", "")) == _normalize(item.section):
+            result = results[index]
+
+        status = str(result.get("status", "")).strip().lower() if result else ""
+        if status not in VALID_STATUSES:
+            parsed.append({
+                "section": item.section,
+                "item": item.item,
+                "status": "failed",
+                "details": NO_RESULT
+            })
+            continue
+
+        parsed.append({
+            "section": item.section,
+            "item": item.item,
+            "status": status,
+            "details": result.get("details") or None
+        })
+    return parsed
@@ -0,0 +1,201 @@
+"""
+utils/document_cache.py - Content-addressed cache for generated artifacts
+
+Generated documents are keyed by a canonical hash of the DocumentContext and
+the template version; validation reports and exported files are keyed by a
+hash of the document text, single checklist verdicts by a hash of the
+document blocks they depend on. Identical requests and double-clicks are answered
+from the cache, and concurrent identical requests share a single computation.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from typing import Awaitable, Callable, Dict, Optional
+
+from models.core import DocumentContext, Person
+from utils.lookup_cache import LookupCache
+
+DEFAULT_CACHE_PATH = os.path.join("cache", "documents.sqlite3")
+DEFAULT_MAX_ENTRIES = 256  # Documents kept in memory
+
+# Kinds of cached artifacts
+DOCUMENT = "document"
+VALIDATION = "validation"
+VALIDATION_ITEM = "validation_item"
+EXPORT = "export"
+
+
+def _normalize(text: Optional[str]) -> str:
+    """Collapse whitespace so formatting differences do not change the key."""
+    return " ".join((text or "").split())
+
+
+def _person_key(person: Person) -> Dict[str, str]:
+    """Canonical representation of a person."""
+    return {
+        "firstname": _normalize(person.firstname),
+        "lastname": _normalize(person.lastname),
+        "address": _normalize(person.address),
+        "city": _normalize(person.city),
+        "type": person.type.value
+    }
+
+
+def text_fingerprint(*parts: str) -> str:
+    """
+    Hash one or more texts.
+
+    Args:
+        parts: Texts to hash, e.g. a document and a template
+
+    Returns:
+        Hex encoded SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def context_fingerprint(context: DocumentContext, template_version: str) -> str:
+    """
+    Hash a document context independent of the order of the requested people.
+
+    Args:
+        context: Document context to hash
+        template_version: Identifies the template and generation settings
+
+    Returns:
+        Hex encoded SHA-256 digest
+    """
+    people = sorted(
+        (_person_key(p) for p in context.requested_people),
+        key=lambda p: json.dumps(p, sort_keys=True, ensure_ascii=False)
+    )
+    canonical = {
+        "requestor": _person_key(context.requestor),
+        "requested_people": people,
+        "gemeinde": _normalize(context.gemeinde),
+        "zweck": _normalize(context.zweck),
+        "template_version": template_version
+    }
+    return text_fingerprint(json.dumps(canonical, sort_keys=True, ensure_ascii=False))
+
+
+class DocumentCache:
+    """
+    Bounded LRU cache with a disk tier for generated markdown, validation
+    reports and exported DOCX paths.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the cache.
+
+        Args:
+            path: Path of the SQLite file. If None, the cache is memory-only.
+            max_entries: Maximum number of entries held in memory
+        """
+        self._store = LookupCache(path=path, ttl=None, max_entries=max_entries, namespace="documents")
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def get(self, kind: str, key: str) -> Optional[dict]:
+        """
+        Look up a cached artifact.
+
+        Args:
+            kind: Artifact kind (DOCUMENT, VALIDATION, VALIDATION_ITEM or EXPORT)
+            key: Content hash of the input
+
+        Returns:
+            The cached value or None
+        """
+        value = self._store.get(f"{kind}:{key}")
+        return json.loads(value) if value is not None else None
+
+    def set(self, kind: str, key: str, value: dict):
+        """Store an artifact."""
+        self._store.set(f"{kind}:{key}", json.dumps(value, ensure_ascii=False))
+
+    def delete(self, kind: str, key: str):
+        """Remove an artifact, e.g. if an exported file no longer exists."""
+        self._store.delete(f"{kind}:{key}")
+
+    async def get_async(self, kind: str, key: str) -> Optional[dict]:
+        """Look up a cached artifact without blocking the event loop."""
+        value = await self._store.get_async(f"{kind}:{key}")
+        return json.loads(value) if value is not None else None
+
+    async def set_async(self, kind: str, key: str, value: dict):
+        """Store an artifact, writing the disk tier in a worker thread."""
+        await self._store.set_async(f"{kind}:{key}", json.dumps(value, ensure_ascii=False))
+
+    async def delete_async(self, kind: str, key: str):
+        """Remove an artifact, deleting it from disk in a worker thread."""
+        await self._store.delete_async(f"{kind}:{key}")
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters."""
+        return self._store.stats()
+
+    async def get_or_create(
+        self,
+        kind: str,
+        key: str,
+        factory: Callable[[], Awaitable[dict]],
+        cacheable: Optional[Callable[[dict], bool]] = None
+    ) -> dict:
+        """
+        Return a cached artifact or create it once.
+
+        Concurrent calls for the same key wait for the first computation
+        instead of starting their own.
+
+        Args:
+            kind: Artifact kind (DOCUMENT, VALIDATION or EXPORT)
+            key: Content hash of the input
+            factory: Coroutine function computing the artifact
+            cacheable: Decides whether a value may be kept. Rejected values
+                       are returned but not stored, and ignored when found
+                       in the cache.
+
+        Returns:
+            The cached or newly created value
+        """
+        cached = await self.get_async(kind, key)
+        if cached is not None and (cacheable is None or cacheable(cached)):
+            return cached
+
+        full_key = f"{kind}:{key}"
+        pending = self._pending.get(full_key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[full_key] = future
+        try:
+            value = await factory()
+            if cacheable is None or cacheable(value):
+                await self.set_async(kind, key, value)
+            else:
+                await self.delete_async(kind, key)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark as retrieved if nobody else is waiting
+            raise
+        finally:
+            del self._pending[full_key]
+
+
+def create_document_cache() -> DocumentCache:
+    """
+    Create the document cache configured by DOCUMENT_CACHE_PATH
+    (empty for memory-only).
+    """
+    path = os.environ.get("DOCUMENT_CACHE_PATH", DEFAULT_CACHE_PATH)
+    return DocumentCache(path=path or None)
@@ -10,7 +10,8 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime
 from semantic_kernel import Kernel
 from semantic_kernel.connectors.ai.prompt_execution_settings import PromptExecutionSettings
-from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
+
+from utils.semantic_kernel_setup import get_reasoning_service
 
 async def generate_document_with_llm(
     template: str,
@@ -92,20 +93,9 @@ VORLAGE:
 ```
 """
 
-    # Initialize Semantic Kernel with Azure OpenAI
+    # Use the shared reasoning service so connections are reused across calls
     kernel = Kernel()
-    service_kwargs = {
-        "deployment_name": os.environ.get("AZURE_OPENAI_REASONING_DEPLOYMENT", os.environ.get("AZURE_OPENAI_DEPLOYMENT")),
-        "endpoint": os.environ.get("AZURE_OPENAI_ENDPOINT"),
-        "api_key": os.environ.get("AZURE_OPENAI_KEY"),
-    }
-    
-    # Add API version if using the new Azure OpenAI API
-    if "2024" in os.environ.get("AZURE_OPENAI_API_VERSION", ""):
-        service_kwargs["api_version"] = os.environ.get("AZURE_OPENAI_API_VERSION")
-        
-    reasoning_service = AzureChatCompletion(**service_kwargs)
-    kernel.add_service(reasoning_service)
+    kernel.add_service(get_reasoning_service())
     
     # Invoke the LLM with the prompt
     result = await kernel.invoke_prompt(
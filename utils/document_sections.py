@@ -0,0 +1,59 @@
+"""
+utils/document_sections.py - Splitting generated documents into sections
+
+A checklist item usually depends on a few parts of the document only, e.g.
+the legal remedies line. This module splits the markdown into blocks at
+headings, top-level list items and horizontal rules, so the text an item
+depends on can be hashed and compared between validation runs.
+"""
+
+import re
+from typing import List, Pattern
+
+BLOCK_START_PATTERN = re.compile(r"^(#{1,6}\s|\d+\.\s|---)")
+
+
+def split_blocks(markdown: str) -> List[str]:
+    """
+    Split a markdown document into blocks.
+
+    A block starts at a heading, an unindented numbered list item or a
+    horizontal rule. Indented lines belong to the block above them, so a list
+    item keeps its nested content. Trailing whitespace is ignored.
+
+    Args:
+        markdown: Document text
+
+    Returns:
+        Non-empty blocks in document order
+    """
+    blocks = []
+    current: List[str] = []
+    for line in markdown.splitlines():
+        if BLOCK_START_PATTERN.match(line) and current:
+            blocks.append("\n".join(current).strip())
+            current = []
+        current.append(line.rstrip())
+    if current:
+        blocks.append("\n".join(current).strip())
+    return [block for block in blocks if block]
+
+
+def dependent_text(blocks: List[str], depends_on: List[Pattern]) -> str:
+    """
+    Get the part of a document a checklist item depends on.
+
+    Args:
+        blocks: Document blocks from split_blocks
+        depends_on: Patterns selecting the relevant blocks. An empty list
+                    selects the whole document.
+
+    Returns:
+        The matching blocks joined in document order
+    """
+    if not depends_on:
+        return "\n\n".join(blocks)
+    return "\n\n".join(
+        block for block in blocks
+        if any(pattern.search(block) for pattern in depends_on)
+    )
@@ -0,0 +1,149 @@
+"""
+utils/docx_writer.py - In-process conversion of generated documents to Word
+
+The documents produced from verfuegung_template.md use a small markdown
+subset: headings, paragraphs with hard line breaks, numbered and lettered
+list items, bold and italic text, horizontal rules and a right-aligned
+<div> header. This module writes that subset straight to DOCX with
+python-docx, using the styles of the reference document, so an export needs
+no pandoc process.
+"""
+
+import io
+import re
+from typing import Dict, Optional
+
+from docx import Document
+from docx.oxml.ns import qn
+from docx.oxml import OxmlElement
+from docx.shared import Inches
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*)$")
+LIST_ITEM_PATTERN = re.compile(r"^(\d+\.|[a-z]\)|[-*])\s+")
+INLINE_PATTERN = re.compile(r"(\*\*.+?\*\*|\*.+?\*)")
+HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+RIGHT_ALIGNED_STYLE = "RightAligned"  # Created by create_reference_template
+INDENT_WIDTH = 3  # Spaces per nesting level in the templates
+INDENT_STEP = Inches(0.25)
+
+_reference_cache: Dict[str, bytes] = {}  # Reference documents read once per path
+
+
+def _load_reference(reference_path: Optional[str]):
+    """Open a new document based on the reference document's styles."""
+    if reference_path is None:
+        return Document()
+
+    if reference_path not in _reference_cache:
+        with open(reference_path, "rb") as f:
+            _reference_cache[reference_path] = f.read()
+    document = Document(io.BytesIO(_reference_cache[reference_path]))
+
+    # Drop the example content, keeping the section properties
+    body = document.element.body
+    for child in list(body):
+        if child.tag != qn("w:sectPr"):
+            body.remove(child)
+    return document
+
+
+def _add_inline(paragraph, text: str):
+    """Add text with **bold** and *italic* markup as runs."""
+    for part in INLINE_PATTERN.split(text):
+        if not part:
+            continue
+        if part.startswith("**") and part.endswith("**") and len(part) > 4:
+            paragraph.add_run(part[2:-2]).bold = True
+        elif part.startswith("*") and part.endswith("*") and len(part) > 2:
+            paragraph.add_run(part[1:-1]).italic = True
+        else:
+            paragraph.add_run(part)
+
+
+def _add_horizontal_rule(document):
+    """Add an empty paragraph with a bottom border."""
+    paragraph = document.add_paragraph()
+    borders = OxmlElement("w:pBdr")
+    bottom = OxmlElement("w:bottom")
+    bottom.set(qn("w:val"), "single")
+    bottom.set(qn("w:sz"), "6")
+    bottom.set(qn("w:space"), "1")
+    bottom.set(qn("w:color"), "auto")
+    borders.append(bottom)
+    paragraph._p.get_or_add_pPr().append(borders)
+
+
+def render_markdown(document, markdown_text: str):
+    """
+    Append the content of a markdown document to a python-docx document.
+
+    Args:
+        document: python-docx Document to write into
+        markdown_text: Document text in the supported markdown subset
+    """
+    styles = {style.name for style in document.styles}
+    paragraph = None
+    hard_break = False
+    right_aligned = False
+
+    for line in markdown_text.splitlines():
+        stripped = line.strip()
+
+        if stripped.startswith("<div"):
+            right_aligned = "right" in stripped
+            paragraph = None
+            continue
+        if stripped.startswith("</div"):
+            right_aligned = False
+            paragraph = None
+            continue
+        if not stripped:
+            paragraph = None
+            continue
+        if stripped == "---":
+            _add_horizontal_rule(document)
+            paragraph = None
+            continue
+
+        heading = HEADING_PATTERN.match(stripped)
+        if heading:
+            style = f"Heading {len(heading.group(1))}"
+            paragraph = document.add_paragraph(style=style if style in styles else None)
+            _add_inline(paragraph, heading.group(2))
+            paragraph = None
+            continue
+
+        text = HTML_TAG_PATTERN.sub("", stripped)
+        if paragraph is not None and not LIST_ITEM_PATTERN.match(stripped):
+            # Continuation line of the current paragraph
+            if hard_break:
+                paragraph.add_run().add_break()
+            else:
+                paragraph.add_run(" ")
+        else:
+            style = RIGHT_ALIGNED_STYLE if right_aligned and RIGHT_ALIGNED_STYLE in styles else None
+            paragraph = document.add_paragraph(style=style)
+            level = (len(line) - len(line.lstrip(" "))) // INDENT_WIDTH
+            if level:
+                paragraph.paragraph_format.left_indent = INDENT_STEP * level
+
+        _add_inline(paragraph, text)
+        hard_break = line.endswith("  ")
+
+
+def markdown_to_docx(markdown_text: str, output_path: str, reference_path: Optional[str] = None) -> str:
+    """
+    Write a markdown document to a Word file.
+
+    Args:
+        markdown_text: Document text in the supported markdown subset
+        output_path: Path of the DOCX file to create
+        reference_path: Reference document providing the styles
+
+    Returns:
+        The output path
+    """
+    document = _load_reference(reference_path)
+    render_markdown(document, markdown_text)
+    document.save(output_path)
+    return output_path
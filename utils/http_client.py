@@ -0,0 +1,114 @@
+"""
+utils/http_client.py - Shared, pooled HTTP clients for external API calls
+
+This module hands out process-wide httpx clients so that lookups reuse
+keep-alive connections instead of opening a new TLS session per request.
+HTTP/2 is enabled automatically when the optional 'h2' package is installed.
+"""
+
+import asyncio
+import os
+import threading
+from typing import Optional
+
+import httpx
+
+DEFAULT_TIMEOUT = 10.0  # Seconds per request
+DEFAULT_MAX_CONNECTIONS = 20  # Upper bound of open connections per client
+DEFAULT_MAX_KEEPALIVE = 10  # Idle connections kept open for reuse
+
+_lock = threading.Lock()
+_sync_client: Optional[httpx.Client] = None
+_async_clients = {}  # Maps event loop -> httpx.AsyncClient
+
+
+def _http2_available() -> bool:
+    """Return True if the optional 'h2' package for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _client_settings() -> dict:
+    """
+    Build the keyword arguments shared by the sync and async clients.
+
+    Limits can be tuned with the environment variables HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE and HTTP_TIMEOUT.
+    """
+    limits = httpx.Limits(
+        max_connections=int(os.environ.get("HTTP_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+        max_keepalive_connections=int(os.environ.get("HTTP_MAX_KEEPALIVE", DEFAULT_MAX_KEEPALIVE))
+    )
+    return {
+        "limits": limits,
+        "timeout": float(os.environ.get("HTTP_TIMEOUT", DEFAULT_TIMEOUT)),
+        "http2": _http2_available()
+    }
+
+
+def get_sync_client() -> httpx.Client:
+    """
+    Return the shared blocking client, creating it on first use.
+
+    Returns:
+        Process-wide httpx.Client with a keep-alive connection pool
+    """
+    global _sync_client
+    with _lock:
+        if _sync_client is None or _sync_client.is_closed:
+            _sync_client = httpx.Client(**_client_settings())
+        return _sync_client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Return the shared async client for the running event loop.
+
+    An AsyncClient's connections are bound to the loop that opened them, so
+    one client is kept per loop.
+
+    Returns:
+        httpx.AsyncClient with a keep-alive connection pool
+
+    Raises:
+        RuntimeError: If called outside of a running event loop
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None or client.is_closed:
+            # Drop clients whose loops have already been closed
+            for stale_loop in [l for l in _async_clients if l.is_closed()]:
+                del _async_clients[stale_loop]
+            client = httpx.AsyncClient(**_client_settings())
+            _async_clients[loop] = client
+        return client
+
+
+async def close_clients():
+    """
+    Close all shared clients, e.g. on application shutdown.
+
+    The client of the running loop is closed directly. Clients of other open
+    loops are closed on their own loop; those of closed loops lost their
+    connections together with the loop and are only dropped.
+    """
+    global _sync_client
+    with _lock:
+        sync_client, _sync_client = _sync_client, None
+        async_clients = list(_async_clients.items())
+        _async_clients.clear()
+
+    if sync_client is not None:
+        sync_client.close()
+    running_loop = asyncio.get_running_loop()
+    for loop, client in async_clients:
+        if client.is_closed or loop.is_closed():
+            continue
+        if loop is running_loop:
+            await client.aclose()
+        else:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
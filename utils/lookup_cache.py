@@ -0,0 +1,314 @@
+"""
+utils/lookup_cache.py - Two-tier TTL cache for expensive lookups
+
+This module provides a small cache with an in-memory LRU tier in front of an
+optional SQLite file, so cached entries survive application restarts.
+Each entry carries its own expiry time and hit/miss counters are tracked.
+Async callers use get_async/set_async/delete_async, which keep the SQLite
+work off the event loop.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+DEFAULT_TTL = 24 * 60 * 60  # One day in seconds
+DEFAULT_MAX_ENTRIES = 1024  # Entries kept in memory
+DEFAULT_MAX_DISK_ENTRIES = 50000  # Entries kept in the SQLite file
+ACCESS_FLUSH_SIZE = 64  # Queued disk hits written back in one transaction
+
+
+class LookupCache:
+    """
+    Key/value cache with per-entry TTL, LRU eviction and an optional disk tier.
+
+    Values are stored as strings. A ttl of None means entries never expire.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: Optional[float] = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_disk_entries: int = DEFAULT_MAX_DISK_ENTRIES,
+        namespace: str = "default"
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            path: Path of the SQLite file. If None, the cache is memory-only.
+            ttl: Default time-to-live in seconds, or None for no expiry
+            max_entries: Maximum number of entries held in memory
+            max_disk_entries: Maximum number of entries held on disk
+            namespace: Name separating independent caches in the same file
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+
+        self._memory: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()  # Guards the memory tier and the counters
+        self._db_lock = threading.Lock()  # Guards the SQLite connection and the queues below
+        self._touched: Dict[str, float] = {}  # Disk hits whose access time is not written yet
+        self._expired: Set[str] = set()  # Expired disk rows not deleted yet
+        self._db = None
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL,"
+                " accessed_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS cache_accessed ON cache (namespace, accessed_at)"
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or None if missing or expired
+        """
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is not None:
+            return value
+        return self._get_disk(key, now)
+
+    async def get_async(self, key: str) -> Optional[str]:
+        """
+        Look up a value without blocking the event loop.
+
+        Memory hits are answered directly, the disk tier is read in a worker thread.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or None if missing or expired
+        """
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is not None:
+            return value
+        if self._db is None:
+            return self._get_disk(key, now)  # Only counts the miss
+        return await asyncio.to_thread(self._get_disk, key, now)
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Time-to-live in seconds, overriding the cache default
+        """
+        now = time.time()
+        expires_at = self._set_memory(key, value, ttl, now)
+        self._set_disk(key, value, expires_at, now)
+
+    async def set_async(self, key: str, value: str, ttl: Optional[float] = None):
+        """
+        Store a value, writing the disk tier in a worker thread.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Time-to-live in seconds, overriding the cache default
+        """
+        now = time.time()
+        expires_at = self._set_memory(key, value, ttl, now)
+        if self._db is not None:
+            await asyncio.to_thread(self._set_disk, key, value, expires_at, now)
+
+    def delete(self, key: str):
+        """Remove a single entry from both tiers."""
+        with self._lock:
+            self._memory.pop(key, None)
+        self._delete_disk(key)
+
+    async def delete_async(self, key: str):
+        """Remove a single entry, deleting the disk row in a worker thread."""
+        with self._lock:
+            self._memory.pop(key, None)
+        if self._db is not None:
+            await asyncio.to_thread(self._delete_disk, key)
+
+    def clear(self):
+        """Remove all entries of this namespace and reset the counters."""
+        with self._lock:
+            self._memory.clear()
+            self.hits = 0
+            self.misses = 0
+        with self._db_lock:
+            if self._db is not None:
+                self._touched.clear()
+                self._expired.clear()
+                self._db.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+                self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hit, miss and size counters
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory)
+            }
+
+    def close(self):
+        """Write pending access times and close the SQLite connection."""
+        with self._db_lock:
+            if self._db is not None:
+                self._flush_access()
+                self._db.commit()
+                self._db.close()
+                self._db = None
+
+    def _get_memory(self, key: str, now: float) -> Optional[str]:
+        """Look up the memory tier, counting hits only."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is None or expires_at > now:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._memory[key]
+            return None
+
+    def _get_disk(self, key: str, now: float) -> Optional[str]:
+        """
+        Look up the disk tier after a memory miss, counting the hit or miss.
+
+        The access time of a hit is only queued; it is written with the next
+        write or once ACCESS_FLUSH_SIZE hits have accumulated, so reads do not
+        commit. Expired rows are deleted the same way.
+        """
+        value = None
+        expires_at = None
+        with self._db_lock:
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                ).fetchone()
+                if row is not None:
+                    if row[1] is None or row[1] > now:
+                        value, expires_at = row
+                        self._touched[key] = now
+                    else:
+                        self._expired.add(key)
+                    if len(self._touched) + len(self._expired) >= ACCESS_FLUSH_SIZE:
+                        self._flush_access()
+                        self._db.commit()
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self._remember(key, value, expires_at)
+            self.hits += 1
+            return value
+
+    def _set_memory(self, key: str, value: str, ttl: Optional[float], now: float) -> Optional[float]:
+        """Store a value in the memory tier and return its expiry time."""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._remember(key, value, expires_at)
+        return expires_at
+
+    def _set_disk(self, key: str, value: str, expires_at: Optional[float], now: float):
+        """Store a value in the disk tier together with the pending access times."""
+        with self._db_lock:
+            if self._db is None:
+                return
+            self._expired.discard(key)
+            self._touched.pop(key, None)
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, value, expires_at, now)
+            )
+            self._flush_access()
+            self._evict_disk()
+            self._db.commit()
+
+    def _delete_disk(self, key: str):
+        """Remove a single entry from the disk tier."""
+        with self._db_lock:
+            if self._db is not None:
+                self._touched.pop(key, None)
+                self._db.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                )
+                self._db.commit()
+
+    def _flush_access(self):
+        """Write queued access times and expired-row deletions, without committing."""
+        if self._touched:
+            self._db.executemany(
+                "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                [(accessed_at, self.namespace, key) for key, accessed_at in self._touched.items()]
+            )
+            self._touched.clear()
+        if self._expired:
+            # Rows stored again in the meantime are not expired any more
+            self._db.executemany(
+                "DELETE FROM cache WHERE namespace = ? AND key = ? AND expires_at <= ?",
+                [(self.namespace, key, time.time()) for key in self._expired]
+            )
+            self._expired.clear()
+
+    def _remember(self, key: str, value: str, expires_at: Optional[float]):
+        """Put an entry into the memory tier, evicting the least recently used."""
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        """Drop the least recently used disk entries above the size limit."""
+        count = self._db.execute(
+            "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM cache WHERE rowid IN ("
+                " SELECT rowid FROM cache WHERE namespace = ?"
+                " ORDER BY accessed_at LIMIT ?)",
+                (self.namespace, excess)
+            )
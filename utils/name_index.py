@@ -0,0 +1,257 @@
+"""
+utils/name_index.py - Phonetic and trigram index for resolving name variants
+
+Swiss names are often requested in another spelling than the one on record:
+Müller/Mueller/Muller, Schärer/Schaerer, Meier/Meyer, or double last names in
+either order. This index holds the known spellings, e.g. the residents of a
+register snapshot and people verified earlier, under their Kölner Phonetik
+codes and their character trigrams. A misspelled request is resolved to the
+known spelling in one step, and the corrected name is looked up again instead
+of escalating the person to the agents.
+"""
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from thefuzz import fuzz
+
+from utils.address_source import AddressSource
+from utils.candidate_ranking import transliterate
+from utils.register_source import RegisterSource
+
+PHONETIC_MIN_SCORE = 70  # Minimum similarity of a candidate with the same phonetic code
+FUZZY_MIN_SCORE = 90  # Minimum similarity of any other candidate
+MIN_TRIGRAM_SIMILARITY = 0.5  # Dice coefficient a trigram candidate needs to be scored
+
+# Kölner Phonetik codes of the letters without context rules
+_PHONETIC_CODES = {
+    **dict.fromkeys("aeijouy", "0"),
+    "b": "1",
+    **dict.fromkeys("fvw", "3"),
+    **dict.fromkeys("gkq", "4"),
+    "l": "5",
+    **dict.fromkeys("mn", "6"),
+    "r": "7",
+    **dict.fromkeys("sz", "8")
+}
+
+
+def cologne_phonetic(word: str) -> str:
+    """
+    Compute the Kölner Phonetik code of a word.
+
+    Words that sound alike in German get the same code, e.g. "Meier",
+    "Meyer" and "Mayr" all become "67".
+
+    Args:
+        word: Single word, umlauts may be spelled out or not
+
+    Returns:
+        Code of digits, empty for words without letters
+    """
+    letters = [c for c in transliterate(word) if "a" <= c <= "z"]
+    codes = []
+    for i, letter in enumerate(letters):
+        before = letters[i - 1] if i > 0 else ""
+        after = letters[i + 1] if i + 1 < len(letters) else ""
+
+        if letter == "h":
+            continue
+        elif letter == "p":
+            code = "3" if after == "h" else "1"
+        elif letter in "dt":
+            code = "8" if after in ("c", "s", "z") else "2"
+        elif letter == "c":
+            if i == 0:
+                code = "4" if after in "ahkloqrux" else "8"
+            elif before in ("s", "z"):
+                code = "8"
+            else:
+                code = "4" if after in "ahkoqux" else "8"
+        elif letter == "x":
+            code = "8" if before in ("c", "k", "q") else "48"
+        else:
+            code = _PHONETIC_CODES.get(letter, "")
+        codes.append(code)
+
+    # Collapse repeated codes, then drop vowels except at the start
+    collapsed = []
+    for code in "".join(codes):
+        if not collapsed or collapsed[-1] != code:
+            collapsed.append(code)
+    return "".join(code for i, code in enumerate(collapsed) if code != "0" or i == 0)
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalize a full name to transliterated tokens in sorted order.
+
+    Commas and hyphens separate tokens, so "Meier-Müller, Anna" and
+    "Anna Mueller Meier" normalize to the same text.
+
+    Args:
+        name: Full name in any order
+
+    Returns:
+        Normalized name
+    """
+    return " ".join(sorted(transliterate(name.replace(",", " ").replace("-", " ")).split()))
+
+
+def _phonetic_key(normalized: str) -> Tuple[str, ...]:
+    """Phonetic codes of the tokens of a normalized name, in sorted order."""
+    return tuple(sorted(cologne_phonetic(token) for token in normalized.split()))
+
+
+def _trigrams(normalized: str) -> Set[str]:
+    """Character trigrams of a normalized name, padded at word boundaries."""
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class IndexedName:
+    """A known spelling of a person's name."""
+    firstname: str
+    lastname: str
+    location: str  # Transliterated municipality, empty if unknown
+    normalized: str
+
+    @property
+    def full_name(self) -> str:
+        """Get the known spelling, e.g. 'Hans Meier'"""
+        return f"{self.firstname} {self.lastname}"
+
+
+@dataclass
+class NameMatch:
+    """Result of resolving a requested name against the index."""
+    name: IndexedName
+    score: int  # Similarity of the requested and the known spelling, 0-100
+    exact: bool  # Whether the request already uses the known spelling
+
+
+class NameIndex:
+    """
+    In-memory index of known name spellings.
+
+    Names are stored once per municipality and can be added at any time,
+    e.g. whenever a lookup confirms a spelling.
+    """
+
+    def __init__(self):
+        """Create an empty index."""
+        self._names: List[IndexedName] = []
+        self._trigram_counts: List[int] = []
+        self._ids: Dict[Tuple[str, str], int] = {}
+        self._phonetic: Dict[Tuple[str, ...], List[int]] = defaultdict(list)
+        self._trigrams: Dict[str, List[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, firstname: str, lastname: str, location: str = ""):
+        """
+        Add a known spelling.
+
+        Args:
+            firstname: First name as on record
+            lastname: Last name as on record
+            location: Municipality the person lives in
+        """
+        normalized = normalize_name(f"{firstname} {lastname}")
+        key = (transliterate(location), normalized)
+        if not normalized or key in self._ids:
+            return
+
+        name_id = len(self._names)
+        self._names.append(IndexedName(firstname.strip(), lastname.strip(), key[0], normalized))
+        self._ids[key] = name_id
+        self._phonetic[_phonetic_key(normalized)].append(name_id)
+        trigrams = _trigrams(normalized)
+        self._trigram_counts.append(len(trigrams))
+        for trigram in trigrams:
+            self._trigrams[trigram].append(name_id)
+
+    def add_register(self, source: RegisterSource):
+        """
+        Add all residents of a register snapshot.
+
+        Args:
+            source: Opened register source
+        """
+        for location, entry in source.iter_residents():
+            self.add(entry.firstname, entry.name, location)
+
+    def _candidates(self, normalized: str, location: str) -> Dict[int, bool]:
+        """Find names sharing the phonetic key or enough trigrams, flagged by phonetic equality."""
+        candidates = {name_id: True for name_id in self._phonetic.get(_phonetic_key(normalized), [])}
+
+        trigrams = _trigrams(normalized)
+        shared = Counter(name_id for trigram in trigrams for name_id in self._trigrams.get(trigram, []))
+        for name_id, count in shared.items():
+            if 2 * count / (len(trigrams) + self._trigram_counts[name_id]) >= MIN_TRIGRAM_SIMILARITY:
+                candidates.setdefault(name_id, False)
+
+        return {
+            name_id: phonetic for name_id, phonetic in candidates.items()
+            if not location or not self._names[name_id].location or self._names[name_id].location == location
+        }
+
+    def resolve(self, name: str, location: str = "") -> Optional[NameMatch]:
+        """
+        Resolve a requested name to its known spelling.
+
+        Args:
+            name: Requested name in any order and spelling
+            location: Municipality to search within; empty searches all
+
+        Returns:
+            The known spelling, or None if no spelling is similar enough or
+            several different names are equally similar
+        """
+        normalized = normalize_name(name)
+        location = transliterate(location)
+
+        for key in ((location, normalized), ("", normalized)):
+            if key in self._ids:
+                return NameMatch(name=self._names[self._ids[key]], score=100, exact=True)
+
+        scored = []
+        for name_id, phonetic in self._candidates(normalized, location).items():
+            score = fuzz.token_sort_ratio(normalized, self._names[name_id].normalized)
+            if score >= (PHONETIC_MIN_SCORE if phonetic else FUZZY_MIN_SCORE):
+                scored.append((phonetic, score, name_id))
+        if not scored:
+            return None
+
+        scored.sort(reverse=True)
+        best_phonetic, best_score, best_id = scored[0]
+        best = self._names[best_id]
+        for phonetic, score, name_id in scored[1:]:
+            if (phonetic, score) != (best_phonetic, best_score):
+                break
+            if self._names[name_id].normalized != best.normalized:
+                return None  # Ambiguous, e.g. "Meier" between "Meyer" and "Maier"
+        return NameMatch(name=best, score=best_score, exact=False)
+
+
+def create_name_index(source: Optional[AddressSource] = None) -> NameIndex:
+    """
+    Create the name index for an address source.
+
+    A register source contributes all its residents; other sources start
+    with an empty index that learns from verified lookups.
+
+    Args:
+        source: Address source the corrected names are looked up in
+
+    Returns:
+        New name index
+    """
+    index = NameIndex()
+    if isinstance(source, RegisterSource):
+        index.add_register(source)
+        print(f"DEBUG: Indexed {len(index)} register names for spelling variants")
+    return index
@@ -0,0 +1,220 @@
+"""
+utils/people_import.py - Import of requested people from text, CSV and XLSX
+
+People lists are read row by row: CSV files with the csv module and XLSX
+files with openpyxl in read-only mode, so large spreadsheets are never loaded
+into memory as a whole. Names are normalized from "Lastname, Firstname" or
+"Firstname Lastname" and duplicates are dropped by their normalized name key.
+"""
+
+import csv
+import os
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from openpyxl import load_workbook
+
+from models.core import Person, PersonType, name_key
+
+# Header names recognized in the first row, compared case-insensitively
+FIRSTNAME_HEADERS = {"firstname", "first name", "first_name", "vorname", "prénom", "prenom"}
+LASTNAME_HEADERS = {"lastname", "last name", "last_name", "surname", "nachname", "familienname", "nom"}
+FULLNAME_HEADERS = {"name", "full name", "fullname", "full_name", "person"}
+
+CSV_DELIMITERS = ",;\t"
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx")
+
+
+def parse_name(text: str) -> Tuple[str, str]:
+    """
+    Split a full name into first name and last name.
+
+    Args:
+        text: Name as "Lastname, Firstname" or "Firstname Lastname"
+
+    Returns:
+        Tuple of (firstname, lastname)
+
+    Raises:
+        ValueError: If the name does not have at least two parts
+    """
+    text = " ".join(text.split())
+    if "," in text:
+        lastname, firstname = [part.strip() for part in text.split(",", 1)]
+    else:
+        parts = text.split(" ")
+        if len(parts) < 2:
+            raise ValueError(f"Name needs at least two parts: {text}")
+        firstname = parts[0]
+        lastname = " ".join(parts[1:])
+
+    if not firstname or not lastname:
+        raise ValueError(f"Name needs at least two parts: {text}")
+    return firstname, lastname
+
+
+def _cell(value) -> str:
+    """Convert a cell value to stripped text."""
+    return "" if value is None else str(value).strip()
+
+
+def _find_column(header: Sequence[str], names: set) -> Optional[int]:
+    """Get the index of the first header cell matching one of the names."""
+    for index, cell in enumerate(header):
+        if cell.casefold() in names:
+            return index
+    return None
+
+
+def iter_people_rows(
+    rows: Iterable[Sequence],
+    skipped: Optional[List[str]] = None
+) -> Iterator[Person]:
+    """
+    Convert table rows into requested people, dropping duplicates.
+
+    If the first row is a header with first and last name columns (e.g.
+    "Vorname" and "Nachname"), those columns are used. A header with a single
+    name column holds full names. Without a header, every row must hold one
+    full name; rows with several values are reported as invalid, since the
+    column order cannot be known.
+
+    Args:
+        rows: Table rows, e.g. from a CSV reader or an openpyxl sheet
+        skipped: Optional list receiving a message for every invalid row
+
+    Yields:
+        One Person per distinct name, in input order
+
+    Raises:
+        ValueError: If the first row has several values but no recognized header
+    """
+    seen = set()
+    first_col = last_col = full_col = None
+    header_checked = False
+
+    for number, row in enumerate(rows, start=1):
+        cells = [_cell(value) for value in row]
+        if not any(cells):
+            continue
+
+        if not header_checked:
+            header_checked = True
+            first_col = _find_column(cells, FIRSTNAME_HEADERS)
+            last_col = _find_column(cells, LASTNAME_HEADERS)
+            full_col = _find_column(cells, FULLNAME_HEADERS)
+            if first_col is not None and last_col is None and full_col is not None:
+                # "Name" next to "Vorname" is the last name
+                last_col, full_col = full_col, None
+            if first_col is not None or last_col is not None or full_col is not None:
+                continue
+            values = [cell for cell in cells if cell]
+            if len(values) > 1:
+                raise ValueError(
+                    f"Unrecognized header: {', '.join(values)}. Expected a full name column "
+                    "(e.g. Name) or first and last name columns (e.g. Vorname, Nachname)"
+                )
+
+        try:
+            if first_col is not None and last_col is not None:
+                firstname = cells[first_col] if first_col < len(cells) else ""
+                lastname = cells[last_col] if last_col < len(cells) else ""
+                if not firstname or not lastname:
+                    raise ValueError("First name and last name are required")
+            elif full_col is not None:
+                firstname, lastname = parse_name(cells[full_col] if full_col < len(cells) else "")
+            else:
+                values = [cell for cell in cells if cell]
+                if len(values) > 1:
+                    raise ValueError("Several values without a header, expected one full name")
+                firstname, lastname = parse_name(values[0])
+        except ValueError as e:
+            if skipped is not None:
+                skipped.append(f"Row {number}: {str(e)}")
+            continue
+
+        key = name_key(firstname, lastname)
+        if key in seen:
+            continue
+        seen.add(key)
+        yield Person(firstname=firstname, lastname=lastname, type=PersonType.REQUESTED)
+
+
+def iter_csv_rows(path: str) -> Iterator[List[str]]:
+    """Read the rows of a CSV file, detecting the delimiter."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=CSV_DELIMITERS)
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.reader(f, dialect)
+
+
+def _iter_xlsx(path: str) -> Iterator[tuple]:
+    """Read the rows of the first sheet of an XLSX file in read-only mode."""
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def iter_people_file(path: str, skipped: Optional[List[str]] = None) -> Iterator[Person]:
+    """
+    Stream the requested people from a CSV or XLSX file.
+
+    Args:
+        path: Path of the file
+        skipped: Optional list receiving a message for every invalid row
+
+    Yields:
+        One Person per distinct name, in file order
+
+    Raises:
+        ValueError: If the file type is not supported
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        rows = iter_csv_rows(path)
+    elif extension == ".xlsx":
+        rows = _iter_xlsx(path)
+    else:
+        raise ValueError(f"Unsupported file type {extension}, expected one of {', '.join(SUPPORTED_EXTENSIONS)}")
+
+    yield from iter_people_rows(rows, skipped)
+
+
+def parse_people_text(text: str) -> List[Person]:
+    """
+    Parse a people list with one name per line.
+
+    Handles both "Firstname Lastname" and "Lastname, Firstname" formats and
+    drops duplicate names.
+
+    Args:
+        text: People list, one person per line
+
+    Returns:
+        List of requested people
+
+    Raises:
+        ValueError: If a line is not a valid name
+    """
+    people = []
+    seen = set()
+    for line in text.strip().split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            firstname, lastname = parse_name(line)
+        except ValueError:
+            raise ValueError(f"Invalid format for person: {line}")
+
+        key = name_key(firstname, lastname)
+        if key not in seen:
+            seen.add(key)
+            people.append(Person(firstname=firstname, lastname=lastname, type=PersonType.REQUESTED))
+    return people
@@ -0,0 +1,82 @@
+"""
+utils/rate_limiter.py - Token bucket rate limiter for outgoing API calls
+
+The bucket hands out reservations under a thread lock, so a single limiter
+can be shared between threads and event loops without binding to either.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Token bucket allowing a sustained request rate with short bursts.
+
+    Tokens may go negative: each caller reserves a token immediately and then
+    waits until the bucket has refilled far enough to cover its reservation.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate: Tokens added per second. A rate <= 0 disables limiting.
+            capacity: Maximum burst size. Defaults to one second worth of tokens.
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """
+        Take one token and return how long the caller has to wait for it.
+
+        Returns:
+            Wait time in seconds, 0 if a token was available
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def _release(self):
+        """Give back a reserved token that will not be used."""
+        if self.rate <= 0:
+            return
+
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + 1)
+
+    async def acquire(self):
+        """
+        Wait asynchronously until a token is available.
+
+        If the wait is cancelled, e.g. by a deadline, the reservation is
+        returned so later callers do not wait for a request never sent.
+        """
+        wait = self._reserve()
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self._release()
+                raise
+
+    def acquire_sync(self):
+        """Block until a token is available."""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
@@ -0,0 +1,316 @@
+"""
+utils/register_source.py - Address source backed by a resident register snapshot
+
+A register export (CSV or Parquet) is converted once into a sorted index file
+keyed by municipality and normalized name. The index is memory-mapped and
+searched by binary search, so a lookup reads a handful of pages and takes
+microseconds without a network hop, even for municipalities with tens of
+thousands of residents. The index is rebuilt whenever the snapshot is newer.
+
+Index layout: the magic bytes, the record count and a table of record
+offsets (little-endian uint64), followed by the records sorted by key. Each
+record is one UTF-8 line "key<TAB>firstname<TAB>lastname<TAB>street<TAB>
+streetno<TAB>zip<TAB>city".
+"""
+
+import mmap
+import os
+import struct
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+from models.core import AddressEntry
+from utils.address_source import AddressSource
+from utils.atom_feed import render_feed
+from utils.candidate_ranking import transliterate
+from utils.people_import import iter_csv_rows
+
+INDEX_MAGIC = b"ADDRIDX1"
+_COUNT = struct.Struct("<Q")
+_OFFSET = struct.Struct("<Q")
+_HEADER_SIZE = len(INDEX_MAGIC) + _COUNT.size
+
+# Snapshot column names by field, compared case-insensitively
+COLUMN_ALIASES = {
+    "firstname": {"firstname", "first name", "first_name", "vorname"},
+    "lastname": {"lastname", "last name", "last_name", "name", "nachname"},
+    "street": {"street", "strasse", "straße"},
+    "streetno": {"streetno", "street no", "house number", "hausnummer", "nr"},
+    "zip": {"zip", "plz", "postal code", "postleitzahl"},
+    "city": {"city", "ort"},
+    "municipality": {"municipality", "gemeinde"}
+}
+RECORD_FIELDS = ("firstname", "lastname", "street", "streetno", "zip", "city")
+
+
+def name_index_key(name: str) -> str:
+    """
+    Normalize a name for the index, independent of spelling and order.
+
+    "Meier, Hans", "hans meier" and "Hans  Meier" map to the same key, as do
+    "Müller" and "Mueller".
+
+    Args:
+        name: Full name in any order
+
+    Returns:
+        Transliterated name tokens in sorted order
+    """
+    return " ".join(sorted(transliterate(name.replace(",", " ")).split()))
+
+
+def index_key(name: str, location: str) -> bytes:
+    """Build the index key of a name in a municipality."""
+    return f"{transliterate(location)}|{name_index_key(name)}".encode("utf-8")
+
+
+def _iter_parquet(path: str) -> Iterator[Sequence]:
+    """Read the rows of a Parquet file batch by batch, header first."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Reading Parquet snapshots requires pyarrow")
+
+    parquet = pq.ParquetFile(path)
+    yield parquet.schema_arrow.names
+    for batch in parquet.iter_batches():
+        yield from zip(*(column.to_pylist() for column in batch.columns))
+
+
+def _columns(header: Sequence) -> Dict[str, int]:
+    """Map the snapshot header to field indices."""
+    columns = {}
+    for index, cell in enumerate(header):
+        cell = str(cell or "").strip().casefold()
+        for field, aliases in COLUMN_ALIASES.items():
+            if cell in aliases and field not in columns:
+                columns[field] = index
+    return columns
+
+
+def _clean(value) -> str:
+    """Convert a cell to text that fits into a single record field."""
+    return " ".join(str(value).split()) if value is not None else ""
+
+
+def build_index(snapshot_path: str, index_path: str) -> int:
+    """
+    Convert a register snapshot into an index file.
+
+    Args:
+        snapshot_path: CSV or Parquet export with a header row
+        index_path: Path of the index file to write
+
+    Returns:
+        Number of indexed residents
+
+    Raises:
+        ValueError: If the snapshot type is unsupported or required columns are missing
+    """
+    extension = os.path.splitext(snapshot_path)[1].lower()
+    if extension == ".csv":
+        rows = iter_csv_rows(snapshot_path)
+    elif extension == ".parquet":
+        rows = _iter_parquet(snapshot_path)
+    else:
+        raise ValueError(f"Unsupported snapshot type {extension}, expected .csv or .parquet")
+
+    columns = _columns(next(rows, []))
+    missing = [field for field in ("firstname", "lastname") if field not in columns]
+    if "municipality" not in columns and "city" not in columns:
+        missing.append("municipality")
+    if missing:
+        raise ValueError(f"Snapshot is missing columns: {', '.join(missing)}")
+
+    records = set()
+    for row in rows:
+        values = {
+            field: _clean(row[index]) if index < len(row) else ""
+            for field, index in columns.items()
+        }
+        if not values["firstname"] or not values["lastname"]:
+            continue
+        municipality = values.get("municipality") or values.get("city", "")
+        key = index_key(f"{values['firstname']} {values['lastname']}", municipality)
+        fields = "\t".join(values.get(field, "") for field in RECORD_FIELDS)
+        records.add(key + b"\t" + fields.encode("utf-8") + b"\n")
+
+    ordered = sorted(records)
+    offset = _HEADER_SIZE + _OFFSET.size * len(ordered)
+    offsets = []
+    for record in ordered:
+        offsets.append(_OFFSET.pack(offset))
+        offset += len(record)
+
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+    temp_path = f"{index_path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(INDEX_MAGIC)
+        f.write(_COUNT.pack(len(ordered)))
+        f.writelines(offsets)
+        f.writelines(ordered)
+    os.replace(temp_path, index_path)
+
+    print(f"DEBUG: Indexed {len(ordered)} residents from {snapshot_path}")
+    return len(ordered)
+
+
+class RegisterSource(AddressSource):
+    """
+    Address source answering lookups from a memory-mapped register index.
+
+    Names are matched exactly after normalization (see name_index_key);
+    spelling variants beyond umlauts, case and order are not resolved here.
+    """
+
+    cacheable = False  # Answers faster than the cache
+
+    def __init__(self, index_path: str):
+        """
+        Open an index built by build_index.
+
+        Args:
+            index_path: Path of the index file
+
+        Raises:
+            ValueError: If the file is not a register index
+        """
+        self.index_path = index_path
+        self._file = open(index_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            self.close()
+            raise ValueError(f"Not a register index: {index_path}")
+        self.count = _COUNT.unpack_from(self._map, len(INDEX_MAGIC))[0]
+
+    @classmethod
+    def from_snapshot(cls, snapshot_path: str, index_path: Optional[str] = None) -> "RegisterSource":
+        """
+        Open the index of a snapshot, building it if missing or outdated.
+
+        Args:
+            snapshot_path: CSV or Parquet export of the register
+            index_path: Path of the index file. Defaults to the snapshot path with ".idx".
+
+        Returns:
+            Source reading the index
+        """
+        if index_path is None:
+            index_path = f"{snapshot_path}.idx"
+        if not os.path.exists(index_path) or os.path.getmtime(index_path) < os.path.getmtime(snapshot_path):
+            build_index(snapshot_path, index_path)
+        return cls(index_path)
+
+    def close(self):
+        """Release the memory map and the file."""
+        self._map.close()
+        self._file.close()
+
+    def _record_start(self, position: int) -> int:
+        """Get the file offset of the record at a position."""
+        return _OFFSET.unpack_from(self._map, _HEADER_SIZE + _OFFSET.size * position)[0]
+
+    def _key(self, position: int) -> bytes:
+        """Read the key of the record at a position."""
+        start = self._record_start(position)
+        return self._map[start:self._map.find(b"\t", start)]
+
+    def _entry(self, position: int) -> AddressEntry:
+        """Read the record at a position as an entry."""
+        start = self._record_start(position)
+        line = self._map[start:self._map.find(b"\n", start)].decode("utf-8")
+        values = dict(zip(RECORD_FIELDS, line.split("\t")[1:]))
+        return AddressEntry(
+            title=f"{values['lastname']}, {values['firstname']}",
+            name=values["lastname"],
+            firstname=values["firstname"],
+            street=values["street"],
+            streetno=values["streetno"],
+            zip=values["zip"],
+            city=values["city"]
+        )
+
+    def iter_residents(self) -> Iterator[Tuple[str, AddressEntry]]:
+        """
+        Read all residents in index order.
+
+        Yields:
+            Tuple of (transliterated municipality, entry)
+        """
+        for position in range(self.count):
+            location = self._key(position).split(b"|", 1)[0].decode("utf-8")
+            yield location, self._entry(position)
+
+    def lookup(self, name: str, location: str) -> List[AddressEntry]:
+        """
+        Find all residents of a municipality with the given name.
+
+        Args:
+            name: Full name in any order
+            location: Municipality
+
+        Returns:
+            Matching entries, empty if nobody was found
+        """
+        target = index_key(name, location)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+
+        entries = []
+        while low < self.count and self._key(low) == target:
+            entries.append(self._entry(low))
+            low += 1
+        return entries
+
+    def fetch_feed(self, name: str, location: str) -> str:
+        """
+        Look up a person in the register.
+
+        Args:
+            name: Name of the person to search for
+            location: Municipality to search within
+
+        Returns:
+            Atom feed XML with the matching residents
+        """
+        entries = self.lookup(name, location)
+        print(f"DEBUG: Register lookup for '{name}' in '{location}' found {len(entries)} entries")
+        return render_feed(entries)
+
+    async def fetch_feed_async(self, name: str, location: str) -> str:
+        """
+        Look up a person in the register.
+
+        The lookup takes microseconds, so it runs directly on the event loop.
+
+        Args:
+            name: Name of the person to search for
+            location: Municipality to search within
+
+        Returns:
+            Atom feed XML with the matching residents
+        """
+        return self.fetch_feed(name, location)
+
+
+def create_register_source() -> RegisterSource:
+    """
+    Create the register source configured by environment variables.
+
+    REGISTER_SNAPSHOT_PATH sets the register export and REGISTER_INDEX_PATH
+    optionally the index file.
+
+    Raises:
+        ValueError: If no snapshot is configured
+    """
+    load_dotenv()
+    snapshot_path = os.environ.get("REGISTER_SNAPSHOT_PATH", "")
+    if not snapshot_path:
+        raise ValueError("ADDRESS_SOURCE=register requires REGISTER_SNAPSHOT_PATH")
+    return RegisterSource.from_snapshot(snapshot_path, os.environ.get("REGISTER_INDEX_PATH") or None)
@@ -2,20 +2,40 @@
 utils/semantic_kernel_setup.py - Sets up and configures Semantic Kernel with Azure OpenAI
 
 This module provides functionality to create and configure a Semantic Kernel instance
-with Azure OpenAI chat completion capabilities.
+with Azure OpenAI chat completion capabilities. Chat completion services are built
+once per deployment and shared, so their HTTP connections to Azure OpenAI are reused.
 """
 
 import os
+import threading
+from typing import Dict, Optional, Tuple
 from dotenv import load_dotenv
 from semantic_kernel import Kernel
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
 
-def create_kernel() -> Kernel:
+# Chat completion services keyed by (endpoint, deployment)
+_services: Dict[Tuple[str, str], AzureChatCompletion] = {}
+_services_lock = threading.Lock()
+
+def _get_setting(name: str) -> str:
+    """Read an environment variable and strip whitespace and quotation marks."""
+    value = os.environ.get(name, "")
+    if value:
+        value = value.strip().strip('"\'')
+    return value
+
+def get_chat_service(deployment: Optional[str] = None) -> AzureChatCompletion:
     """
-    Creates and returns a Semantic Kernel instance configured to use Azure OpenAI chat completion.
+    Returns the shared Azure OpenAI chat completion service for a deployment.
+    
+    The service is created on first use and reused afterwards, so every kernel
+    using the same deployment shares one HTTP connection pool.
     
+    Args:
+        deployment: Deployment name. Defaults to AZURE_OPENAI_DEPLOYMENT.
+        
     Returns:
-        Configured Semantic Kernel instance
+        AzureChatCompletion service for the deployment
         
     Raises:
         ValueError: If required environment variables are missing or invalid
@@ -23,18 +43,9 @@ def create_kernel() -> Kernel:
     # Load environment variables from .env file
     load_dotenv(override=True)
     
-    # Get environment variables and strip any quotation marks
-    endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT", "")
-    if endpoint:
-        endpoint = endpoint.strip().strip('"\'')
-    
-    api_key = os.environ.get("AZURE_OPENAI_KEY", "")
-    if api_key:
-        api_key = api_key.strip().strip('"\'')
-    
-    deployment = os.environ.get("AZURE_OPENAI_DEPLOYMENT", "")
-    if deployment:
-        deployment = deployment.strip().strip('"\'')
+    endpoint = _get_setting("AZURE_OPENAI_ENDPOINT")
+    api_key = _get_setting("AZURE_OPENAI_KEY")
+    deployment = deployment or _get_setting("AZURE_OPENAI_DEPLOYMENT")
     
     # Check if values are placeholders
     if "<YOUR-RESOURCE-NAME>" in endpoint:
@@ -52,20 +63,72 @@ def create_kernel() -> Kernel:
     
     # Remove any trailing slashes from the endpoint
     endpoint = endpoint.rstrip('/')
+    key = (endpoint, deployment)
+    
+    with _services_lock:
+        service = _services.get(key)
+        if service is not None:
+            return service
+        
+        # Debug output
+        print(f"Using Azure OpenAI endpoint: {endpoint}")
+        print(f"Using Azure OpenAI deployment: {deployment}")
+        
+        try:
+            service = AzureChatCompletion(
+                deployment_name=deployment,
+                endpoint=endpoint,
+                api_key=api_key
+            )
+        except Exception as e:
+            print(f"Error initializing Azure OpenAI service: {str(e)}")
+            raise
+        
+        _services[key] = service
+        return service
+
+def get_reasoning_service() -> AzureChatCompletion:
+    """
+    Returns the shared chat completion service for document generation.
+    
+    Uses AZURE_OPENAI_REASONING_DEPLOYMENT and falls back to
+    AZURE_OPENAI_DEPLOYMENT if no reasoning deployment is configured.
+    """
+    load_dotenv(override=True)
+    return get_chat_service(_get_setting("AZURE_OPENAI_REASONING_DEPLOYMENT") or None)
+
+def create_kernel(deployment: Optional[str] = None) -> Kernel:
+    """
+    Creates and returns a Semantic Kernel instance configured to use Azure OpenAI chat completion.
     
-    # Debug output
-    print(f"Using Azure OpenAI endpoint: {endpoint}")
-    print(f"Using Azure OpenAI deployment: {deployment}")
+    Args:
+        deployment: Deployment name. Defaults to AZURE_OPENAI_DEPLOYMENT.
     
+    Returns:
+        Configured Semantic Kernel instance using the shared chat service
+        
+    Raises:
+        ValueError: If required environment variables are missing or invalid
+    """
     kernel = Kernel()
-    try:
-        service = AzureChatCompletion(
-            deployment_name=deployment,
-            endpoint=endpoint,
-            api_key=api_key
-        )
-        kernel.add_service(service)
-        return kernel
-    except Exception as e:
-        print(f"Error initializing Azure OpenAI service: {str(e)}")
-        raise
\ No newline at end of file
+    kernel.add_service(get_chat_service(deployment))
+    return kernel
+
+def create_job_kernel(base_kernel: Kernel) -> Kernel:
+    """
+    Creates a lightweight kernel for a single job that shares the AI services
+    of a prebuilt base kernel.
+    
+    Plugins holding per-job state can be added to the returned kernel without
+    affecting other jobs running on the same base kernel.
+    
+    Args:
+        base_kernel: Kernel whose services (and their HTTP clients) are reused
+        
+    Returns:
+        New Kernel instance with the same services and a copy of the plugins
+    """
+    return Kernel(
+        services=dict(base_kernel.services),
+        plugins=dict(base_kernel.plugins)
+    )
@@ -0,0 +1,115 @@
+"""
+utils/template_renderer.py - Local rendering of document templates
+
+This module fills the {placeholder} fields of the document templates directly
+from a DocumentContext. Rendering is deterministic and needs no LLM call, so
+the same input always produces the same document.
+"""
+
+import re
+from datetime import date
+from typing import Dict, List, Optional, Set
+
+from models.core import DocumentContext, Person
+
+PLACEHOLDER_PATTERN = re.compile(r"\{(\w+)\}")
+DATE_FORMAT = "%d.%m.%Y"  # Matches the date pattern replaced by ExportService
+ADDRESS_NOT_AVAILABLE = "[ADDRESS NOT AVAILABLE]"
+LIST_INDENT = "   "  # Nests the numbered list under the surrounding list item
+
+
+def template_placeholders(template: str) -> Set[str]:
+    """
+    Get the names of all placeholders used in a template.
+
+    Args:
+        template: Template text with {placeholder} fields
+
+    Returns:
+        Set of placeholder names
+    """
+    return set(PLACEHOLDER_PATTERN.findall(template))
+
+
+def format_person(person: Person) -> str:
+    """Format a person as "Firstname Lastname, Street No, ZIP City"."""
+    return f"{person.full_name}, {person.full_address or ADDRESS_NOT_AVAILABLE}"
+
+
+def format_address_list(people: List[Person]) -> str:
+    """
+    Format the requested people for the {address_list} placeholder.
+
+    A single person is written inline, several people as a numbered list.
+
+    Args:
+        people: Requested people in document order
+
+    Returns:
+        Markdown text for the address list
+    """
+    if not people:
+        return "none"
+    if len(people) == 1:
+        return format_person(people[0])
+
+    lines = [f"{LIST_INDENT}{i}. {format_person(person)}" for i, person in enumerate(people, start=1)]
+    return "\n\n" + "\n".join(lines)
+
+
+def build_template_values(context: DocumentContext, current_date: Optional[date] = None) -> Dict[str, str]:
+    """
+    Build the placeholder values for a document context.
+
+    Args:
+        context: Document context with requestor, people and purpose
+        current_date: Date to print in the document. Defaults to today.
+
+    Returns:
+        Dict mapping placeholder names to their text
+    """
+    current_date = current_date or date.today()
+    return {
+        "requestor_name": context.requestor.full_name,
+        "requestor_address": context.requestor.full_address or ADDRESS_NOT_AVAILABLE,
+        "zweck": context.zweck,
+        "gemeinde": context.gemeinde,
+        "address_list": format_address_list(context.requested_people),
+        "current_date": current_date.strftime(DATE_FORMAT)
+    }
+
+
+def render_template(template: str, values: Dict[str, str]) -> str:
+    """
+    Replace the placeholders of a template with the given values.
+
+    Args:
+        template: Template text with {placeholder} fields
+        values: Placeholder values
+
+    Returns:
+        Rendered text
+
+    Raises:
+        KeyError: If the template uses a placeholder without a value
+    """
+    missing = template_placeholders(template) - set(values)
+    if missing:
+        raise KeyError(f"No value for template placeholders: {', '.join(sorted(missing))}")
+
+    return PLACEHOLDER_PATTERN.sub(lambda match: values[match.group(1)], template)
+
+
+def render_document(template: str, context: DocumentContext, current_date: Optional[date] = None) -> str:
+    """
+    Render a document template for a document context.
+
+    Args:
+        template: Template text with {placeholder} fields
+        context: Document context with requestor, people and purpose
+        current_date: Date to print in the document. Defaults to today.
+
+    Returns:
+        Rendered document in markdown format
+    """
+    return render_template(template, build_template_values(context, current_date)).strip()
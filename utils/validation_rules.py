@@ -0,0 +1,152 @@
+"""
+utils/validation_rules.py - Deterministic pre-validation of documents
+
+Checklist items that can be checked mechanically, such as the presence of a
+legal citation, are evaluated with precompiled regular expressions declared in
+templates/validation_rules.json. Only the items these rules cannot settle are
+passed on to the LLM. Each rule also declares the document blocks its items
+depend on, so LLM verdicts can be reused while those blocks are unchanged.
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Pattern, Tuple
+
+from models.core import ChecklistItem
+
+DEFAULT_RULES_PATH = os.path.join("templates", "validation_rules.json")
+
+RULE_DECISIVE = "decisive"  # The rule settles the item
+RULE_PRECONDITION = "precondition"  # A failed rule fails the item, a passed one leaves it to the LLM
+RULE_MODES = (RULE_DECISIVE, RULE_PRECONDITION)
+
+
+@dataclass
+class RequiredPattern:
+    """A text pattern a document must contain."""
+    label: str
+    pattern: Pattern
+
+
+@dataclass
+class ValidationRule:
+    """Mechanical check for the checklist items of one section."""
+    section: str
+    mode: str = RULE_DECISIVE
+    require: List[RequiredPattern] = field(default_factory=list)
+    depends_on: List[Pattern] = field(default_factory=list)  # Blocks the items depend on
+
+    def evaluate(self, document_text: str) -> Tuple[List[str], List[str]]:
+        """
+        Check the document for the required patterns.
+
+        Args:
+            document_text: The document text to check
+
+        Returns:
+            Tuple of (labels found, labels missing)
+        """
+        found, missing = [], []
+        for required in self.require:
+            (found if required.pattern.search(document_text) else missing).append(required.label)
+        return found, missing
+
+
+def parse_rules(data: Dict) -> List[ValidationRule]:
+    """
+    Build validation rules from their JSON declaration and compile the patterns.
+
+    Args:
+        data: Parsed content of validation_rules.json
+
+    Returns:
+        List of rules
+
+    Raises:
+        ValueError: If a rule has an unknown mode or an invalid pattern
+    """
+    rules = []
+    for entry in data.get("rules", []):
+        mode = entry.get("mode", RULE_DECISIVE)
+        if mode not in RULE_MODES:
+            raise ValueError(f"Unknown rule mode '{mode}' for section {entry.get('section')}")
+
+        try:
+            require = [
+                RequiredPattern(label=r["label"], pattern=re.compile(r["pattern"], re.IGNORECASE))
+                for r in entry.get("require", [])
+            ]
+            depends_on = [re.compile(p, re.IGNORECASE) for p in entry.get("depends_on", [])]
+        except re.error as e:
+            raise ValueError(f"Invalid pattern for section {entry.get('section')}: {str(e)}")
+
+        rules.append(ValidationRule(section=entry["section"], mode=mode, require=require, depends_on=depends_on))
+    return rules
+
+
+def load_rules(path: str = DEFAULT_RULES_PATH) -> List[ValidationRule]:
+    """
+    Load the validation rules declared next to the checklist.
+
+    Args:
+        path: Path of the rules file
+
+    Returns:
+        List of rules, empty if the file does not exist
+    """
+    if not os.path.exists(path):
+        print(f"DEBUG: No validation rules found at {path}")
+        return []
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_rules(json.load(f))
+
+
+def apply_rules(
+    document_text: str,
+    checklist: List[ChecklistItem],
+    rules: List[ValidationRule]
+) -> Tuple[List[Dict], List[ChecklistItem]]:
+    """
+    Evaluate the rules for all checklist items.
+
+    Args:
+        document_text: The document text to validate
+        checklist: Checklist items to evaluate
+        rules: Rules, matched to items by section
+
+    Returns:
+        Tuple of (validation results settled by the rules,
+        checklist items that still need the LLM)
+    """
+    rules_by_section = {rule.section.casefold(): rule for rule in rules}
+
+    results = []
+    remaining = []
+    for item in checklist:
+        rule = rules_by_section.get(item.section.casefold())
+        if rule is None or not rule.require:
+            remaining.append(item)
+            continue
+
+        found, missing = rule.evaluate(document_text)
+        if missing:
+            results.append({
+                "section": item.section,
+                "item": item.item,
+                "status": "failed",
+                "details": f"Missing: {', '.join(missing)}"
+            })
+        elif rule.mode == RULE_DECISIVE:
+            results.append({
+                "section": item.section,
+                "item": item.item,
+                "status": "passed",
+                "details": f"Found: {', '.join(found)}"
+            })
+        else:
+            remaining.append(item)
+
+    return results, remaining